@@ -0,0 +1,182 @@
+#Contains the NumPy evaluator that scores many leaf positions in one call.
+try:
+    import numpy
+except ImportError: #NumPy is only needed by this module
+    numpy = None
+import moveordering
+import othello
+
+
+
+
+#The shared square weights (see moveordering.get_square_weights) are divided by
+#this so that they keep the scale the other terms of a score were weighed against.
+_SQUARE_SCALE = 4
+
+#Player codes of an encoded board
+BLACK = 1
+WHITE = -1
+EMPTY = 0
+
+
+def encode_boards(gamestates):
+    """
+    Encodes the boards of several game states as one array.
+    @gamestates: Game states of the same board size
+    type gamestates: list
+    return: An (N, num_rows, num_cols) int8 array holding BLACK,
+            WHITE or EMPTY for every cell
+    rtype: numpy.ndarray
+    """
+    _require_numpy()
+    return _encode_cells([gamestate.get_cells() for gamestate in gamestates],
+                         gamestates[0].get_num_rows(), gamestates[0].get_num_cols())
+
+
+def _encode_cells(boards, num_rows, num_cols):
+    """
+    Encodes flat boards of cell codes as one array.
+    @boards: The boards as given by get_cells()
+    @num_rows: The number of rows of the boards
+    @num_cols: The number of columns of the boards
+    type boards: list
+    type num_rows: int
+    type num_cols: int
+    return: An (N, num_rows, num_cols) int8 array as given by
+            encode_boards()
+    rtype: numpy.ndarray
+    """
+    cells = numpy.frombuffer(b"".join(boards), dtype=numpy.uint8).reshape(-1, num_rows, num_cols)
+    return (cells == othello.BLACK).astype(numpy.int8) - (cells == othello.WHITE).astype(numpy.int8)
+
+
+def _require_numpy():
+    """
+    Raises an ImportError if NumPy is not installed.
+    return: None
+    rtype: None
+    """
+    if numpy is None:
+        raise ImportError("batcheval needs NumPy (pip install numpy)")
+
+
+
+
+class BatchEvaluator:
+    """
+    A position evaluator that scores whole batches of boards with NumPy.
+    A score combines the disc difference, a weighted-square table,
+    corner occupancy, and the potential mobility (the empty squares
+    next to an opposing disc, which approximates the moves a player
+    will have) of the two players.
+    """
+
+    def __init__(self, num_rows, num_cols, disc_weight=1, square_weight=1,
+                 corner_weight=10, mobility_weight=2):
+        """
+        Initializes the tables of a BatchEvaluator object.
+        @num_rows: The number of rows of the boards
+        @num_cols: The number of columns of the boards
+        @disc_weight: The weight of the disc difference
+        @square_weight: The weight of the weighted-square table
+        @corner_weight: The weight of each corner held
+        @mobility_weight: The weight of the potential mobility difference
+        type num_rows: int
+        type num_cols: int
+        type disc_weight: float
+        type square_weight: float
+        type corner_weight: float
+        type mobility_weight: float
+        return: None
+        rtype: None
+        """
+        _require_numpy()
+        self._num_rows = num_rows
+        self._num_cols = num_cols
+        self._weights = (disc_weight, square_weight, corner_weight, mobility_weight)
+
+        self._squares = numpy.array(moveordering.get_square_weights(num_rows, num_cols),
+                                    dtype=numpy.int32) // _SQUARE_SCALE
+        self._corners = [(0, 0), (0, num_cols-1), (num_rows-1, 0), (num_rows-1, num_cols-1)]
+        self._corner_rows = numpy.array([i_row for (i_row, i_col) in self._corners])
+        self._corner_cols = numpy.array([i_col for (i_row, i_col) in self._corners])
+
+
+    def evaluate_boards(self, boards, cpu_player):
+        """
+        Scores a batch of encoded boards for a player.
+        @boards: An (N, num_rows, num_cols) int8 array as given by
+                 encode_boards()
+        @cpu_player: The color of the player the scores are for
+        type boards: numpy.ndarray
+        type cpu_player: str
+        return: An array of N scores (higher is better for cpu_player)
+        rtype: numpy.ndarray
+        """
+        (disc_weight, square_weight, corner_weight, mobility_weight) = self._weights
+        own = boards.astype(numpy.int32)
+        if cpu_player == "W":
+            own = -own #1 for the player's discs, -1 for the opponent's
+
+        discs = own.sum(axis=(1, 2))
+        squares = (own * self._squares).sum(axis=(1, 2))
+        corners = own[:, self._corner_rows, self._corner_cols].sum(axis=1)
+        mobility = self._potential_mobility(own == -1, own == 0) -\
+                   self._potential_mobility(own == 1, own == 0)
+
+        return disc_weight*discs + square_weight*squares + corner_weight*corners +\
+               mobility_weight*mobility
+
+
+    def evaluate(self, gamestate, cpu_player):
+        """
+        Scores a single position for a player.
+        @gamestate: The game state of an Othello game
+        @cpu_player: The color of the player the score is for
+        type gamestate: Othello
+        type cpu_player: str
+        return: The score of the position
+        rtype: int
+        """
+        return int(self.evaluate_boards(encode_boards([gamestate]), cpu_player)[0])
+
+
+    def evaluate_batch(self, gamestate, cpu_player, moves):
+        """
+        Scores the positions reached by each of several moves in one call.
+        @gamestate: The game state the moves are made from (left as
+                    it was found)
+        @cpu_player: The color of the player the scores are for
+        @moves: A list of (move, flips) pairs as given by legal_moves()
+        type gamestate: Othello
+        type cpu_player: str
+        type moves: list
+        return: A list of scores, one per move
+        rtype: list
+        """
+        boards = []
+        for (move, flips) in moves:
+            record = gamestate.apply_move(move[0], move[1], flips)
+            boards.append(gamestate.get_cells()) #A copy, taken before the undo
+            gamestate.undo(record)
+        encoded = _encode_cells(boards, self._num_rows, self._num_cols)
+        return self.evaluate_boards(encoded, cpu_player).tolist()
+
+
+    def _potential_mobility(self, discs, empty):
+        """
+        Counts, per board, the empty squares next to at least one disc.
+        @discs: An (N, num_rows, num_cols) boolean array of discs
+        @empty: An (N, num_rows, num_cols) boolean array of empty squares
+        type discs: numpy.ndarray
+        type empty: numpy.ndarray
+        return: An array of N counts
+        rtype: numpy.ndarray
+        """
+        padded = numpy.pad(discs, ((0, 0), (1, 1), (1, 1)))
+        near = numpy.zeros_like(discs)
+        for d_row in (0, 1, 2):
+            for d_col in (0, 1, 2):
+                if (d_row, d_col) != (1, 1):
+                    near |= padded[:, d_row:d_row+self._num_rows, d_col:d_col+self._num_cols]
+        return (near & empty).sum(axis=(1, 2))
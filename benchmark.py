@@ -0,0 +1,334 @@
+#Contains the benchmarks of the game engine and the AIs.
+import argparse
+import contextlib
+import json
+import platform
+import random
+import sys
+import time
+import othello
+import othelloai
+
+
+
+
+#Board sizes benchmarked by default, with the depths searched on each. The
+#plain minimax does not prune, so it stops short of the alpha-beta depths.
+SIZES = (4, 8, 16)
+_MINIMAX_DEPTHS = {4: 5, 8: 3, 16: 2}
+_ABP_DEPTHS = {4: 7, 8: 5, 16: 3}
+_SEARCH_POSITIONS = 4   #Positions searched per size (searches are slow)
+
+
+def make_positions(num_rows, num_cols, count, seed=0):
+    """
+    Builds a reproducible set of positions by playing random games. The
+    positions are spread over the opening, the middle game and the
+    endgame, and the player to move always has a valid move.
+    @num_rows: The number of rows of the board
+    @num_cols: The number of columns of the board
+    @count: The number of positions
+    @seed: The seed of the random games
+    type num_rows: int
+    type num_cols: int
+    type count: int
+    type seed: int
+    return: A list of game states
+    rtype: list
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        gamestate = othello.Othello(num_rows, num_cols, "B", rng.choice("BW"), ">")
+        plies = rng.randrange(num_rows*num_cols - 4)
+        for ply in range(plies):
+            moves = gamestate.legal_moves()
+            if not moves:
+                break
+            gamestate.apply_move(*rng.choice(sorted(moves)))
+        if gamestate.get_winner() == " ":
+            positions.append(_copy(gamestate))
+    return positions
+
+
+def _copy(gamestate):
+    """
+    Copies a game state.
+    @gamestate: The game state of an Othello game
+    type gamestate: Othello
+    return: A copy of the game state
+    rtype: Othello
+    """
+    return othello.from_bytes(gamestate.to_bytes())
+
+
+@contextlib.contextmanager
+def count_nodes():
+    """
+    Counts the moves made with Othello.apply_move (the nodes a search
+    visits) while the context is active.
+    return: A one-element list holding the count so far
+    rtype: list
+    """
+    counter = [0]
+    apply_move = othello.Othello.apply_move
+    def counting_apply_move(self, row, col, flip_lst=None):
+        counter[0] += 1
+        return apply_move(self, row, col, flip_lst)
+    othello.Othello.apply_move = counting_apply_move
+    try:
+        yield counter
+    finally:
+        othello.Othello.apply_move = apply_move
+
+
+def _rate(count, seconds):
+    """
+    Returns a rate per second, or None if nothing was timed.
+    @count: The number of operations
+    @seconds: The time they took
+    type count: int
+    type seconds: float
+    return: The number of operations per second
+    rtype: float
+    """
+    return count / seconds if seconds > 0 else None
+
+
+def bench_move_generation(positions, repeat):
+    """
+    Measures how fast valid moves are found: whole move lists with
+    othelloai._cpu_find_moves, and single-cell checks with
+    Othello._valid_placement on every empty cell.
+    @positions: The positions to benchmark
+    @repeat: How many times each position is measured
+    type positions: list
+    type repeat: int
+    return: A dictionary of results
+    rtype: dict
+    """
+    start = time.perf_counter()
+    for count in range(repeat):
+        for gamestate in positions:
+            othelloai._cpu_find_moves(gamestate)
+    list_time = time.perf_counter() - start
+
+    cells = [(gamestate, i_row, i_col) for gamestate in positions
+             for (i_row, row) in enumerate(gamestate.get_board())
+             for (i_col, cell) in enumerate(row) if cell == " "]
+    start = time.perf_counter()
+    for count in range(repeat):
+        for (gamestate, i_row, i_col) in cells:
+            gamestate._valid_placement(i_row, i_col)
+    cell_time = time.perf_counter() - start
+
+    return {"move_lists_per_s": _rate(repeat*len(positions), list_time),
+            "placements_per_s": _rate(repeat*len(cells), cell_time)}
+
+
+def bench_move_application(positions, repeat):
+    """
+    Measures how fast moves are made: with Othello.valid_move (which
+    validates the move and hands the turn over), and with apply_move
+    and undo as the searches use them.
+    @positions: The positions to benchmark
+    @repeat: How many times each move is measured
+    type positions: list
+    type repeat: int
+    return: A dictionary of results
+    rtype: dict
+    """
+    moves = [(gamestate, move, flips) for gamestate in positions
+             for (move, flips) in gamestate.legal_moves().items()]
+
+    valid_move_time = 0.0
+    for count in range(repeat):
+        copies = [(_copy(gamestate), move) for (gamestate, move, flips) in moves]
+        start = time.perf_counter()
+        for (gamestate, move) in copies:
+            gamestate.valid_move(move[0], move[1])
+        valid_move_time += time.perf_counter() - start
+
+    start = time.perf_counter()
+    for count in range(repeat):
+        for (gamestate, move, flips) in moves:
+            gamestate.undo(gamestate.apply_move(move[0], move[1], flips))
+    apply_time = time.perf_counter() - start
+
+    return {"valid_moves_per_s": _rate(repeat*len(moves), valid_move_time),
+            "apply_undo_per_s": _rate(repeat*len(moves), apply_time)}
+
+
+def bench_counts(positions, repeat):
+    """
+    Measures the cost of Othello.get_counts.
+    @positions: The positions to benchmark
+    @repeat: How many times each position is measured
+    type positions: list
+    type repeat: int
+    return: A dictionary of results
+    rtype: dict
+    """
+    start = time.perf_counter()
+    for count in range(repeat):
+        for gamestate in positions:
+            gamestate.get_counts()
+    elapsed = time.perf_counter() - start
+    calls = repeat*len(positions)
+    return {"get_counts_per_s": _rate(calls, elapsed),
+            "get_counts_ns": elapsed / calls * 1e9 if calls else None}
+
+
+def bench_snapshots(positions, repeat):
+    """
+    Measures how fast game states are saved with to_bytes and restored
+    with othello.from_bytes.
+    @positions: The positions to benchmark
+    @repeat: How many times each position is measured
+    type positions: list
+    type repeat: int
+    return: A dictionary of results
+    rtype: dict
+    """
+    start = time.perf_counter()
+    for count in range(repeat):
+        snapshots = [gamestate.to_bytes() for gamestate in positions]
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for count in range(repeat):
+        for snapshot in snapshots:
+            othello.from_bytes(snapshot)
+    restore_time = time.perf_counter() - start
+
+    return {"to_bytes_per_s": _rate(repeat*len(positions), save_time),
+            "from_bytes_per_s": _rate(repeat*len(positions), restore_time)}
+
+
+def bench_search(positions, name, search, max_depth):
+    """
+    Measures a search at every depth up to a maximum: the nodes it
+    visits, its nodes per second and the time it takes to reach the
+    depth, summed over the positions.
+    @positions: The positions to search
+    @name: The name of the search in the results
+    @search: A function called as search(gamestate, cpu_player, depth)
+    @max_depth: The deepest depth searched
+    type positions: list
+    type name: str
+    type search: function
+    type max_depth: int
+    return: A dictionary of results by depth
+    rtype: dict
+    """
+    results = dict()
+    for depth in range(1, max_depth+1):
+        elapsed = 0.0
+        with count_nodes() as nodes:
+            for gamestate in positions:
+                start = time.perf_counter()
+                search(gamestate, gamestate.get_turn(), depth)
+                elapsed += time.perf_counter() - start
+        results[str(depth)] = {"nodes": nodes[0], "seconds": elapsed,
+                               "nodes_per_s": _rate(nodes[0], elapsed)}
+    return {name: results}
+
+
+def run_benchmarks(sizes=SIZES, num_positions=50, repeat=5, seed=0, search=True):
+    """
+    Runs every benchmark on square boards of several sizes.
+    @sizes: The board sizes (number of rows and columns)
+    @num_positions: The number of positions per size
+    @repeat: How many times each position is measured
+    @seed: The seed of the positions
+    @search: Whether the (slow) search benchmarks are run
+    type sizes: iterable
+    type num_positions: int
+    type repeat: int
+    type seed: int
+    type search: bool
+    return: The results, ready to be written as JSON
+    rtype: dict
+    """
+    results = {"python": sys.version.split()[0], "platform": platform.platform(),
+               "seed": seed, "positions": num_positions, "repeat": repeat, "sizes": dict()}
+    for size in sizes:
+        positions = make_positions(size, size, num_positions, seed)
+        size_results = dict()
+        size_results.update(bench_move_generation(positions, repeat))
+        size_results.update(bench_move_application(positions, repeat))
+        size_results.update(bench_counts(positions, repeat))
+        size_results.update(bench_snapshots(positions, repeat))
+        if search:
+            searched = positions[:_SEARCH_POSITIONS]
+            size_results["search"] = dict()
+            size_results["search"].update(bench_search(
+                searched, "minimax", othelloai.minimax, _MINIMAX_DEPTHS.get(size, 2)))
+            size_results["search"].update(bench_search(
+                searched, "minimax_abp",
+                lambda gamestate, cpu_player, depth:
+                    othelloai.minimax_abp(gamestate, cpu_player, float("-inf"), float("inf"), depth),
+                _ABP_DEPTHS.get(size, 3)))
+        results["sizes"]["{0}x{0}".format(size)] = size_results
+    return results
+
+
+def compare(baseline, results):
+    """
+    Lists how every measurement changed from a baseline run. Rates are
+    compared as new/old and times as old/new, so a speedup above 1 is
+    always an improvement. Node counts are left out.
+    @baseline: The results of an earlier run
+    @results: The results of this run
+    type baseline: dict
+    type results: dict
+    return: A list of (name, old, new, speedup) tuples
+    rtype: list
+    """
+    changes = []
+    def walk(old, new, path):
+        for (key, value) in new.items():
+            if key not in old:
+                continue
+            if isinstance(value, dict):
+                walk(old[key], value, path + [key])
+            elif key != "nodes" and isinstance(value, (int, float)) and old[key] and value:
+                speedup = value/old[key] if key.endswith("per_s") else old[key]/value
+                changes.append(("/".join(path + [key]), old[key], value, speedup))
+    walk(baseline.get("sizes", dict()), results.get("sizes", dict()), [])
+    return changes
+
+
+def main():
+    """
+    Runs the benchmarks from the command line.
+    return: None
+    rtype: None
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the Othello engine and AIs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--positions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-search", action="store_true", help="skip the search benchmarks")
+    parser.add_argument("--output", help="the JSON file to write (stdout by default)")
+    parser.add_argument("--compare", help="a JSON file of an earlier run to compare with")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.positions, args.repeat, args.seed, not args.no_search)
+    if args.output:
+        with open(args.output, "w") as out_file:
+            json.dump(results, out_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        for (name, old, new, speedup) in compare(baseline, results):
+            print("{:<45} {:>14.6g} {:>14.6g} {:>7.2f}x".format(name, old, new, speedup))
+
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,792 @@
+#Contains the class for a bitboard-backed othello gamestate.
+import othello
+import tracing
+from collections import namedtuple
+
+
+
+
+#The geometry of a board (its masks and its eight shift directions) only depends on
+#the board's dimensions, so it is built once per size and shared by every game.
+BitGeometry = namedtuple("BitGeometry", ["num_rows", "num_cols", "full", "dirs"])
+
+_GEOMETRIES = dict()
+
+#What a move changed, so that BitboardOthello.undo() can take it back in place.
+BitUndoRecord = namedtuple("BitUndoRecord", ["black", "white", "turn",
+                                             "game_over", "winner", "hash"])
+
+
+def get_geometry(num_rows, num_cols):
+    """
+    Returns the (cached) bitboard geometry for a board size. Cell
+    (i_row, i_col) is stored in bit i_row*num_cols + i_col.
+    @num_rows: The number of rows of a board
+    @num_cols: The number of columns of a board
+    type num_rows: int
+    type num_cols: int
+    return: A BitGeometry whose dirs attribute is a tuple of
+            (shift, mask) pairs, one per compass direction. A
+            positive shift is a left shift and a negative shift
+            is a right shift. The mask clears the bits that
+            wrapped around from the other side of the board.
+    rtype: BitGeometry
+    """
+    key = (num_rows, num_cols)
+    if key not in _GEOMETRIES:
+        full = (1 << (num_rows*num_cols)) - 1
+        first_col = 0
+        last_col = 0
+        for i_row in range(num_rows):
+            first_col |= 1 << (i_row*num_cols)
+            last_col |= 1 << (i_row*num_cols + num_cols-1)
+        not_first_col = full & ~first_col #Lands here when moving east
+        not_last_col = full & ~last_col   #Lands here when moving west
+
+        dirs = ((-num_cols, full),                #n
+                (-num_cols+1, not_first_col),     #ne
+                (1, not_first_col),               #e
+                (num_cols+1, not_first_col),      #se
+                (num_cols, full),                 #s
+                (num_cols-1, not_last_col),       #sw
+                (-1, not_last_col),               #w
+                (-num_cols-1, not_last_col))      #nw
+        _GEOMETRIES[key] = BitGeometry(num_rows, num_cols, full, dirs)
+    return _GEOMETRIES[key]
+
+
+def popcount(bits):
+    """
+    Counts the set bits of a bitboard.
+    @bits: A bitboard
+    type bits: int
+    return: The number of set bits
+    rtype: int
+    """
+    return bin(bits).count("1")
+
+
+def legal_bits(own, opp, geometry):
+    """
+    Generates every legal placement for the player owning own
+    with shift-and-mask operations (no per-cell scanning).
+    @own: The bitboard of the player to move
+    @opp: The bitboard of the opposing player
+    @geometry: The geometry of the board
+    type own: int
+    type opp: int
+    type geometry: BitGeometry
+    return: A bitboard with a bit set for each legal placement
+    rtype: int
+    """
+    empty = geometry.full & ~(own | opp)
+    moves = 0
+    for (shift, mask) in geometry.dirs:
+        if shift > 0:
+            run = (own << shift) & mask & opp
+            while True:
+                grown = run | ((run << shift) & mask & opp)
+                if grown == run:
+                    break
+                run = grown
+            moves |= (run << shift) & mask & empty
+        else:
+            shift = -shift
+            run = (own >> shift) & mask & opp
+            while True:
+                grown = run | ((run >> shift) & mask & opp)
+                if grown == run:
+                    break
+                run = grown
+            moves |= (run >> shift) & mask & empty
+    return moves
+
+
+def flip_bits(own, opp, move_bit, geometry):
+    """
+    Determines the opposing tiles flipped by placing a tile on move_bit.
+    @own: The bitboard of the player to move
+    @opp: The bitboard of the opposing player
+    @move_bit: A bitboard with only the placed tile's bit set
+    @geometry: The geometry of the board
+    type own: int
+    type opp: int
+    type move_bit: int
+    type geometry: BitGeometry
+    return: A bitboard of the tiles to flip (0 if the placement
+            flips nothing, i.e., is not a legal placement)
+    rtype: int
+    """
+    flips = 0
+    for (shift, mask) in geometry.dirs:
+        run = 0
+        if shift > 0:
+            cur = (move_bit << shift) & mask
+            while cur & opp:
+                run |= cur
+                cur = (cur << shift) & mask
+        else:
+            cur = (move_bit >> -shift) & mask
+            while cur & opp:
+                run |= cur
+                cur = (cur >> -shift) & mask
+        if cur & own:
+            flips |= run
+    return flips
+
+
+def get_position_bits(gamestate):
+    """
+    Returns the bitboards of any game state, building them from its
+    board if it is not bitboard-backed.
+    @gamestate: The game state of an Othello game
+    type gamestate: Othello or BitboardOthello
+    return: A tuple in the form (black_bits, white_bits)
+    rtype: tuple
+    """
+    if hasattr(gamestate, "get_bitboards"):
+        return gamestate.get_bitboards()
+    (black, white) = (0, 0)
+    for (index, cell) in enumerate(cell for row in gamestate.get_board() for cell in row):
+        if cell == "B":
+            black |= 1 << index
+        elif cell == "W":
+            white |= 1 << index
+    return (black, white)
+
+
+
+
+#Translations between bitboards written as binary digits and cell codes
+_BLACK_CODES = bytes.maketrans(b"01", bytes((othello.EMPTY, othello.BLACK)))
+_WHITE_CODES = bytes.maketrans(b"01", bytes((othello.EMPTY, othello.WHITE)))
+_BLACK_DIGITS = bytes.maketrans(bytes((othello.EMPTY, othello.BLACK, othello.WHITE)), b"010")
+_WHITE_DIGITS = bytes.maketrans(bytes((othello.EMPTY, othello.BLACK, othello.WHITE)), b"001")
+
+
+def from_bytes(data):
+    """
+    Restores a game from a snapshot made by to_bytes() (by either
+    engine).
+    @data: The snapshot
+    type data: bytes
+    return: The game state of the Othello game
+    rtype: BitboardOthello
+    """
+    (num_rows, num_cols, turn, top_left, how_to_win, game_over, codes) = othello.read_snapshot(data)
+    gamestate = BitboardOthello(num_rows, num_cols, turn, top_left, how_to_win)
+    gamestate._black = int(codes.translate(_BLACK_DIGITS)[::-1], 2)
+    gamestate._white = int(codes.translate(_WHITE_DIGITS)[::-1], 2)
+    gamestate._hash = gamestate._compute_hash()
+    if game_over:
+        gamestate._game_over = True
+        gamestate._set_winner()
+    return gamestate
+
+
+
+
+class BitboardOthello:
+    """
+    A class that represents the game state of an Othello game
+    with one integer bitboard per color. It exposes the same
+    public interface as othello.Othello.
+    """
+
+    def __init__(self, num_rows = 4, num_cols = 4,
+                 first_mover = "W", top_left = "B",
+                 how_to_win = ">", initial_config=[]):
+        """
+        Initializes the game state of an Othello game.
+        @num_rows: The number of rows for this Othello game
+        @num_cols: The number of columns for this Othello game
+        @first_mover: The player who moves first ("W" or "B")
+        @top_left: The top-left player in the initial center
+                   four-piece layout of this Othello game
+        @how_to_win: The method for winning a game (e.g.,
+                     most pieces ">" or fewest pieces "<")
+        @initial_config: A 2D list representing the initial state
+                         of this Othello game
+        type num_rows: int
+        type num_cols: int
+        type first_mover: str
+        type top_left: str
+        type how_to_win: str
+        type initial_config: list
+        return: None
+        rtype: None
+        """
+        if not 4 <= num_rows <= 16 or num_rows % 2 != 0:
+            raise Exception
+        if not 4 <= num_cols <= 16 or num_cols % 2 != 0:
+            raise Exception
+        if first_mover != "B" and first_mover != "W":
+            raise Exception
+        if top_left != "B" and top_left != "W":
+            raise Exception
+        if how_to_win != ">" and how_to_win != "<":
+            raise Exception
+
+        self._num_rows = num_rows
+        self._num_cols = num_cols
+        self._turn = first_mover
+        self._top_left = top_left
+        self._how_to_win = how_to_win
+        self._geometry = get_geometry(num_rows, num_cols)
+
+        self._black = 0
+        self._white = 0
+        if initial_config == []:
+            self._make_board(top_left)
+        else:
+            for i_row in range(num_rows):
+                for i_col in range(num_cols):
+                    if initial_config[i_row][i_col] == "B":
+                        self._black |= 1 << (i_row*num_cols + i_col)
+                    elif initial_config[i_row][i_col] == "W":
+                        self._white |= 1 << (i_row*num_cols + i_col)
+        self._board = None #2D list view, rebuilt lazily after the bitboards change
+        self._zobrist = othello.get_zobrist_keys(num_rows, num_cols)
+        self._hash = self._compute_hash()
+
+        self._game_over = False
+        self._winner = " "
+        self._tl_cell = (0, 0)
+        self._tr_cell = (0, num_cols-1)
+        self._bl_cell = (num_rows-1, 0)
+        self._br_cell = (num_rows-1, num_cols-1)
+
+
+    def get_tl_cell(self):
+        """
+        Returns the top-left cell of the board.
+        return: The top-left cell of this Othello game
+        rtype: tuple
+        """
+        return self._tl_cell
+
+
+    def get_tr_cell(self):
+        """
+        Returns the top-right cell of the board.
+        return: The top-right cell of this Othello game
+        rtype: tuple
+        """
+        return self._tr_cell
+
+
+    def get_bl_cell(self):
+        """
+        Returns the bottom-left cell of the board.
+        return: The bottom-left cell of this Othello game
+        rtype: tuple
+        """
+        return self._bl_cell
+
+
+    def get_br_cell(self):
+        """
+        Returns the bottom-right cell of the board.
+        return: The bottom-right cell of this Othello game
+        rtype: tuple
+        """
+        return self._br_cell
+
+
+    def get_num_rows(self):
+        """
+        Returns the number of rows in an Othello board.
+        return: The number of rows in this Othello game
+        rtype: int
+        """
+        return self._num_rows
+
+
+    def get_num_cols(self):
+        """
+        Returns the number of columns in an Othello board.
+        return: The number of columns in this Othello game
+        rtype: int
+        """
+        return self._num_cols
+
+
+    def get_board(self):
+        """
+        Returns a 2D list representation of the Othello board.
+        The list is rebuilt from the bitboards only after a move.
+        return: A 2D list representaiton of this Othello game
+        rtype: list
+        """
+        if self._board is None:
+            board = []
+            bit = 1
+            for i_row in range(self._num_rows):
+                board.append([])
+                for i_col in range(self._num_cols):
+                    if self._black & bit:
+                        board[-1].append("B")
+                    elif self._white & bit:
+                        board[-1].append("W")
+                    else:
+                        board[-1].append(" ")
+                    bit <<= 1
+            self._board = board
+        return self._board
+
+
+    def get_cell(self, i_row, i_col):
+        """
+        Returns the contents of one cell without building the 2D view.
+        @i_row: The 0-based row of the cell
+        @i_col: The 0-based column of the cell
+        type i_row: int
+        type i_col: int
+        return: The color of the tile on the cell ("B" or "W") or " "
+                if the cell is empty
+        rtype: str
+        """
+        bit = 1 << (i_row*self._num_cols + i_col)
+        if self._black & bit:
+            return "B"
+        return "W" if self._white & bit else " "
+
+
+    def get_bitboards(self):
+        """
+        Returns the bitboards of both players.
+        return: A tuple in the form (black_bits, white_bits)
+        rtype: tuple
+        """
+        return (self._black, self._white)
+
+
+    def get_hash(self):
+        """
+        Returns the Zobrist hash of the position (board and turn). It uses
+        the same keys as othello.Othello, so both engines agree on it.
+        return: The 64-bit Zobrist hash of this Othello game's position
+        rtype: int
+        """
+        return self._hash
+
+
+    def get_turn(self):
+        """
+        Returns whose turn it is in an Othello game.
+        return: The current turn of this Othello game ("B" or "W")
+        rtype: str
+        """
+        return self._turn
+
+
+    def get_winner(self):
+        """
+        Returns the winner of the game.
+        return: The winner of this game ("B" or "W")
+        rtype: str
+        """
+        return self._winner
+
+
+    def get_counts(self):
+        """
+        Returns the count of black and white tiles.
+        return: The count of black and white titles in a
+                list in the form [black_count, white_count]
+        rtype: list
+        """
+        return [popcount(self._black), popcount(self._white)]
+
+
+    def get_empty_count(self):
+        """
+        Returns the count of empty cells.
+        return: The number of empty cells on the board
+        rtype: int
+        """
+        return popcount(self._geometry.full & ~(self._black | self._white))
+
+
+    def canonicalize(self):
+        """
+        Maps the position to its canonical form: the symmetric image
+        with the smallest Zobrist hash (see Othello.canonicalize()).
+        return: A tuple in the form (hash, transform) containing the
+                hash of the canonical form and the index of the symmetry
+                that maps this position onto it
+        rtype: tuple
+        """
+        tiles = [(i_row*self._num_cols + i_col, color)
+                 for (bits, color) in ((self._black, "B"), (self._white, "W"))
+                 for (i_row, i_col) in self._bits_to_cells(bits)]
+        return othello.canonical_hash(self._num_rows, self._num_cols, tiles, self._turn)
+
+
+    def to_bytes(self):
+        """
+        Takes a compact snapshot of the game in the same format as
+        othello.Othello.to_bytes(), so either engine can restore it.
+        return: The snapshot
+        rtype: bytes
+        """
+        flags = othello.get_snapshot_flags(self._turn, self._top_left, self._how_to_win, self._game_over)
+        return bytes((self._num_rows, self._num_cols, flags)) + othello.pack_cells(self.get_cells())
+
+
+    def get_cells(self):
+        """
+        Returns the board as cell codes, as othello.Othello.get_cells()
+        does.
+        return: The cell code (othello.EMPTY, BLACK or WHITE) of every
+                cell, row by row
+        rtype: bytes
+        """
+        cells = self._num_rows*self._num_cols
+        #Each bitboard is written out as one byte a cell (0 or 1 for black,
+        #0 or 2 for white); the two never overlap, so OR-ing them as integers
+        #gives the cell codes.
+        (black, white) = (bytes(format(bits, "0{}b".format(cells))[::-1], "ascii").translate(table)
+                          for (bits, table) in ((self._black, _BLACK_CODES), (self._white, _WHITE_CODES)))
+        return (int.from_bytes(black, "little") | int.from_bytes(white, "little")).to_bytes(cells, "little")
+
+
+    def get_win_method(self):
+        """
+        Returns the win method for a game.
+        return: The win method for this game (e.g.,
+                most pieces ">" or fewest pieces "<")
+        rtype: str
+        """
+        return self._how_to_win
+
+
+    def get_top_left(self):
+        """
+        Returns the top left color in the center square.
+        return: The top left color in the initial center
+                four-piece layout of this Othello game
+        type: str
+        """
+        return self._top_left
+
+
+    def valid_move(self, row, col):
+        """
+        Checks the validity of a move and performs the move.
+        returns True if move was valid, else returns False.
+        @row: The row where a move will be attempted to be performed
+        @col: The col where a move will be attempted to be performed
+        type row: int
+        type col: int
+        return: True if the attempted move is valid or False otherwise
+        rtype: bool
+        """
+        if self._game_over:
+            tracing.emit(tracing.MOVES, "the game is over. No more moves can be made!")
+            return False
+
+        i_row, i_col = row-1, col-1
+        if not (0 <= i_row < self._num_rows and 0 <= i_col < self._num_cols):
+            tracing.emit(tracing.MOVES, "invalid move {} {}".format(row, col))
+            return False
+        move_bit = 1 << (i_row*self._num_cols + i_col)
+        (own, opp) = self._own_and_opp()
+        flips = 0
+        if not (own | opp) & move_bit:
+            flips = flip_bits(own, opp, move_bit, self._geometry)
+        if flips == 0:
+            tracing.emit(tracing.MOVES, "invalid move {} {}".format(row, col))
+            return False
+
+        self._flip(move_bit, flips)
+        passes = self._end_turn()
+        if passes >= 1:
+            skipped = "B" if self._turn == "W" else "W"
+            tracing.emit(tracing.MOVES, "no valid moves exist for {0}. {0}'s turn has been skipped".format(skipped))
+        if passes == 2:
+            tracing.emit(tracing.MOVES, "no valid moves exist for {0}. {0}'s turn has been skipped".format(self._turn))
+            tracing.emit(tracing.MOVES, "no moves exist for either player. GAME OVER")
+            return False
+
+        return True
+
+
+    def legal_moves(self):
+        """
+        Finds every valid move for the player to move, along with
+        the tiles each one flips, in a single pass.
+        return: A dictionary whose keys are the valid moves as
+                (non 0-based) (row, col) tuples in row-major order
+                and whose values are bitboards of the tiles to flip
+        rtype: dict
+        """
+        moves = dict()
+        if self._game_over:
+            return moves
+        (own, opp) = self._own_and_opp()
+        bits = legal_bits(own, opp, self._geometry)
+        while bits:
+            move_bit = bits & -bits
+            (i_row, i_col) = divmod(move_bit.bit_length()-1, self._num_cols)
+            moves[(i_row+1, i_col+1)] = flip_bits(own, opp, move_bit, self._geometry)
+            bits ^= move_bit
+        return moves
+
+
+    def apply_move(self, row, col, flips=None):
+        """
+        Performs a move in place without printing anything and returns
+        a record that undo() can use to take the move back.
+        @row: The row (non 0-based) where a tile is to be placed
+        @col: The column (non 0-based) where a tile is to be placed
+        @flips: The bitboard of tiles this move flips, as given by
+                legal_moves() for the current position. If omitted,
+                the move is validated and its flips are found here.
+        type row: int
+        type col: int
+        type flips: int
+        return: An undo record if the move was valid or None otherwise
+        rtype: BitUndoRecord
+        """
+        if self._game_over:
+            return None
+        i_row, i_col = row-1, col-1
+        if not (0 <= i_row < self._num_rows and 0 <= i_col < self._num_cols):
+            return None #Checked before the shift, which fails on a negative index
+        move_bit = 1 << (i_row*self._num_cols + i_col)
+        if flips is None:
+            (own, opp) = self._own_and_opp()
+            if (own | opp) & move_bit:
+                return None
+            flips = flip_bits(own, opp, move_bit, self._geometry)
+            if flips == 0:
+                return None
+
+        record = BitUndoRecord(self._black, self._white, self._turn,
+                               self._game_over, self._winner, self._hash)
+        self._flip(move_bit, flips)
+        self._end_turn()
+        return record
+
+
+    def undo(self, record):
+        """
+        Takes back a move performed by apply_move().
+        @record: The undo record returned by apply_move()
+        type record: BitUndoRecord
+        return: None
+        rtype: None
+        """
+        self._black = record.black
+        self._white = record.white
+        self._turn = record.turn
+        self._game_over = record.game_over
+        self._winner = record.winner
+        self._hash = record.hash
+        self._board = None
+
+
+    def _end_turn(self):
+        """
+        Hands the turn over after a tile placement. A player without
+        any valid moves has their turn skipped, and the game ends if
+        the board is full or if neither player can move.
+        return: The number of turns skipped (0, 1 or 2, where 2 means
+                that neither player could move)
+        rtype: int
+        """
+        if self._board_is_full():
+            self._game_over = True
+            self._set_winner()
+
+        self._switch_turn(self._turn)
+        if not self._valid_move_exists(): #Check if the other player has any valid moves
+            self._switch_turn(self._turn) #Switch turn back to player before skip was determined
+            if not self._valid_move_exists():
+                self._game_over = True
+                self._set_winner()
+                return 2
+            return 1
+
+        return 0
+
+
+    def _own_and_opp(self):
+        """
+        Returns the bitboards of the player to move and of their opponent.
+        return: A tuple in the form (own_bits, opp_bits)
+        rtype: tuple
+        """
+        if self._turn == "B":
+            return (self._black, self._white)
+        return (self._white, self._black)
+
+
+    def _board_is_full(self):
+        """
+        Determines if the board for this Othello game is full.
+        return: True if the board for this Othello game is full
+                or False otherwise.
+        rtype: bool
+        """
+        return (self._black | self._white) == self._geometry.full
+
+
+    def _flip(self, move_bit, flips):
+        """
+        Places a tile for the player to move and flips the given tiles.
+        @move_bit: A bitboard with only the placed tile's bit set
+        @flips: A bitboard of the tiles to flip
+        type move_bit: int
+        type flips: int
+        return: None
+        rtype: None
+        """
+        if self._turn == "B":
+            self._black |= move_bit | flips
+            self._white &= ~flips
+            (mover_keys, opp_keys) = (self._zobrist.black, self._zobrist.white)
+        else:
+            self._white |= move_bit | flips
+            self._black &= ~flips
+            (mover_keys, opp_keys) = (self._zobrist.white, self._zobrist.black)
+        self._board = None
+
+        self._hash ^= mover_keys[move_bit.bit_length()-1]
+        while flips:
+            low = flips & -flips
+            index = low.bit_length()-1
+            self._hash ^= mover_keys[index] ^ opp_keys[index]
+            flips ^= low
+
+
+    def _valid_placement(self, i_row, i_col):
+        """
+        Determines if the given tile placement is valid. Mirrors
+        Othello._valid_placement so the AIs can use either engine.
+        @i_row: The 0-based row of a tile placement
+        @i_col: The 0-based col of a tile placement
+        type i_row: int
+        type i_col: int
+        return: A tuple whose first component is a boolean indicating
+                if the given tile placment is valid and whose second
+                component is a list of cells to flip as a result of
+                the tile placement
+        rtype: (bool, [])
+        """
+        if not (0 <= i_row < self._num_rows and 0 <= i_col < self._num_cols):
+            return (False, []) #A bit index would wrap onto another cell
+        move_bit = 1 << (i_row*self._num_cols + i_col)
+        (own, opp) = self._own_and_opp()
+        if (own | opp) & move_bit:
+            return (False, [])
+        flips = flip_bits(own, opp, move_bit, self._geometry)
+        if flips == 0:
+            return (False, [])
+        return (True, self._bits_to_cells(flips))
+
+
+    def _bits_to_cells(self, bits):
+        """
+        Converts a bitboard into a list of 0-based (row, col) cells.
+        @bits: A bitboard
+        type bits: int
+        return: The cells whose bits are set, in row-major order
+        rtype: [tuple]
+        """
+        cells = []
+        while bits:
+            low = bits & -bits
+            cells.append(divmod(low.bit_length()-1, self._num_cols))
+            bits ^= low
+        return cells
+
+
+    def _set_winner(self):
+        """
+        Sets the winner of the game. If the game is a
+        draw, then the winner is set to NONE.
+        return: None
+        rtype: None
+        """
+        (b_count, w_count) = self.get_counts()
+        if b_count == w_count:
+            self._winner = "NONE"
+        elif self._how_to_win == ">":
+            self._winner = "B" if b_count > w_count else "W"
+        elif self._how_to_win == "<":
+            self._winner = "B" if b_count < w_count else "W"
+
+
+    def _valid_move_exists(self):
+        """
+        Determines if the player to move has any valid moves.
+        return: True if a valid move exists or False otherwise
+        rtype: bool
+        """
+        (own, opp) = self._own_and_opp()
+        return legal_bits(own, opp, self._geometry) != 0
+
+
+    def _switch_turn(self, cur_player):
+        """
+        Switches the player turn in an Othello game.
+        @cur_player: The current player ("B" or "W")
+        return: None
+        rtype: None
+        """
+        self._turn = "B" if cur_player == "W" else "W"
+        self._hash ^= self._zobrist.side
+
+
+    def _compute_hash(self):
+        """
+        Computes the Zobrist hash of the position from scratch. Only
+        used to set up the incrementally kept hash.
+        return: The 64-bit Zobrist hash of this Othello game's position
+        rtype: int
+        """
+        value = self._zobrist.side if self._turn == "W" else 0
+        for (bits, keys) in ((self._black, self._zobrist.black),
+                             (self._white, self._zobrist.white)):
+            while bits:
+                low = bits & -bits
+                value ^= keys[low.bit_length()-1]
+                bits ^= low
+        return value
+
+
+    def _make_board(self, top_left):
+        """
+        Sets up the center four-piece layout of an Othello game.
+        @top_left: The top-left player in the initial center
+                   four-piece layout of this Othello game
+        type top_left: str
+        return: None
+        rtype: None
+        """
+        top_left_row = self._num_rows//2 - 1
+        top_left_col = self._num_cols//2 - 1
+        diagonal = (1 << (top_left_row*self._num_cols + top_left_col)) |\
+                   (1 << ((top_left_row+1)*self._num_cols + top_left_col+1))
+        anti_diagonal = (1 << (top_left_row*self._num_cols + top_left_col+1)) |\
+                        (1 << ((top_left_row+1)*self._num_cols + top_left_col))
+        if top_left == "B":
+            self._black, self._white = diagonal, anti_diagonal
+        else:
+            self._black, self._white = anti_diagonal, diagonal
+
+
+    def print_board(self):
+        """
+        Prints the game board of an Othello game.
+        This is a useful method for testing.
+        return: None
+        rtype: None
+        """
+        for row in self.get_board():
+            print()
+            for cell in row:
+                print(cell if cell != " " else ".", end = " ")
+        print()
@@ -0,0 +1,215 @@
+#Contains the exact endgame solver used by the AIs once few empty squares remain.
+import time
+import bitboard
+import tracing
+
+
+
+
+#The default number of empty squares at which the AIs switch to the solver
+DEFAULT_EMPTIES = 10
+
+#Above this many empty squares, moves are ordered fastest-first (fewest
+#replies for the opponent), which costs a move generation per move. Closer to
+#the end, where the subtrees are tiny, the cheaper parity ordering alone is used.
+_FASTEST_FIRST_EMPTIES = 6
+
+#How many nodes are searched between two checks of the deadline
+_CHECK_INTERVAL = 256
+
+_QUADRANTS = dict()
+
+
+def _get_quadrants(geometry):
+    """
+    Returns the (cached) bitboard masks of the four quadrants of a board.
+    @geometry: The geometry of the board
+    type geometry: bitboard.BitGeometry
+    return: A tuple of four bitboards
+    rtype: tuple
+    """
+    key = (geometry.num_rows, geometry.num_cols)
+    if key not in _QUADRANTS:
+        half_rows = geometry.num_rows // 2
+        half_cols = geometry.num_cols // 2
+        quadrants = [0, 0, 0, 0]
+        for i_row in range(geometry.num_rows):
+            for i_col in range(geometry.num_cols):
+                quadrant = 2*(i_row >= half_rows) + (i_col >= half_cols)
+                quadrants[quadrant] |= 1 << (i_row*geometry.num_cols + i_col)
+        _QUADRANTS[key] = tuple(quadrants)
+    return _QUADRANTS[key]
+
+
+class _SolverTimeout(Exception):
+    """ An exception raised inside the solver when it has to stop early. """
+    pass
+
+
+
+
+class _Solver:
+    """ The state shared by every node of one endgame search. """
+
+    def __init__(self, geometry, sign, deadline, stop_event):
+        """
+        Initializes the state of a _Solver object.
+        @geometry: The geometry of the board
+        @sign: 1 if the player with the most tiles wins or -1 if the
+               player with the fewest tiles wins
+        @deadline: An optional time.perf_counter() value at which
+                   the search stops
+        @stop_event: An optional threading.Event that stops the
+                     search once it is set
+        type geometry: bitboard.BitGeometry
+        type sign: int
+        type deadline: float
+        type stop_event: threading.Event
+        return: None
+        rtype: None
+        """
+        self.geometry = geometry
+        self.sign = sign
+        self.quadrants = _get_quadrants(geometry)
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.nodes = 0
+
+
+    def order(self, own, opp, moves):
+        """
+        Orders the moves of a position. Moves into a quadrant with an
+        odd number of empty squares come first (parity: the player who
+        moves last in a region tends to keep the tiles they take there),
+        and far enough from the end the moves leaving the opponent the
+        fewest replies come first (fastest-first).
+        @own: The bitboard of the player to move
+        @opp: The bitboard of the opposing player
+        @moves: The bitboard of the legal moves
+        type own: int
+        type opp: int
+        type moves: int
+        return: A list of (move_bit, flips) pairs, best candidates first
+        rtype: list
+        """
+        empty = self.geometry.full & ~(own | opp)
+        odd = 0
+        for quadrant in self.quadrants:
+            if bitboard.popcount(empty & quadrant) & 1:
+                odd |= quadrant
+        fastest_first = bitboard.popcount(empty) > _FASTEST_FIRST_EMPTIES
+
+        scored = []
+        while moves:
+            move_bit = moves & -moves
+            moves ^= move_bit
+            flips = bitboard.flip_bits(own, opp, move_bit, self.geometry)
+            score = 0 if move_bit & odd else 1
+            if fastest_first:
+                replies = bitboard.legal_bits(opp & ~flips, own | move_bit | flips, self.geometry)
+                score += 2*bitboard.popcount(replies)
+            scored.append((score, move_bit, flips))
+        scored.sort(key=lambda item: item[0])
+        return [(move_bit, flips) for (score, move_bit, flips) in scored]
+
+
+    def search(self, own, opp, alpha, beta):
+        """
+        Searches a position to the end of the game with negamax
+        alpha-beta.
+        @own: The bitboard of the player to move
+        @opp: The bitboard of the opposing player
+        @alpha: The lower bound of the window
+        @beta: The upper bound of the window
+        type own: int
+        type opp: int
+        type alpha: int
+        type beta: int
+        return: A tuple containing the final score for the player to
+                move (exact if it lies inside the window, otherwise a
+                bound on the side it fell) and the best move bit (0
+                if the player has to pass or the game is over)
+        rtype: tuple
+        """
+        self.nodes += 1
+        if self.nodes % _CHECK_INTERVAL == 0:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise _SolverTimeout
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise _SolverTimeout
+
+        moves = bitboard.legal_bits(own, opp, self.geometry)
+        if not moves:
+            if not bitboard.legal_bits(opp, own, self.geometry): #Neither player can move
+                return (self.sign * (bitboard.popcount(own) - bitboard.popcount(opp)), 0)
+            return (-self.search(opp, own, -beta, -alpha)[0], 0) #The player has to pass
+
+        (best_val, best_bit) = (None, 0)
+        for (move_bit, flips) in self.order(own, opp, moves):
+            val = -self.search(opp & ~flips, own | move_bit | flips, -beta, -alpha)[0]
+            if best_val is None or val > best_val:
+                (best_val, best_bit) = (val, move_bit)
+                if val > alpha:
+                    alpha = val
+                    if alpha >= beta:
+                        break
+        return (best_val, best_bit)
+
+
+def solve(gamestate, wld=False, deadline=None, stop_event=None, stats=None):
+    """
+    Finds the perfect-play result of a position by searching every line
+    to the end of the game. Scores follow the game's win method: with
+    "<" a player scores the tiles their opponent has over them.
+    @gamestate: The game state of an Othello game
+    @wld: Only find out whether the player to move wins, loses or
+          draws (with a window that only the draw fits in), which is
+          much cheaper than finding the exact score
+    @deadline: An optional time.perf_counter() value at which
+               the solver gives up
+    @stop_event: An optional threading.Event that makes the
+                 solver give up once it is set
+    @stats: An optional othelloai.SearchStats that the solver adds
+            the positions it visits to
+    type gamestate: Othello or BitboardOthello
+    type wld: bool
+    type deadline: float
+    type stop_event: threading.Event
+    type stats: othelloai.SearchStats
+    return: A tuple containing the final score for the player to move
+            (1, 0 or -1 for a win, draw or loss if wld is True) and the
+            best (non 0-based) move (None if the game is over), or None
+            if the solver gave up
+    rtype: tuple
+    """
+    num_cols = gamestate.get_num_cols()
+    geometry = bitboard.get_geometry(gamestate.get_num_rows(), num_cols)
+    sign = 1 if gamestate.get_win_method() == ">" else -1
+    (black, white) = bitboard.get_position_bits(gamestate)
+    (own, opp) = (black, white) if gamestate.get_turn() == "B" else (white, black)
+    if gamestate.get_winner() != " ":
+        score = sign * (bitboard.popcount(own) - bitboard.popcount(opp))
+        return ((score > 0) - (score < 0) if wld else score, None)
+
+    solver = _Solver(geometry, sign, deadline, stop_event)
+    window = (-1, 1) if wld else (-geometry.full.bit_length(), geometry.full.bit_length())
+    try:
+        (score, move_bit) = solver.search(own, opp, window[0], window[1])
+    except _SolverTimeout:
+        if tracing.level >= tracing.SEARCH:
+            tracing.emit(tracing.SEARCH, "endgame gave up after {} nodes".format(solver.nodes))
+        return None
+    finally:
+        if stats is not None:
+            stats.nodes += solver.nodes
+    if wld:
+        score = max(-1, min(1, score))
+
+    move = None
+    if move_bit:
+        (i_row, i_col) = divmod(move_bit.bit_length()-1, num_cols)
+        move = (i_row+1, i_col+1)
+    if tracing.level >= tracing.SEARCH:
+        tracing.emit(tracing.SEARCH, "endgame {} v={} move={} nodes={}".format(
+            "wld" if wld else "exact", score, move, solver.nodes))
+    return (score, move)
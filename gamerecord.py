@@ -0,0 +1,225 @@
+#Contains the compact game record format, its writer and its streaming reader.
+import argparse
+import struct
+import sys
+from array import array
+from collections import namedtuple
+import othello
+
+
+
+
+#File layout: a magic string followed by one record per game. A record is a
+#header (num_rows, num_cols, first mover, top-left player, win method, winner
+#and the number of moves) followed by the moves as little-endian u16 cell
+#indices (i_row*num_cols + i_col), with PASS standing for a player who had no
+#valid move. The winner is " " for a game that was not finished and "N" for a draw.
+_MAGIC = b"OTHGAME1"
+_HEADER = struct.Struct("<BBccccH")
+PASS = 0xFFFF
+
+#A game as stored in a record file. moves lists the (non 0-based) (row, col)
+#moves in the order they were played, with None for a pass. winner is "B",
+#"W", "NONE" or " " (the game was not finished).
+GameRecord = namedtuple("GameRecord", ["num_rows", "num_cols", "first_mover", "top_left",
+                                       "how_to_win", "winner", "moves"])
+
+
+def make_record(num_rows, num_cols, first_mover, top_left, how_to_win, moves, winner=" "):
+    """
+    Builds the record of a game from the moves logged while playing it.
+    The engine skips a player with no valid move by itself, so a pass
+    shows up as one player moving twice in a row; it is written out
+    explicitly in the record.
+    @num_rows: The number of rows of the board
+    @num_cols: The number of columns of the board
+    @first_mover: The player who moved first ("B" or "W")
+    @top_left: The top-left player in the initial center
+               four-piece layout
+    @how_to_win: The method for winning the game (">" or "<")
+    @moves: The moves played as (player, row, col) tuples
+    @winner: The winner of the game ("B", "W", "NONE" or " " if the
+             game was not finished)
+    type num_rows: int
+    type num_cols: int
+    type first_mover: str
+    type top_left: str
+    type how_to_win: str
+    type moves: list
+    type winner: str
+    return: The record of the game
+    rtype: GameRecord
+    """
+    record_moves = []
+    expected = first_mover
+    for (player, row, col) in moves:
+        if player != expected:
+            record_moves.append(None)
+        record_moves.append((row, col))
+        expected = "W" if player == "B" else "B"
+    return GameRecord(num_rows, num_cols, first_mover, top_left, how_to_win, winner, record_moves)
+
+
+def encode(record):
+    """
+    Packs a game record into the bytes written to a record file.
+    @record: The record of a game
+    type record: GameRecord
+    return: The packed record
+    rtype: bytes
+    """
+    num_cols = record.num_cols
+    moves = array("H", [PASS if move is None else (move[0]-1)*num_cols + move[1]-1
+                        for move in record.moves])
+    if sys.byteorder == "big":
+        moves.byteswap() #The file is little-endian
+    winner = "N" if record.winner == "NONE" else record.winner
+    return _HEADER.pack(record.num_rows, record.num_cols, record.first_mover.encode(),
+                        record.top_left.encode(), record.how_to_win.encode(), winner.encode(),
+                        len(moves)) + moves.tobytes()
+
+
+
+
+class GameWriter:
+    """ Appends game records to a record file, creating it if needed. """
+
+    def __init__(self, path):
+        """
+        Opens a record file for appending.
+        @path: The path of the record file
+        type path: str
+        return: None
+        rtype: None
+        """
+        self._file = open(path, "a+b")
+        self._file.seek(0)
+        magic = self._file.read(len(_MAGIC))
+        if magic == b"":
+            self._file.write(_MAGIC)
+        elif magic != _MAGIC:
+            self._file.close()
+            raise ValueError("Not a game record file: {}".format(path))
+        self._file.seek(0, 2)
+
+
+    def write(self, record):
+        """
+        Appends the record of a game.
+        @record: The record of a game
+        type record: GameRecord
+        return: None
+        rtype: None
+        """
+        self._file.write(encode(record))
+
+
+    def close(self):
+        """
+        Closes the record file.
+        return: None
+        rtype: None
+        """
+        self._file.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+
+
+def read_games(path):
+    """
+    Reads the records of a record file one at a time, so that files of
+    millions of games can be streamed without loading them at once.
+    @path: The path of the record file
+    type path: str
+    return: A generator of the game records in the order they were written
+    rtype: generator
+    """
+    with open(path, "rb") as record_file:
+        if record_file.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError("Not a game record file: {}".format(path))
+        while True:
+            header = record_file.read(_HEADER.size)
+            if not header:
+                return
+            if len(header) != _HEADER.size:
+                raise ValueError("Truncated game record in {}".format(path))
+            (num_rows, num_cols, first_mover, top_left, how_to_win, winner, num_moves) =\
+                _HEADER.unpack(header)
+            data = record_file.read(2*num_moves)
+            if len(data) != 2*num_moves:
+                raise ValueError("Truncated game record in {}".format(path))
+            codes = array("H", data)
+            if sys.byteorder == "big":
+                codes.byteswap()
+            names = othello.get_geometry(num_rows, num_cols).moves
+            winner = winner.decode()
+            yield GameRecord(num_rows, num_cols, first_mover.decode(), top_left.decode(),
+                             how_to_win.decode(), "NONE" if winner == "N" else winner,
+                             [None if code == PASS else names[code] for code in codes])
+
+
+def replay(record):
+    """
+    Replays a recorded game, stopping before every move to hand out the
+    position it was played in. The position is the replay's own game
+    state: it changes once the next one is asked for, and is left at the
+    end of the game when the replay is over.
+    @record: The record of a game
+    type record: GameRecord
+    return: A generator of (gamestate, player, move) tuples, one per
+            move (passes are not handed out)
+    rtype: generator
+    """
+    gamestate = othello.Othello(record.num_rows, record.num_cols, record.first_mover,
+                                record.top_left, record.how_to_win)
+    mover = None
+    for move in record.moves:
+        if move is None:
+            #The engine skips a player with no valid move by itself, so
+            #after a pass the last mover must be on turn again.
+            if gamestate.get_turn() != mover:
+                raise othello.OthelloInvalidMoveError("Invalid pass in game")
+            continue
+        mover = gamestate.get_turn()
+        yield (gamestate, mover, move)
+        if gamestate.apply_move(move[0], move[1]) is None:
+            raise othello.OthelloInvalidMoveError("Invalid move in game: {}".format(move))
+
+
+def main():
+    """
+    Replays every game of a record file from the command line, checking
+    that each move is valid and that each finished game ends with the
+    recorded winner.
+    return: None
+    rtype: None
+    """
+    parser = argparse.ArgumentParser(description="Replays and checks the games of a record file.")
+    parser.add_argument("path", help="the record file to read")
+    args = parser.parse_args()
+
+    (games, moves, mismatches) = (0, 0, 0)
+    for record in read_games(args.path):
+        gamestate = None
+        for (gamestate, player, move) in replay(record):
+            moves += 1
+        games += 1
+        if record.winner != " " and (gamestate is None or gamestate.get_winner() != record.winner):
+            mismatches += 1
+            print("game {}: recorded winner {} but the replay ends with {}".format(
+                games, record.winner, gamestate.get_winner() if gamestate else " "))
+    print("{} games, {} moves replayed, {} mismatches".format(games, moves, mismatches))
+
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#Contains the Monte Carlo tree search AI.
+import math
+import random
+import time
+import bitboard
+import othelloai
+import tracing
+
+
+
+
+DEFAULT_PLAYOUTS = 2000
+DEFAULT_EXPLORATION = 1.4   #The UCT exploration constant (about sqrt(2))
+DEFAULT_BATCH_SIZE = 64   #Descents in flight at once when a playout service is used
+VIRTUAL_LOSS = 1
+
+#The playout results of each winner, as (black_wins, white_wins, draws)
+_RESULTS = {"B": (1, 0, 0), "W": (0, 1, 0), "NONE": (0, 0, 1)}
+
+
+def rollout(own, opp, color, geometry, sign, rng):
+    """
+    Plays random moves from a position until the game ends, on bitboards
+    alone (no game state is built or copied).
+    @own: The bitboard of the player to move
+    @opp: The bitboard of the opposing player
+    @color: The color of the player to move ("B" or "W")
+    @geometry: The geometry of the board
+    @sign: 1 if the player with the most tiles wins or -1 if the
+           player with the fewest tiles wins
+    @rng: The random number generator picking the moves
+    type own: int
+    type opp: int
+    type color: str
+    type geometry: bitboard.BitGeometry
+    type sign: int
+    type rng: random.Random
+    return: The winner of the game ("B", "W" or "NONE")
+    rtype: str
+    """
+    legal_bits = bitboard.legal_bits
+    flip_bits = bitboard.flip_bits
+    passed = False
+    while True:
+        moves = legal_bits(own, opp, geometry)
+        if moves:
+            for skip in range(rng.randrange(bin(moves).count("1"))):
+                moves &= moves - 1 #Drop the lowest moves to land on a random one
+            move_bit = moves & -moves
+            flips = flip_bits(own, opp, move_bit, geometry)
+            (own, opp) = (opp & ~flips, own | move_bit | flips)
+            passed = False
+        elif passed: #Neither player can move
+            break
+        else:
+            (own, opp) = (opp, own)
+            passed = True
+        color = "W" if color == "B" else "B"
+
+    diff = sign * (bitboard.popcount(own) - bitboard.popcount(opp))
+    if diff == 0:
+        return "NONE"
+    return color if diff > 0 else ("W" if color == "B" else "B")
+
+
+
+
+class _Node:
+    """ A position in the search tree, seen from the player to move. """
+
+    __slots__ = ("own", "opp", "turn", "parent", "move_bit",
+                 "children", "untried", "visits", "wins")
+
+    def __init__(self, own, opp, turn, parent, move_bit, geometry, rng):
+        """
+        Initializes a _Node object.
+        @own: The bitboard of the player to move
+        @opp: The bitboard of the opposing player
+        @turn: The color of the player to move ("B" or "W")
+        @parent: The parent node (None for the root)
+        @move_bit: The move bit that led here from the parent
+                   (0 for a pass)
+        @geometry: The geometry of the board
+        @rng: The random number generator shuffling the moves
+        return: None
+        rtype: None
+        """
+        self.own = own
+        self.opp = opp
+        self.turn = turn
+        self.parent = parent
+        self.move_bit = move_bit
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0   #Wins of the player who moved into this node
+
+        moves = bitboard.legal_bits(own, opp, geometry)
+        if moves:
+            self.untried = []
+            while moves:
+                self.untried.append(moves & -moves)
+                moves &= moves - 1
+            rng.shuffle(self.untried)
+        elif bitboard.legal_bits(opp, own, geometry):
+            self.untried = [0] #The player has to pass
+        else:
+            self.untried = [] #The game is over
+
+
+    def get_black_white(self):
+        """
+        Returns the bitboards of the node's position by color.
+        return: A tuple in the form (black_bits, white_bits)
+        rtype: tuple
+        """
+        return (self.own, self.opp) if self.turn == "B" else (self.opp, self.own)
+
+
+
+
+class MCTS:
+    """
+    A Monte Carlo tree search (UCT) AI. Each playout descends the tree by
+    the UCT rule, adds one node, and finishes the game with random moves.
+    The subtree of the position reached after a move (and the reply) is
+    kept for the next search.
+    Given a playout service (see playouts.py), the rollouts run in other
+    processes instead: several descents are made at once, each adding a
+    virtual loss to the nodes it passes so that the next ones spread out
+    over the tree, and their leaves are played out as one batch.
+    """
+
+    def __init__(self, exploration=DEFAULT_EXPLORATION, seed=None, service=None,
+                 batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Initializes an MCTS object.
+        @exploration: The UCT exploration constant
+        @seed: An optional seed for the playouts
+        @service: An optional playouts.PlayoutService that plays the
+                  rollouts out in its worker processes
+        @batch_size: The number of descents in flight at once when a
+                     service is used
+        type exploration: float
+        type seed: int
+        type service: playouts.PlayoutService
+        type batch_size: int
+        return: None
+        rtype: None
+        """
+        self._exploration = exploration
+        self._rng = random.Random(seed)
+        self._root = None
+        self._service = service
+        self._batch_size = batch_size
+
+
+    def search(self, gamestate, playouts=None, time_budget_ms=None, stop_event=None):
+        """
+        Picks a move for the player to move.
+        @gamestate: The game state of an Othello game
+        @playouts: The number of playouts to run
+        @time_budget_ms: The wall-clock time budget in milliseconds
+                         (DEFAULT_PLAYOUTS playouts are run if neither
+                         a number of playouts nor a budget is given)
+        @stop_event: An optional threading.Event that stops the search
+                     early once it is set
+        type gamestate: Othello or BitboardOthello
+        type playouts: int
+        type time_budget_ms: float
+        type stop_event: threading.Event
+        return: A SearchResult whose move is the (non 0-based) move with
+                the most playouts (None if the player has no valid
+                moves), whose value is that move's share of wins, whose
+                nodes are the playouts run, and whose principal
+                variation follows the most visited moves down the tree
+        rtype: othelloai.SearchResult
+        """
+        start = time.perf_counter()
+        stats = othelloai.SearchStats()
+        if gamestate.get_winner() != " " or not gamestate.legal_moves():
+            return stats.get_result(None, None, 0, [], pruned=False)
+        if playouts is None and time_budget_ms is None:
+            playouts = DEFAULT_PLAYOUTS
+        deadline = None if time_budget_ms is None else start + time_budget_ms/1000
+
+        geometry = bitboard.get_geometry(gamestate.get_num_rows(), gamestate.get_num_cols())
+        sign = 1 if gamestate.get_win_method() == ">" else -1
+        root = self._find_root(gamestate, geometry)
+
+        count = 0
+        while playouts is None or count < playouts:
+            if deadline is not None and time.perf_counter() > deadline and count > 0:
+                break
+            if stop_event is not None and stop_event.is_set() and count > 0:
+                break
+            if self._service is None:
+                self._playout(root, geometry, sign)
+                count += 1
+            else:
+                size = self._batch_size if playouts is None else min(self._batch_size, playouts-count)
+                self._playout_batch(root, geometry, gamestate.get_win_method(), size)
+                count += size
+
+        best = max(root.children, key=lambda child: child.visits)
+        pv = []
+        node = best
+        while node is not None:
+            if node.move_bit: #Passes are left out, as in the other searches
+                (i_row, i_col) = divmod(node.move_bit.bit_length()-1, geometry.num_cols)
+                pv.append((i_row+1, i_col+1))
+            node = max(node.children, key=lambda child: child.visits) if node.children else None
+        if tracing.level >= tracing.SEARCH:
+            tracing.emit(tracing.SEARCH, "mcts playouts={} root visits={} move={} wins={:.1f}/{}".format(
+                count, root.visits, pv[0], best.wins, best.visits))
+        (stats.nodes, stats.seconds) = (count, time.perf_counter() - start)
+        return stats.get_result(best.wins / best.visits, pv[0], len(pv), pv, pruned=False)
+
+
+    def _find_root(self, gamestate, geometry):
+        """
+        Finds the node of a position in the tree kept from the last search
+        (up to two plies below its root), or starts a new tree.
+        @gamestate: The game state of an Othello game
+        @geometry: The geometry of the board
+        type gamestate: Othello or BitboardOthello
+        type geometry: bitboard.BitGeometry
+        return: The root node for the search
+        rtype: _Node
+        """
+        (black, white) = bitboard.get_position_bits(gamestate)
+        turn = gamestate.get_turn()
+        if self._root is not None:
+            candidates = [self._root] + self._root.children +\
+                         [grandchild for child in self._root.children for grandchild in child.children]
+            for node in candidates:
+                if node.turn == turn and node.get_black_white() == (black, white):
+                    node.parent = None #Let the rest of the old tree go
+                    self._root = node
+                    return node
+
+        (own, opp) = (black, white) if turn == "B" else (white, black)
+        self._root = _Node(own, opp, turn, None, 0, geometry, self._rng)
+        return self._root
+
+
+    def _playout(self, root, geometry, sign):
+        """
+        Runs one playout: selection, expansion, a random rollout, and the
+        backpropagation of its result.
+        @root: The root node of the search
+        @geometry: The geometry of the board
+        @sign: 1 if the player with the most tiles wins or -1 otherwise
+        type root: _Node
+        type geometry: bitboard.BitGeometry
+        type sign: int
+        return: None
+        rtype: None
+        """
+        node = self._select(root, geometry, 0)
+        winner = rollout(node.own, node.opp, node.turn, geometry, sign, self._rng)
+        self._backpropagate(node, _RESULTS[winner], 0)
+
+
+    def _playout_batch(self, root, geometry, how_to_win, size):
+        """
+        Descends the tree several times with virtual loss, plays all the
+        leaves reached out at once through the playout service, and
+        backpropagates their results.
+        @root: The root node of the search
+        @geometry: The geometry of the board
+        @how_to_win: The win method of the game (">" or "<")
+        @size: The number of descents
+        type root: _Node
+        type geometry: bitboard.BitGeometry
+        type how_to_win: str
+        type size: int
+        return: None
+        rtype: None
+        """
+        leaves = [self._select(root, geometry, VIRTUAL_LOSS) for count in range(size)]
+        results = self._service.play(geometry.num_rows, geometry.num_cols, how_to_win,
+                                     [node.get_black_white() + (node.turn,) for node in leaves])
+        for (node, result) in zip(leaves, results):
+            self._backpropagate(node, result, VIRTUAL_LOSS)
+
+
+    def _select(self, root, geometry, virtual_loss):
+        """
+        Descends the tree by the UCT rule and expands one node.
+        @root: The root node of the search
+        @geometry: The geometry of the board
+        @virtual_loss: The visits (without wins) added to every node on
+                       the way down, which steers descents made before
+                       this one is backpropagated towards other nodes
+        type root: _Node
+        type geometry: bitboard.BitGeometry
+        type virtual_loss: int
+        return: The node to play out from
+        rtype: _Node
+        """
+        node = root
+        node.visits += virtual_loss
+        log = math.log
+        sqrt = math.sqrt
+        exploration = self._exploration
+        while not node.untried and node.children: #Selection
+            log_visits = log(node.visits)
+            node = max(node.children, key=lambda child: child.wins/child.visits +
+                       exploration*sqrt(log_visits/child.visits))
+            node.visits += virtual_loss
+
+        if node.untried: #Expansion
+            move_bit = node.untried.pop()
+            if move_bit:
+                flips = bitboard.flip_bits(node.own, node.opp, move_bit, geometry)
+                (own, opp) = (node.opp & ~flips, node.own | move_bit | flips)
+            else:
+                (own, opp) = (node.opp, node.own)
+            child = _Node(own, opp, "W" if node.turn == "B" else "B", node, move_bit,
+                          geometry, self._rng)
+            node.children.append(child)
+            node = child
+            node.visits += virtual_loss
+        return node
+
+
+    def _backpropagate(self, node, result, virtual_loss):
+        """
+        Adds the results of playouts from a node to it and its ancestors.
+        @node: The node the playouts started from
+        @result: A tuple in the form (black_wins, white_wins, draws)
+        @virtual_loss: The virtual loss added on the way down, taken back
+        type node: _Node
+        type result: tuple
+        type virtual_loss: int
+        return: None
+        rtype: None
+        """
+        (black_wins, white_wins, draws) = result
+        visits = black_wins + white_wins + draws - virtual_loss
+        while node is not None: #Backpropagation
+            node.visits += visits
+            if node.parent is not None:
+                node.wins += (black_wins if node.parent.turn == "B" else white_wins) + 0.5*draws
+            node = node.parent
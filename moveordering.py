@@ -0,0 +1,178 @@
+#Contains the class that orders moves for the alpha-beta AI.
+
+
+
+
+#Scores that rank the heuristics against each other. A transposition table move
+#always comes first, then the killer moves, then the rest by history and position.
+_TT_MOVE_SCORE = 1 << 60
+_KILLER_SCORE = 1 << 50
+
+#Weights of the squares (see get_square_weights)
+_CORNER_PRIORITY = 100
+_EDGE_PRIORITY = 10
+_C_SQUARE_PRIORITY = -20
+_X_SQUARE_PRIORITY = -50
+
+_SQUARE_WEIGHTS = dict()
+_STATIC_PRIORITIES = dict()
+
+
+def get_square_weights(num_rows, num_cols):
+    """
+    Returns the weight of every square for a board size, building them
+    on first use. Corners can never be flipped back so they weigh the
+    most, other edge squares are hard to flip, while the squares next to
+    a corner (C-squares along the edges and X-squares on the diagonal)
+    tend to hand the corner to the opponent. The move orderer and
+    batcheval.BatchEvaluator both rank squares by this table.
+    @num_rows: The number of rows of a board
+    @num_cols: The number of columns of a board
+    type num_rows: int
+    type num_cols: int
+    return: A tuple of rows, each a tuple of the weights of its squares
+    rtype: tuple
+    """
+    key = (num_rows, num_cols)
+    if key not in _SQUARE_WEIGHTS:
+        weights = [[_EDGE_PRIORITY if i_row in (0, num_rows-1) or i_col in (0, num_cols-1) else 0
+                    for i_col in range(num_cols)] for i_row in range(num_rows)]
+        for (i_row, i_col) in ((0, 0), (0, num_cols-1), (num_rows-1, 0), (num_rows-1, num_cols-1)):
+            d_row = 1 if i_row == 0 else -1
+            d_col = 1 if i_col == 0 else -1
+            weights[i_row][i_col] = _CORNER_PRIORITY
+            weights[i_row+d_row][i_col] = _C_SQUARE_PRIORITY
+            weights[i_row][i_col+d_col] = _C_SQUARE_PRIORITY
+            weights[i_row+d_row][i_col+d_col] = _X_SQUARE_PRIORITY
+        _SQUARE_WEIGHTS[key] = tuple(tuple(row) for row in weights)
+    return _SQUARE_WEIGHTS[key]
+
+
+def _get_static_priorities(num_rows, num_cols):
+    """
+    Returns the static move priorities for a board size (the square
+    weights of get_square_weights() by move), building them on first use.
+    @num_rows: The number of rows of a board
+    @num_cols: The number of columns of a board
+    type num_rows: int
+    type num_cols: int
+    return: A dictionary mapping every (non 0-based) move to its priority
+    rtype: dict
+    """
+    key = (num_rows, num_cols)
+    if key not in _STATIC_PRIORITIES:
+        _STATIC_PRIORITIES[key] = {(i_row+1, i_col+1): weight
+                                   for (i_row, row) in enumerate(get_square_weights(num_rows, num_cols))
+                                   for (i_col, weight) in enumerate(row)}
+    return _STATIC_PRIORITIES[key]
+
+
+
+
+class MoveOrderer:
+    """
+    Orders the moves of an alpha-beta search so that the moves likeliest to
+    cause a cutoff are searched first. Each heuristic can be switched off to
+    measure what it is worth.
+    """
+
+    def __init__(self, use_tt_move=True, use_killers=True,
+                 use_history=True, use_static=True, num_killers=2):
+        """
+        Initializes the state of a MoveOrderer object.
+        @use_tt_move: Search the transposition table's best move first
+        @use_killers: Search the moves that recently caused a cutoff
+                      at the same ply next
+        @use_history: Prefer moves that caused cutoffs anywhere in the
+                      tree, weighted by the depth of the cutoff
+        @use_static: Prefer corners and avoid the squares next to them
+        @num_killers: The number of killer moves kept per ply
+        type use_tt_move: bool
+        type use_killers: bool
+        type use_history: bool
+        type use_static: bool
+        type num_killers: int
+        return: None
+        rtype: None
+        """
+        self._use_tt_move = use_tt_move
+        self._use_killers = use_killers
+        self._use_history = use_history
+        self._use_static = use_static
+        self._num_killers = num_killers
+        self._killers = dict()  #ply -> list of moves, most recent first
+        self._history = dict()  #(player, move) -> score
+
+
+    def order(self, gamestate, valid_moves, ply, tt_move=None):
+        """
+        Orders the valid moves of a position.
+        @gamestate: The game state whose moves are ordered
+        @valid_moves: A dictionary of valid moves as given by legal_moves()
+        @ply: The distance of the position from the root of the search
+        @tt_move: The best move stored for the position, or None
+        type gamestate: Othello
+        type valid_moves: dict
+        type ply: int
+        type tt_move: tuple
+        return: A list of (move, flips) pairs, best candidates first.
+                Moves that score the same keep their row-major order.
+        rtype: list
+        """
+        turn = gamestate.get_turn()
+        killers = self._killers.get(ply, []) if self._use_killers else []
+        static = _get_static_priorities(gamestate.get_num_rows(), gamestate.get_num_cols())\
+                 if self._use_static else None
+
+        scored = []
+        for (move, flips) in valid_moves.items():
+            score = 0
+            if self._use_tt_move and move == tt_move:
+                score += _TT_MOVE_SCORE
+            if move in killers:
+                score += _KILLER_SCORE >> killers.index(move)
+            if self._use_history:
+                score += self._history.get((turn, move), 0)
+            if static is not None:
+                score += static[move]
+            scored.append((score, move, flips))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [(move, flips) for (score, move, flips) in scored]
+
+
+    def record_cutoff(self, player, move, ply, depth):
+        """
+        Records a move that caused a beta (or alpha) cutoff.
+        @player: The color of the player who made the move ("B" or "W")
+        @move: The move that caused the cutoff (non 0-based)
+        @ply: The distance of the position from the root of the search
+        @depth: The remaining depth the position was searched to
+        type player: str
+        type move: tuple
+        type ply: int
+        type depth: int
+        return: None
+        rtype: None
+        """
+        if self._use_killers:
+            killers = self._killers.setdefault(ply, [])
+            if move in killers:
+                killers.remove(move)
+            killers.insert(0, move)
+            del killers[self._num_killers:]
+        if self._use_history:
+            self._history[(player, move)] = self._history.get((player, move), 0) + depth*depth
+
+
+    def new_search(self):
+        """
+        Prepares for the search of a new move. The killer moves are
+        dropped since the plies they belong to have shifted, and the
+        history scores are halved so that old cutoffs slowly fade.
+        return: None
+        rtype: None
+        """
+        self._killers.clear()
+        for key in self._history:
+            self._history[key] //= 2
@@ -0,0 +1,243 @@
+#Contains the opening book used by the Mini Max AI and the tool that builds it.
+import argparse
+import itertools
+import mmap
+import struct
+import gamerecord
+import othello
+import selfplay
+import tracing
+
+
+
+
+#File layout: a header followed by records sorted by key. Each record holds the
+#Zobrist hash of a canonical position (see Othello.canonicalize), the book move
+#in the canonical position's frame (as i_row*num_cols + i_col), how many games
+#played that move, and the points they scored (2 per win and 1 per draw).
+_MAGIC = b"OTHBOOK1"
+_HEADER = struct.Struct("<8sBBcxI")   #magic, num_rows, num_cols, how_to_win, num_records
+_RECORD = struct.Struct("<QHHH")      #key, move, games, points
+_KEY = struct.Struct("<Q")
+
+_MAX_COUNT = 0xFFFF
+
+
+
+
+class OpeningBook:
+    """
+    A read-only opening book, memory-mapped from a file written by
+    build_book() and searched by binary search.
+    """
+
+    def __init__(self, path):
+        """
+        Opens an opening book file.
+        @path: The path of the book file
+        type path: str
+        return: None
+        rtype: None
+        """
+        with open(path, "rb") as book_file:
+            self._map = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self._num_rows, self._num_cols, how_to_win, self._num_records) =\
+            _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or len(self._map) != _HEADER.size + self._num_records*_RECORD.size:
+            self._map.close()
+            raise ValueError("Not an opening book file: {}".format(path))
+        self._how_to_win = how_to_win.decode()
+
+
+    def lookup(self, gamestate):
+        """
+        Finds the book move of a position.
+        @gamestate: The game state of an Othello game
+        type gamestate: Othello
+        return: The book move (non 0-based) or None if the position
+                is not in the book or the book is for another game
+        rtype: tuple
+        """
+        if (gamestate.get_num_rows(), gamestate.get_num_cols(), gamestate.get_win_method()) !=\
+           (self._num_rows, self._num_cols, self._how_to_win) or gamestate.get_winner() != " ":
+            return None
+
+        (key, transform) = gamestate.canonicalize()
+        (low, high) = (0, self._num_records)
+        while low < high:
+            mid = (low + high) // 2
+            if _KEY.unpack_from(self._map, _HEADER.size + mid*_RECORD.size)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low == self._num_records:
+            return None
+        (found, move, games, points) = _RECORD.unpack_from(self._map, _HEADER.size + low*_RECORD.size)
+        if found != key:
+            return None
+
+        (i_row, i_col) = divmod(move, self._num_cols)
+        move = othello.untransform_move(self._num_rows, self._num_cols, transform, (i_row+1, i_col+1))
+        if move not in gamestate.legal_moves(): #A hash collision
+            return None
+        if tracing.level >= tracing.MOVES:
+            tracing.emit(tracing.MOVES, "book move {} ({} games, {} points)".format(move, games, points))
+        return move
+
+
+    def get_size(self):
+        """
+        Returns the number of positions in the book.
+        return: The number of positions in the book
+        rtype: int
+        """
+        return self._num_records
+
+
+    def close(self):
+        """
+        Unmaps the book file.
+        return: None
+        rtype: None
+        """
+        self._map.close()
+
+
+
+
+def build_book(path, games, num_rows, num_cols, how_to_win=">", max_plies=12, min_games=2):
+    """
+    Builds an opening book from finished games and writes it to a file.
+    For every position reached in the first plies of the games, the book
+    keeps the move that scored best for the player who made it. Games on
+    another board or with another win method, and unfinished games, are
+    skipped.
+    @path: The path of the book file to write
+    @games: The games as gamerecord.GameRecord tuples (e.g. streamed
+            from a record file by gamerecord.read_games())
+    @num_rows: The number of rows of the games' board
+    @num_cols: The number of columns of the games' board
+    @how_to_win: The win method of the games (">" or "<")
+    @max_plies: How many moves of each game are added to the book
+    @min_games: How many games a move needs to have been played in
+    type path: str
+    type games: iterable
+    type num_rows: int
+    type num_cols: int
+    type how_to_win: str
+    type max_plies: int
+    type min_games: int
+    return: The number of positions written
+    rtype: int
+    """
+    tallies = dict()   #key -> {canonical move: [games, points]}
+    for record in games:
+        if (record.num_rows, record.num_cols, record.how_to_win) != (num_rows, num_cols, how_to_win)\
+           or record.winner == " ":
+            continue
+        for (gamestate, player, (row, col)) in itertools.islice(gamerecord.replay(record), max_plies):
+            (key, transform) = gamestate.canonicalize()
+            (c_row, c_col) = othello.transform_move(num_rows, num_cols, transform, (row, col))
+            move = (c_row-1)*num_cols + (c_col-1)
+            tally = tallies.setdefault(key, dict()).setdefault(move, [0, 0])
+            tally[0] += 1
+            tally[1] += 2 if record.winner == player else 1 if record.winner == "NONE" else 0
+
+    records = []
+    for (key, moves) in tallies.items():
+        #Only moves played often enough compete, so that a lucky one-off
+        #can't push a well-tried move (and with it the position) out of the book.
+        candidates = [item for item in moves.items() if item[1][0] >= min_games]
+        if candidates:
+            (move, (played, points)) = max(candidates,
+                                           key=lambda item: (item[1][1] / item[1][0], item[1][0]))
+            records.append((key, move, min(played, _MAX_COUNT), min(points, _MAX_COUNT)))
+    records.sort()
+
+    with open(path, "wb") as book_file:
+        book_file.write(_HEADER.pack(_MAGIC, num_rows, num_cols, how_to_win.encode(), len(records)))
+        for record in records:
+            book_file.write(_RECORD.pack(*record))
+    return len(records)
+
+
+def build_from_selfplay(path, strategy_a, strategy_b, num_games, num_rows=8, num_cols=8,
+                        how_to_win=">", max_plies=12, min_games=2, processes=None, seed=0):
+    """
+    Plays self-play matches for every first mover and starting layout
+    and builds an opening book from their games.
+    @path: The path of the book file to write
+    @strategy_a: The (name, options) of the first strategy
+    @strategy_b: The (name, options) of the second strategy
+    @num_games: The number of games played per first mover and layout
+    @num_rows: The number of rows of the board
+    @num_cols: The number of columns of the board
+    @how_to_win: The win method of the games (">" or "<")
+    @max_plies: How many moves of each game are added to the book
+    @min_games: How many games a move needs to have been played in
+    @processes: The number of worker processes (all cores by default)
+    @seed: The seed of the first game
+    type path: str
+    type strategy_a: tuple
+    type strategy_b: tuple
+    type num_games: int
+    type num_rows: int
+    type num_cols: int
+    type how_to_win: str
+    type max_plies: int
+    type min_games: int
+    type processes: int
+    type seed: int
+    return: The number of positions written
+    rtype: int
+    """
+    games = []
+    for first_mover in ("B", "W"):
+        for top_left in ("B", "W"):
+            results = selfplay.run_match(strategy_a, strategy_b, num_games, processes, seed, True,
+                                         num_rows=num_rows, num_cols=num_cols,
+                                         first_mover=first_mover, top_left=top_left,
+                                         how_to_win=how_to_win)
+            games += [selfplay.get_record(game) for game in results["game_records"]]
+            seed += num_games
+    return build_book(path, games, num_rows, num_cols, how_to_win, max_plies, min_games)
+
+
+def main():
+    """
+    Builds an opening book from the command line.
+    return: None
+    rtype: None
+    """
+    parser = argparse.ArgumentParser(description="Builds an Othello opening book from self-play.")
+    parser.add_argument("path", help="the book file to write")
+    parser.add_argument("--strategy-a", default="greedy_cpu")
+    parser.add_argument("--strategy-b", default="iterative_deepening:time_ms=100")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games per first mover and starting layout")
+    parser.add_argument("--rows", type=int, default=8)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--win-method", choices=[">", "<"], default=">")
+    parser.add_argument("--plies", type=int, default=12)
+    parser.add_argument("--min-games", type=int, default=2)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--records", metavar="PATH", default=None,
+                        help="build from the games of a record file instead of self-play")
+    args = parser.parse_args()
+
+    if args.records is not None:
+        count = build_book(args.path, gamerecord.read_games(args.records), args.rows, args.cols,
+                           args.win_method, args.plies, args.min_games)
+    else:
+        count = build_from_selfplay(args.path, selfplay.parse_strategy(args.strategy_a),
+                                    selfplay.parse_strategy(args.strategy_b), args.games,
+                                    args.rows, args.cols, args.win_method, args.plies,
+                                    args.min_games, args.processes, args.seed)
+    print("{} positions written to {}".format(count, args.path))
+
+
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,317 @@
 #Contains all of the classes corresponding to an othello gamestate.
 import math
+import random
+import tracing
 from collections import namedtuple
-from copy import deepcopy
 
 
 
+#What a move changed, so that Othello.undo() can take it back in place. flip_lst and
+#frontier_added hold flat cell indices (i_row*num_cols + i_col).
+UndoRecord = namedtuple("UndoRecord", ["i_row", "i_col", "flip_lst",
+                                       "turn", "game_over", "winner",
+                                       "frontier_added", "hash"])
+
+
+#Row and column steps of the eight compass directions (n, ne, e, se, s, sw, w, nw)
+_DIRECTIONS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+#Cell codes of the flat board
+EMPTY = 0
+BLACK = 1
+WHITE = 2
+_CODES = {" ": EMPTY, "B": BLACK, "W": WHITE}
+_CELLS = " BW"   #Cell code -> cell of the 2D view
+
+#The geometry of a board only depends on its dimensions, so it is built once per
+#size and shared by every game of that size. Cells are indexed by
+#i_row*num_cols + i_col. rays[index] lists, for each direction, the cells met when
+#walking away from a cell (rays shorter than two cells are left out since they can
+#never hold both a flipped tile and a closing tile), neighbors[index] the cells
+#adjacent to it, corners the (i_row, i_col) corners (top-left, top-right,
+#bottom-left, bottom-right) and moves[index] the (non 0-based) move of a cell.
+OthelloGeometry = namedtuple("OthelloGeometry", ["num_rows", "num_cols", "rays", "neighbors",
+                                                 "zobrist", "corners", "moves"])
+
+_GEOMETRIES = dict()
+
+#A snapshot (see Othello.to_bytes) is a header of three bytes, the number of rows,
+#the number of columns and the flags below, followed by the board packed four
+#cells to a byte, two bits a cell (the cell code), the first cell in the lowest bits.
+_SNAPSHOT_TURN_W = 1      #White is to move
+_SNAPSHOT_TOP_LEFT_W = 2  #White is the top-left player of the initial layout
+_SNAPSHOT_FEWEST = 4      #The player with the fewest tiles wins ("<")
+_SNAPSHOT_GAME_OVER = 8
+_UNPACKED = tuple(bytes((byte >> shift) & 3 for shift in (0, 2, 4, 6)) for byte in range(256))
+
+
+def get_geometry(num_rows, num_cols):
+    """
+    Returns the geometry of a board size, building it on first use.
+    @num_rows: The number of rows of a board
+    @num_cols: The number of columns of a board
+    type num_rows: int
+    type num_cols: int
+    return: The shared geometry of the board size
+    rtype: OthelloGeometry
+    """
+    key = (num_rows, num_cols)
+    if key not in _GEOMETRIES:
+        (rays, neighbors) = ([], [])
+        for i_row in range(num_rows):
+            for i_col in range(num_cols):
+                cell_rays = []
+                for (d_row, d_col) in _DIRECTIONS:
+                    ray = []
+                    ray_row, ray_col = i_row+d_row, i_col+d_col
+                    while 0 <= ray_row < num_rows and 0 <= ray_col < num_cols:
+                        ray.append(ray_row*num_cols + ray_col)
+                        ray_row, ray_col = ray_row+d_row, ray_col+d_col
+                    if len(ray) >= 2:
+                        cell_rays.append(tuple(ray))
+                rays.append(tuple(cell_rays))
+                neighbors.append(tuple((i_row+d_row)*num_cols + i_col+d_col
+                                       for (d_row, d_col) in _DIRECTIONS
+                                       if 0 <= i_row+d_row < num_rows and 0 <= i_col+d_col < num_cols))
+        corners = ((0, 0), (0, num_cols-1), (num_rows-1, 0), (num_rows-1, num_cols-1))
+        moves = tuple((index // num_cols + 1, index % num_cols + 1)
+                      for index in range(num_rows*num_cols))
+        _GEOMETRIES[key] = OthelloGeometry(num_rows, num_cols, tuple(rays), tuple(neighbors),
+                                           get_zobrist_keys(num_rows, num_cols), corners, moves)
+    return _GEOMETRIES[key]
+
+
+def pack_cells(codes):
+    """
+    Packs cell codes four to a byte.
+    @codes: The cell codes (EMPTY, BLACK or WHITE) of a flat board
+            whose length is a multiple of four
+    type codes: bytearray
+    return: The packed cells
+    rtype: bytes
+    """
+    return bytes(first | second << 2 | third << 4 | fourth << 6 for (first, second, third, fourth)
+                 in zip(codes[0::4], codes[1::4], codes[2::4], codes[3::4]))
+
+
+def unpack_cells(data):
+    """
+    Unpacks cell codes packed by pack_cells().
+    @data: The packed cells
+    type data: bytes
+    return: The cell codes of a flat board
+    rtype: bytearray
+    """
+    return bytearray(b"".join(map(_UNPACKED.__getitem__, data)))
+
+
+def get_snapshot_flags(turn, top_left, how_to_win, game_over):
+    """
+    Returns the flags byte of a snapshot.
+    @turn: The player to move ("B" or "W")
+    @top_left: The top-left player of the initial layout
+    @how_to_win: The win method of the game (">" or "<")
+    @game_over: Whether the game is over
+    type turn: str
+    type top_left: str
+    type how_to_win: str
+    type game_over: bool
+    return: The flags
+    rtype: int
+    """
+    return (_SNAPSHOT_TURN_W if turn == "W" else 0) |\
+           (_SNAPSHOT_TOP_LEFT_W if top_left == "W" else 0) |\
+           (_SNAPSHOT_FEWEST if how_to_win == "<" else 0) |\
+           (_SNAPSHOT_GAME_OVER if game_over else 0)
+
+
+def read_snapshot(data):
+    """
+    Splits a snapshot into its parts, checking that it is well formed.
+    @data: A snapshot made by to_bytes()
+    type data: bytes
+    return: A tuple in the form (num_rows, num_cols, turn, top_left,
+            how_to_win, game_over, codes), where codes are the cell
+            codes of the flat board
+    rtype: tuple
+    """
+    if len(data) < 3:
+        raise ValueError("Not an Othello snapshot")
+    (num_rows, num_cols, flags) = data[0], data[1], data[2]
+    if num_rows < 4 or num_cols < 4 or num_rows % 2 or num_cols % 2 or flags >= 16 or\
+       len(data) != 3 + num_rows*num_cols // 4:
+        raise ValueError("Not an Othello snapshot")
+    codes = unpack_cells(data[3:])
+    if codes.count(EMPTY) + codes.count(BLACK) + codes.count(WHITE) != len(codes):
+        raise ValueError("Not an Othello snapshot")
+    return (num_rows, num_cols, "W" if flags & _SNAPSHOT_TURN_W else "B",
+            "W" if flags & _SNAPSHOT_TOP_LEFT_W else "B",
+            "<" if flags & _SNAPSHOT_FEWEST else ">", bool(flags & _SNAPSHOT_GAME_OVER), codes)
+
+
+def from_bytes(data):
+    """
+    Restores a game from a snapshot made by to_bytes() (by either
+    engine).
+    @data: The snapshot
+    type data: bytes
+    return: The game state of the Othello game
+    rtype: Othello
+    """
+    (num_rows, num_cols, turn, top_left, how_to_win, game_over, codes) = read_snapshot(data)
+    gamestate = Othello.__new__(Othello)
+    (gamestate._num_rows, gamestate._num_cols, gamestate._turn) = (num_rows, num_cols, turn)
+    (gamestate._top_left, gamestate._how_to_win) = (top_left, how_to_win)
+    gamestate._set_board(codes)
+    if game_over:
+        gamestate._game_over = True
+        gamestate._set_winner()
+    return gamestate
+
+
+#Zobrist keys are drawn once per board size from a generator seeded with the size,
+#so a position hashes to the same value in every process and every run.
+ZobristKeys = namedtuple("ZobristKeys", ["black", "white", "side"])
+
+_ZOBRIST_TABLES = dict()
+
+
+def get_zobrist_keys(num_rows, num_cols):
+    """
+    Returns the Zobrist keys for a board size, drawing them on first use.
+    @num_rows: The number of rows of a board
+    @num_cols: The number of columns of a board
+    type num_rows: int
+    type num_cols: int
+    return: A ZobristKeys whose black and white attributes are tuples
+            of 64-bit keys indexed by i_row*num_cols + i_col, and whose
+            side attribute is the key mixed in when white is to move
+    rtype: ZobristKeys
+    """
+    key = (num_rows, num_cols)
+    if key not in _ZOBRIST_TABLES:
+        rng = random.Random("zobrist-{}x{}".format(num_rows, num_cols))
+        black = tuple(rng.getrandbits(64) for i in range(num_rows*num_cols))
+        white = tuple(rng.getrandbits(64) for i in range(num_rows*num_cols))
+        _ZOBRIST_TABLES[key] = ZobristKeys(black, white, rng.getrandbits(64))
+    return _ZOBRIST_TABLES[key]
+
+
+#Symmetries are built once per board size. A rectangular board has 4 (the identity,
+#both mirrors and the half turn) and a square board 4 more (both transposes and the
+#quarter turns). The two starting layouts (top_left "B" or "W") are mirror images.
+_SYMMETRIES = dict()
+
+
+def get_symmetries(num_rows, num_cols):
+    """
+    Returns the symmetries of a board size as cell permutations.
+    @num_rows: The number of rows of a board
+    @num_cols: The number of columns of a board
+    type num_rows: int
+    type num_cols: int
+    return: A tuple of (forward, inverse) pairs, where forward[index]
+            is the index a cell moves to and inverse undoes it. Cell
+            (i_row, i_col) has the index i_row*num_cols + i_col, and
+            the identity always comes first.
+    rtype: tuple
+    """
+    key = (num_rows, num_cols)
+    if key not in _SYMMETRIES:
+        (last_row, last_col) = (num_rows-1, num_cols-1)
+        maps = [lambda r, c: (r, c),
+                lambda r, c: (r, last_col-c),
+                lambda r, c: (last_row-r, c),
+                lambda r, c: (last_row-r, last_col-c)]
+        if num_rows == num_cols:
+            maps += [lambda r, c: (c, r),
+                     lambda r, c: (last_col-c, last_row-r),
+                     lambda r, c: (c, last_row-r),
+                     lambda r, c: (last_col-c, r)]
+        symmetries = []
+        for cell_map in maps:
+            forward = [0] * (num_rows*num_cols)
+            for i_row in range(num_rows):
+                for i_col in range(num_cols):
+                    (t_row, t_col) = cell_map(i_row, i_col)
+                    forward[i_row*num_cols + i_col] = t_row*num_cols + t_col
+            inverse = [0] * len(forward)
+            for (index, t_index) in enumerate(forward):
+                inverse[t_index] = index
+            symmetries.append((tuple(forward), tuple(inverse)))
+        _SYMMETRIES[key] = tuple(symmetries)
+    return _SYMMETRIES[key]
+
+
+def transform_move(num_rows, num_cols, transform, move):
+    """
+    Maps a move of a position onto the same move of its image under
+    a symmetry (e.g. onto the canonical position).
+    @num_rows: The number of rows of the board
+    @num_cols: The number of columns of the board
+    @transform: The index of the symmetry in get_symmetries()
+    @move: A (non 0-based) (row, col) move
+    type num_rows: int
+    type num_cols: int
+    type transform: int
+    type move: tuple
+    return: The mapped (non 0-based) move
+    rtype: tuple
+    """
+    forward = get_symmetries(num_rows, num_cols)[transform][0]
+    (i_row, i_col) = divmod(forward[(move[0]-1)*num_cols + move[1]-1], num_cols)
+    return (i_row+1, i_col+1)
+
+
+def untransform_move(num_rows, num_cols, transform, move):
+    """
+    Maps a move of a position's image under a symmetry (e.g. a move of
+    the canonical position) back onto the position itself.
+    @num_rows: The number of rows of the board
+    @num_cols: The number of columns of the board
+    @transform: The index of the symmetry in get_symmetries()
+    @move: A (non 0-based) (row, col) move of the image
+    type num_rows: int
+    type num_cols: int
+    type transform: int
+    type move: tuple
+    return: The mapped (non 0-based) move
+    rtype: tuple
+    """
+    inverse = get_symmetries(num_rows, num_cols)[transform][1]
+    (i_row, i_col) = divmod(inverse[(move[0]-1)*num_cols + move[1]-1], num_cols)
+    return (i_row+1, i_col+1)
+
+
+def canonical_hash(num_rows, num_cols, tiles, turn):
+    """
+    Finds the smallest Zobrist hash among the symmetric images of a
+    position, which every symmetric position shares.
+    @num_rows: The number of rows of the board
+    @num_cols: The number of columns of the board
+    @tiles: The tiles of the position as (index, color) pairs
+    @turn: The player to move ("B" or "W")
+    type num_rows: int
+    type num_cols: int
+    type tiles: list
+    type turn: str
+    return: A tuple in the form (hash, transform), where transform is
+            the index of the symmetry whose image has that hash
+    rtype: tuple
+    """
+    zobrist = get_zobrist_keys(num_rows, num_cols)
+    tiles = [(index, zobrist.black if color == "B" else zobrist.white) for (index, color) in tiles]
+    side = zobrist.side if turn == "W" else 0
+
+    best = None
+    for (transform, (forward, inverse)) in enumerate(get_symmetries(num_rows, num_cols)):
+        value = side
+        for (index, keys) in tiles:
+            value ^= keys[forward[index]]
+        if best is None or value < best[0]:
+            best = (value, transform)
+    return best
+
 
 class OthelloInvalidMoveError(Exception):
     """ An exception that represents an invalid move. """
@@ -12,7 +319,16 @@ class OthelloInvalidMoveError(Exception):
 
 
 class Othello:
-    """ A class that represents the game state of an Othello game. """
+    """
+    A class that represents the game state of an Othello game. The board
+    is a flat bytearray of cell codes (EMPTY, BLACK or WHITE) indexed by
+    i_row*num_cols + i_col, and everything that only depends on the board
+    size lives in a shared OthelloGeometry.
+    """
+
+    __slots__ = ("_num_rows", "_num_cols", "_turn", "_top_left", "_how_to_win", "_geometry",
+                 "_board", "_view", "_game_over", "_winner", "_frontier", "_hash", "_counts",
+                 "_empty_count")
 
     def __init__(self, num_rows = 4, num_cols = 4,
                  first_mover = "W", top_left = "B",
@@ -63,22 +379,9 @@ class Othello:
             self._how_to_win = how_to_win
 
         if initial_config == []:
-            self._board = self._make_board(num_rows, num_cols, top_left)
+            self._set_board(self._make_board(num_rows, num_cols, top_left))
         else:
-            self._board = deepcopy(initial_config)
-            
-        self._game_over = False
-        self._winner = " "
-        self._tl_cell = (0, 0)
-        self._tr_cell = (0, num_cols-1)
-        self._bl_cell = (num_rows-1, 0)
-        self._br_cell = (num_rows-1, num_cols-1)
-        self._ls_cells = [(c, 0) for c in range(1, num_rows-1)]
-        self._rs_cells = [(c, num_cols-1) for c in range(1, num_rows-1)]
-        self._ts_cells = [(0, c) for c in range(1, num_cols-1)]
-        self._bs_cells = [(num_rows-1, c) for c in range(1, num_cols-1)]
-        #^Note how ranges start from 1 and go to num_rows-1 to avoid corners,
-        #which are processed differently
+            self._set_board(bytearray(_CODES[cell] for row in initial_config for cell in row))
 
         
     def get_tl_cell(self):
@@ -87,7 +390,7 @@ class Othello:
         return: The top-left cell of this Othello game
         rtype: tuple
         """
-        return self._tl_cell
+        return self._geometry.corners[0]
 
 
     def get_tr_cell(self):
@@ -96,7 +399,7 @@ class Othello:
         return: The top-right cell of this Othello game
         rtype: tuple
         """
-        return self._tr_cell
+        return self._geometry.corners[1]
 
 
     def get_bl_cell(self):
@@ -105,7 +408,7 @@ class Othello:
         return: The bottom-left cell of this Othello game
         rtype: tuple
         """
-        return self._bl_cell
+        return self._geometry.corners[2]
 
 
     def get_br_cell(self):
@@ -114,7 +417,7 @@ class Othello:
         return: The bottom-right cell of this Othello game
         rtype: tuple
         """
-        return self._br_cell
+        return self._geometry.corners[3]
     
 
     def get_num_rows(self):
@@ -137,11 +440,42 @@ class Othello:
 
     def get_board(self):
         """
-        Returns a 2D list representation of the Othello board.
+        Returns a 2D list representation of the Othello board. The
+        list is built from the flat board when first asked for after
+        a move and shared until the next one, so it must not be changed.
         return: A 2D list representaiton of this Othello game
         rtype: list
         """
-        return self._board
+        if self._view is None:
+            (board, num_cols) = (self._board, self._num_cols)
+            self._view = [[_CELLS[code] for code in board[start:start+num_cols]]
+                          for start in range(0, len(board), num_cols)]
+        return self._view
+
+
+    def get_cell(self, i_row, i_col):
+        """
+        Returns the contents of one cell without building the 2D view.
+        @i_row: The 0-based row of the cell
+        @i_col: The 0-based column of the cell
+        type i_row: int
+        type i_col: int
+        return: The color of the tile on the cell ("B" or "W") or " "
+                if the cell is empty
+        rtype: str
+        """
+        return _CELLS[self._board[i_row*self._num_cols + i_col]]
+
+
+    def get_cells(self):
+        """
+        Returns the flat board as cell codes, for code that wants the
+        whole board without the 2D view (e.g. to build NumPy arrays).
+        return: The cell code (EMPTY, BLACK or WHITE) of every cell,
+                row by row (a copy)
+        rtype: bytes
+        """
+        return bytes(self._board)
 
 
     def get_turn(self):
@@ -169,17 +503,56 @@ class Othello:
                 list in the form [black_count, white_count]
         rtype: list
         """
-        counts = [0, 0]
-        for i in range(self._num_rows):
-            for j in range(self._num_cols):
-                if self._board[i][j] == "B":
-                    counts[0] += 1
-                elif self._board[i][j] == "W":
-                    counts[1] += 1
-        return counts
+        return [self._counts[0], self._counts[1]]
+
+
+    def get_empty_count(self):
+        """
+        Returns the count of empty cells.
+        return: The number of empty cells on the board
+        rtype: int
+        """
+        return self._empty_count
 
 
     #write function for getting how to win, getting top left...
+    def get_hash(self):
+        """
+        Returns the Zobrist hash of the position (board and turn).
+        return: The 64-bit Zobrist hash of this Othello game's position
+        rtype: int
+        """
+        return self._hash
+
+
+    def canonicalize(self):
+        """
+        Maps the position to its canonical form: the symmetric image
+        with the smallest Zobrist hash. Symmetric positions share it,
+        so caches keyed by it hold one entry for all of them.
+        return: A tuple in the form (hash, transform) containing the
+                hash of the canonical form and the index of the symmetry
+                that maps this position onto it (see transform_move()
+                and untransform_move() to map moves between the two)
+        rtype: tuple
+        """
+        tiles = [(index, _CELLS[code]) for (index, code) in enumerate(self._board) if code]
+        return canonical_hash(self._num_rows, self._num_cols, tiles, self._turn)
+
+
+    def to_bytes(self):
+        """
+        Takes a compact snapshot of the game: the board size, the
+        player to move, the top-left player, the win method, whether
+        the game is over and the board at two bits a cell (19 bytes for
+        an 8x8 game). from_bytes() restores it.
+        return: The snapshot
+        rtype: bytes
+        """
+        flags = get_snapshot_flags(self._turn, self._top_left, self._how_to_win, self._game_over)
+        return bytes((self._num_rows, self._num_cols, flags)) + pack_cells(self._board)
+
+
     def get_win_method(self):
         """
         Returns the win method for a game.
@@ -220,33 +593,131 @@ class Othello:
             if valid:
                 #Big Change: You decided to make determining validity
                 #            and flipping separate operations
-                self._flip(i_row, i_col, flip_lst)
+                self._flip(i_row*self._num_cols + i_col, flip_lst)
             else:
-                print("\nPlease enter a valid move!")
+                tracing.emit(tracing.MOVES, "invalid move {} {}".format(row, col))
                 return False
 
-            if self._board_is_full():
-                self._game_over = True
-                self._set_winner()        
-           
-            self._switch_turn(self._turn)
-            if not self._valid_move_exists(): #Check if the other player has any valid moves
-                print("\nNo valid moves exist for {0}. {0}'s turn has been skipped".format(self._turn))
-                self._switch_turn(self._turn) #Switch turn back to player before skip was determined
-                if not self._valid_move_exists(): #Check if the other player has any valid moves
-                    print("No valid moves exist for {0}. {0}'s turn has been skipped".format(self._turn))
-                    print("No moves exist for either player. GAME OVER")
-                    self._game_over = True
-                    self._set_winner()
-                    return False
+            passes = self._end_turn()
+            if passes >= 1:
+                skipped = "B" if self._turn == "W" else "W"
+                tracing.emit(tracing.MOVES, "no valid moves exist for {0}. {0}'s turn has been skipped".format(skipped))
+            if passes == 2:
+                tracing.emit(tracing.MOVES, "no valid moves exist for {0}. {0}'s turn has been skipped".format(self._turn))
+                tracing.emit(tracing.MOVES, "no moves exist for either player. GAME OVER")
+                return False
 
             return True
         elif self._game_over:
-            print("The game is over. No more moves can be made!")
+            tracing.emit(tracing.MOVES, "the game is over. No more moves can be made!")
             #TODO: Replace this^ with an exception later?
             return False
 
 
+    def legal_moves(self):
+        """
+        Finds every valid move for the player to move, along with
+        the tiles each one flips, in a single pass. Only the cells
+        on the frontier (empty cells next to a tile) are examined.
+        return: A dictionary whose keys are the valid moves as
+                (non 0-based) (row, col) tuples in row-major order
+                and whose values are the lists of (flat) cells to flip
+        rtype: dict
+        """
+        moves = dict()
+        if self._game_over:
+            return moves
+        names = self._geometry.moves
+        for index in sorted(self._frontier):
+            flip_lst = self._find_flips(index)
+            if flip_lst:
+                moves[names[index]] = flip_lst
+        return moves
+
+
+    def apply_move(self, row, col, flip_lst=None):
+        """
+        Performs a move in place without printing anything and returns
+        a record that undo() can use to take the move back. This lets
+        the AIs walk a game tree without copying the board.
+        @row: The row (non 0-based) where a tile is to be placed
+        @col: The column (non 0-based) where a tile is to be placed
+        @flip_lst: The cells this move flips, as given by legal_moves()
+                   for the current position. If omitted, the move is
+                   validated and its flips are found here.
+        type row: int
+        type col: int
+        type flip_lst: [int]
+        return: An undo record if the move was valid or None otherwise
+        rtype: UndoRecord
+        """
+        if self._game_over:
+            return None
+        i_row, i_col = row-1, col-1
+        if flip_lst is None:
+            (valid, flip_lst) = self._valid_placement(i_row, i_col)
+            if not valid:
+                return None
+
+        turn, game_over, winner, old_hash = self._turn, self._game_over, self._winner, self._hash
+        frontier_added = self._flip(i_row*self._num_cols + i_col, flip_lst)
+        self._end_turn()
+        return UndoRecord(i_row, i_col, flip_lst, turn, game_over,
+                          winner, frontier_added, old_hash)
+
+
+    def undo(self, record):
+        """
+        Takes back a move performed by apply_move().
+        @record: The undo record returned by apply_move()
+        type record: UndoRecord
+        return: None
+        rtype: None
+        """
+        board = self._board
+        opp_code = BLACK if record.turn == "W" else WHITE
+        index = record.i_row*self._num_cols + record.i_col
+        board[index] = EMPTY
+        for cell in record.flip_lst:
+            board[cell] = opp_code
+        self._view = None
+        self._frontier.difference_update(record.frontier_added)
+        self._frontier.add(index)
+        (mover, opp) = (0, 1) if record.turn == "B" else (1, 0)
+        self._counts[mover] -= len(record.flip_lst) + 1
+        self._counts[opp] += len(record.flip_lst)
+        self._empty_count += 1
+        self._turn = record.turn
+        self._game_over = record.game_over
+        self._winner = record.winner
+        self._hash = record.hash
+
+
+    def _end_turn(self):
+        """
+        Hands the turn over after a tile placement. A player without
+        any valid moves has their turn skipped, and the game ends if
+        the board is full or if neither player can move.
+        return: The number of turns skipped (0, 1 or 2, where 2 means
+                that neither player could move)
+        rtype: int
+        """
+        if self._board_is_full():
+            self._game_over = True
+            self._set_winner()        
+           
+        self._switch_turn(self._turn)
+        if not self._valid_move_exists(): #Check if the other player has any valid moves
+            self._switch_turn(self._turn) #Switch turn back to player before skip was determined
+            if not self._valid_move_exists(): #Check if the other player has any valid moves
+                self._game_over = True
+                self._set_winner()
+                return 2
+            return 1
+
+        return 0
+
+
     def _board_is_full(self):
         """
         Determines if the board for this Othello game is full.
@@ -254,26 +725,73 @@ class Othello:
                 or False otherwise.
         rtype: bool
         """
-        return (self.get_counts()[0] + self.get_counts()[1] == self._num_rows * self._num_cols)
+        return self._empty_count == 0
 
 
-    def _flip(self, i_row, i_col, flip_lst):
+    def _flip(self, index, flip_lst):
         """
         Flips all tiles generated by a tile placement.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        @flip_lst: The list of positions of tiles to flip
+        @index: The flat index of a tile placement
+        @flip_lst: The flat indices of the tiles to flip
                    as a result of the given tile placment
-        type i_row: int 
-        type i_col: int
-        type flip_lst: [tuple]
+        type index: int
+        type flip_lst: [int]
+        return: The empty cells that joined the frontier because
+                of the tile placement
+        rtype: [int]
+        """
+        board = self._board
+        code = _CODES[self._turn]
+        board[index] = code
+        for cell in flip_lst:
+            board[cell] = code
+        self._view = None
+        (mover, opp) = (0, 1) if code == BLACK else (1, 0)
+        self._counts[mover] += len(flip_lst) + 1
+        self._counts[opp] -= len(flip_lst)
+        self._empty_count -= 1
+
+        #A flipped tile swaps its opposing key for the mover's key.
+        zobrist = self._geometry.zobrist
+        (mover_keys, opp_keys) = (zobrist.black, zobrist.white) if code == BLACK\
+                                 else (zobrist.white, zobrist.black)
+        value = self._hash ^ mover_keys[index]
+        for cell in flip_lst:
+            value ^= mover_keys[cell] ^ opp_keys[cell]
+        self._hash = value
+
+        #The placed cell leaves the frontier and its empty neighbors join it.
+        frontier = self._frontier
+        frontier.discard(index)
+        frontier_added = []
+        for cell in self._geometry.neighbors[index]:
+            if not board[cell] and cell not in frontier:
+                frontier.add(cell)
+                frontier_added.append(cell)
+        return frontier_added
+    
+
+    def _set_board(self, board):
+        """
+        Sets up a game in progress on a board, with everything derived
+        from it.
+        @board: The flat board (taken over, not copied)
+        type board: bytearray
         return: None
         rtype: None
         """
-        self._board[i_row][i_col] = self._turn
-        for cell in flip_lst:
-            self._board[cell[0]][cell[1]] = self._turn
-    
+        self._geometry = get_geometry(self._num_rows, self._num_cols)
+        #^Shared by every game of this size, so nothing is rebuilt per instance
+        self._board = board
+        self._view = None #2D list view, rebuilt lazily after the board changes
+        self._game_over = False
+        self._winner = " "
+        self._frontier = self._make_frontier()
+        self._hash = self._compute_hash()
+        self._counts = self._count_tiles()
+        self._empty_count = len(board) - self._counts[0] - self._counts[1]
+        #^Kept up to date by _flip() and undo() so nothing rescans the board
+
 
     def _valid_placement(self, i_row, i_col):
         """
@@ -287,130 +805,45 @@ class Othello:
         type i_col: int
         return: A tuple whose first component is a boolean indicating
                 if the given tile placment is valid and whose second
-                component is a list of cells to flip as a result of
-                the tile placement
-        rtype: (bool, [])
-        """
-        if not self._empty_cell(i_row, i_col):
-            return (False, [])
-        adj_opp_cells = []
-
-        if (i_row, i_col) == self._tl_cell:
-            self._handle_border(i_row, i_col, adj_opp_cells, self._check_ls_corners, "tl")
-        elif (i_row, i_col) == self._tr_cell:
-            self._handle_border(i_row, i_col, adj_opp_cells, self._check_rs_corners, "tr")
-        elif (i_row, i_col) == self._bl_cell:
-            self._handle_border(i_row, i_col, adj_opp_cells, self._check_ls_corners, "bl")
-        elif (i_row, i_col) == self._br_cell:
-            self._handle_border(i_row, i_col, adj_opp_cells, self._check_rs_corners, "br")
-        elif (i_row, i_col) in self._ls_cells:
-            self._handle_border(i_row, i_col, adj_opp_cells, self._check_ls_and_rs, "ls")
-        elif (i_row, i_col) in self._ts_cells:
-            self._handle_border(i_row, i_col, adj_opp_cells, self._check_ts_and_bs, "ts")
-        elif (i_row, i_col) in self._rs_cells:
-            self._handle_border(i_row, i_col, adj_opp_cells, self._check_ls_and_rs, "rs")
-        elif (i_row, i_col) in self._bs_cells:
-            self._handle_border(i_row, i_col, adj_opp_cells, self._check_ts_and_bs, "bs")
-        else:
-            self._check_inner_dirs(i_row, i_col, adj_opp_cells)
-
-        #print("\nFOR TESTING. adj_opp_cells: ", adj_opp_cells)
-
-        if adj_opp_cells == []:
-            return (False, [])
-        else:
-            can_place, flip_lst = self._flip_dirs(adj_opp_cells)
-            return (can_place, flip_lst)
-
-
-    def _flip_dirs(self, adj_opp_cells):
-        """
-        Determines the direction to consider flips for
-        each cell in the given dj_opp_cells list.
-        @adj_opp_cells: A list of cells that are adjacent
-                        and opposite in color to some piece
-        type adj_opp_cells: [tuple]
-        return: A tuple whose first component is a boolean indicating
-                if the given tile placment is valid and whose second
-                component is a list of cells to flip as a result of
-                the tile placement
-        rtype: (bool, [])
-        """
-        lst = []
-        for cell in adj_opp_cells:
-            lst.append(self._label_flips(cell[0], cell[1], cell[2]))
-
-        #print("FOR TESTING: lst: ", lst) #FOR TESTING
-        lst2 = []
-        for e in lst: #lst has elements of the form (boolean, list)
-            if e[0] == True:
-                lst2.append(e)
-
-        if lst2 == []:
-            return (False, lst2)
-        else:
-            lst3 = []
-            for e in lst2:
-                for t in e[1]:
-                    lst3.append(t)
-            return (True, lst3)
-
-
-    def _label_flips(self, i_row, i_col, direction):
-        """
-        Considers tiles to be potentially flipped given a direction.
-        Returns True and a list of cells to flip if the flip sequence
-        is valid. Else, returns False and and empty list.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        @direction: The direction in which to carry out
-                    tile flips ("n", "ne", "e", "se", "s",
-                    "sw", "w", "nw")
-        type i_row: int 
-        type i_col: int
-        type direction: str
-        return: A tuple whose first component is a boolean indicating
-                if the given tile placment is valid and whose second
-                component is a list of cells to flip as a result of
-                the tile placement
+                component is a list of (flat) cells to flip as a result
+                of the tile placement
         rtype: (bool, [])
         """
-        vert_move, hori_move = i_row, i_col  #Initially start at the opposing cell
-        candidates = []
-
-        #Perhaps could have done if 0 > vert_move > num_rows and 0 > hori_move > num_cols instead!
-        while ((self._board[vert_move][hori_move] != self._turn) and not  #This can be True in one of two ways! 
-               self._is_dead_end(vert_move, hori_move, direction) and     #   think: "W" or " "
-               self._board[vert_move][hori_move] != " "):
-            candidates.append((vert_move, hori_move))
-            if direction == "n":
-                vert_move += 1
-            elif direction == "ne":
-                hori_move -= 1
-                vert_move += 1
-            elif direction == "e":
-                hori_move -= 1
-            elif direction == "se":
-                hori_move -= 1
-                vert_move -= 1
-            elif direction == "s":
-                vert_move -= 1
-            elif direction == "sw":
-                hori_move += 1
-                vert_move -= 1
-            elif direction == "w":
-                hori_move += 1
-            elif direction == "nw":
-                hori_move += 1
-                vert_move += 1
-        #Watch out, index can go out of range after several iterations
-        #of the loop body, not just once you enter the loop!!!
-
-        ending_cell = self._board[vert_move][hori_move] 
-        if ending_cell == self._turn: #If the ending cell is same color, then flip can be done.
-            return (True, candidates)
-        else:
-            return (False, [])
+        if not (0 <= i_row < self._num_rows and 0 <= i_col < self._num_cols):
+            return (False, []) #A flat index would wrap onto another cell
+        flip_lst = self._find_flips(i_row*self._num_cols + i_col)
+        return (flip_lst != [], flip_lst)
+
+
+    def _find_flips(self, index):
+        """
+        Finds the tiles a placement of the player to move would flip.
+        @index: The flat index of a tile placement
+        type index: int
+        return: The flat indices of the tiles to flip (empty if the
+                placement is not valid)
+        rtype: [int]
+        """
+        board = self._board
+        if board[index]:
+            return []
+
+        #Walk outwards along each precomputed ray. The opposing tiles passed
+        #over are flipped if the ray is closed off by one of our own tiles.
+        own = _CODES[self._turn]
+        flip_lst = []
+        for ray in self._geometry.rays[index]:
+            run = 0
+            for cell in ray:
+                code = board[cell]
+                if code == own:
+                    if run > 0:
+                        flip_lst.extend(ray[:run])
+                    break
+                elif not code:
+                    break
+                run += 1
+        return flip_lst
 
 
     def _set_winner(self):
@@ -420,16 +853,7 @@ class Othello:
         return: None
         rtype: None
         """
-        b_count = 0
-        w_count = 0
-
-        for i_row in range(self._num_rows):
-            for i_col in range(self._num_cols):
-                if self._board[i_row][i_col] == "B":
-                    b_count += 1
-                elif self._board[i_row][i_col] == "W":
-                    w_count += 1
-
+        (b_count, w_count) = self._counts
         if b_count == w_count:
             self._winner = "NONE"
         elif self._how_to_win == ">":
@@ -440,295 +864,59 @@ class Othello:
 
     def _valid_move_exists(self):
         """
-        Loops through the game board to determine
-        if any valid moves exist.
-        return: A list of valid moves
-        rtype: [tuple]
+        Loops through the frontier to determine if any valid moves
+        exist, stopping at the first one found.
+        return: True if a valid move exists or False otherwise
+        rtype: bool
         """
-        lst = []
-        for i_row in range(self._num_rows):
-            for i_col in range(self._num_cols):
-                if self._valid_placement(i_row, i_col)[0]:
-                    lst.append((i_row, i_col))
-
-        return lst != []  #If lst != [], then the list has elements -> valid move(s) exist
+        for index in self._frontier:
+            if self._find_flips(index):
+                return True
+        return False
 
 
-    def _handle_border(self, i_row, i_col, adj_opp_cells, check_func, loc):
+    def _compute_hash(self):
         """
-        Checks for opposing tiles adjacent to cells on the border and
-        appends these titles to adj_opp_cells.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        @adj_opp_cells: A list of cells that are adjacent
-                        and opposite in color to some piece
-        @check_func: Any one of the helper functions of this Othello
-                     object: _check_ls_corners, _check_rs_corners,
-                             _check_ls_and_rs, _check_ts_and_bs
-        @loc: A border location (top-side, left-side, right-side, bottom-side)
-        type i_row: int
-        type i_col: int
-        type adj_opp_cells: [tuple]
-        type check_func: function
-        type loc: str
-        return: None
-        rtype: None
+        Computes the Zobrist hash of the position from scratch. Only
+        used to set up the incrementally kept hash.
+        return: The 64-bit Zobrist hash of this Othello game's position
+        rtype: int
         """
-        check_func(i_row, i_col, adj_opp_cells, loc)
-        #check_func will be any of the five functions listed below
+        zobrist = self._geometry.zobrist
+        value = zobrist.side if self._turn == "W" else 0
+        for (index, code) in enumerate(self._board):
+            if code == BLACK:
+                value ^= zobrist.black[index]
+            elif code == WHITE:
+                value ^= zobrist.white[index]
+        return value
 
 
-    def _check_ls_corners(self, i_row, i_col, adj_opp_cells, loc):
+    def _count_tiles(self):
         """
-        Checks for opposing tiles adjacent to the left side
-        corners (top left and bottom left) of the game board.
-        Appends the corresponding cells to adj_opp_cells.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        @adj_opp_cells: A list of cells that are adjacent
-                        and opposite in color to some piece
-        @loc: A border location (tl, tr, bl, br, ts, bs)
-        type i_row: int
-        type i_col: int
-        type adj_opp_cells: [tuple]
-        type loc: str
-        return: None
-        rtype: None
+        Counts the black and white tiles by scanning the whole board.
+        Only used to set up the incrementally kept counts.
+        return: The count of black and white tiles in a
+                list in the form [black_count, white_count]
+        rtype: list
         """
-        shift = 1 if loc == "tl" else -1  #either top-left or bottom-left
-        opp_player = "B" if self._turn == "W" else "W"
-
-        #Note that loc corresponds to the position of the tile to be placed.
-        #Also, the indices correspond to an adjacent opposing cell to be considered.
-        #The compass direction corresponds to the direction in which the adjacent opposing
-        #cell will be "entered" by the tile to be placed.
-        if self._board[i_row+shift][i_col] == opp_player:   #up/down
-            if loc == "tl":
-                adj_opp_cells.append((i_row+shift, i_col, "n"))
-            elif loc == "bl":
-                adj_opp_cells.append((i_row+shift, i_col, "s")) 
-        if self._board[i_row+shift][i_col+1] == opp_player: #down-diag/up-diag
-            if loc == "tl":
-                adj_opp_cells.append((i_row+shift, i_col+1, "nw")) 
-            elif loc == "bl":
-                adj_opp_cells.append((i_row+shift, i_col+1, "sw")) 
-        if self._board[i_row][i_col+1] == opp_player:       #right
-            adj_opp_cells.append((i_row, i_col+1, "w"))
-            
+        return [self._board.count(BLACK), self._board.count(WHITE)]
 
-    def _check_rs_corners(self, i_row, i_col, adj_opp_cells, loc):
-        """
-        Checks for opposing tiles adjacent to the right side
-        corners (top right and bottom right) of the game board.
-        Appends the corresponding cells to adj_opp_cells.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        @adj_opp_cells: A list of cells that are adjacent
-                        and opposite in color to some piece
-        @loc: A border location (tl, tr, bl, br, ts, bs)
-        type i_row: int
-        type i_col: int
-        type adj_opp_cells: [tuple]
-        type loc: str
-        return: None
-        rtype: None
-        """
-        shift = 1 if loc == "tr" else -1  #either top-right or bottom-right
-        opp_player = "B" if self._turn == "W" else "W"
-        
-        if self._board[i_row][i_col-1] == opp_player:       #left
-            adj_opp_cells.append((i_row, i_col-1, "e"))
-        if self._board[i_row+shift][i_col-1] == opp_player: #up-diag/down-diag
-            if loc == "tr":
-                adj_opp_cells.append((i_row+shift, i_col-1, "ne"))
-            elif loc == "br":
-                adj_opp_cells.append((i_row+shift, i_col-1, "se"))
-        if self._board[i_row+shift][i_col] == opp_player:   #up/down
-            if loc == "tr":
-                adj_opp_cells.append((i_row+shift, i_col, "n"))
-            elif loc == "br":
-                adj_opp_cells.append((i_row+shift, i_col, "s"))
-
-
-    def _check_ls_and_rs(self, i_row, i_col, adj_opp_cells, loc):
-        """
-        Checks for opposing tiles adjacent to the left and right
-        side borders of the game board. Appends the corresponding
-        cell to adj_opp_cells.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        @adj_opp_cells: A list of cells that are adjacent
-                        and opposite in color to some piece
-        @loc: A border location (tl, tr, bl, br, ts, bs)
-        type i_row: int
-        type i_col: int
-        type adj_opp_cells: [tuple]
-        type loc: str
-        return: None
-        rtype: None
-        """
-        shift = 1 if loc == "ls" else -1  #either left side or right side
-        opp_player = "B" if self._turn == "W" else "W"
-
-        if self._board[i_row-1][i_col] == opp_player:        #up
-            adj_opp_cells.append((i_row-1, i_col, "s"))
-        if self._board[i_row-1][i_col+shift] == opp_player:  #up-diag
-            if loc == "ls":
-                adj_opp_cells.append((i_row-1, i_col+shift, "sw"))
-            elif loc == "rs":
-                adj_opp_cells.append((i_row-1, i_col+shift, "se"))
-        if self._board[i_row][i_col+shift] == opp_player:    #right
-            if loc == "ls":
-                adj_opp_cells.append((i_row, i_col+shift, "w"))
-            elif loc == "rs":
-                adj_opp_cells.append((i_row, i_col+shift, "e"))
-        if self._board[i_row+1][i_col+shift] == opp_player:  #down-diag
-            if loc == "ls":
-                adj_opp_cells.append((i_row+1, i_col+shift, "nw"))
-            elif loc == "rs":
-                adj_opp_cells.append((i_row+1, i_col+shift, "ne"))
-        if self._board[i_row+1][i_col] == opp_player:        #down
-            adj_opp_cells.append((i_row+1, i_col, "n"))
-
-
-    def _check_ts_and_bs(self, i_row, i_col, adj_opp_cells, loc):
-        """
-        Checks for opposing tiles adjacent to the top and bottom side
-        borders of the game board. Appends the corresponding cells to
-        adj_opp_cells.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        @adj_opp_cells: A list of cells that are adjacent
-                        and opposite in color to some piece
-        @loc: A border location (tl, tr, bl, br, ts, bs)
-        type i_row: int
-        type i_col: int
-        type adj_opp_cells: [tuple]
-        type loc: str
-        return: None
-        rtype: None
-        """
-        shift = 1 if loc == "ts" else -1  #Either top side or bottom side
-        opp_player = "B" if self._turn == "W" else "W"
-        
-        if self._board[i_row][i_col-1] == opp_player:        #left
-            adj_opp_cells.append((i_row, i_col-1, "e"))        
-        if self._board[i_row+shift][i_col-1] == opp_player:  #left-diag
-            if loc == "ts":
-                adj_opp_cells.append((i_row+shift, i_col-1, "ne"))
-            elif loc == "bs":
-                adj_opp_cells.append((i_row+shift, i_col-1, "se"))
-        if self._board[i_row+shift][i_col] == opp_player:    #up/down
-            if loc == "ts":
-                adj_opp_cells.append((i_row+shift, i_col, "n"))
-            elif loc == "bs":
-                adj_opp_cells.append((i_row+shift, i_col, "s"))
-        if self._board[i_row+shift][i_col+1] == opp_player:  #right-diag
-            if loc == "ts":
-                adj_opp_cells.append((i_row+shift, i_col+1, "nw"))
-            elif loc == "bs":
-                adj_opp_cells.append((i_row+shift, i_col+1, "sw"))
-        if self._board[i_row][i_col+1] == opp_player:        #right
-            adj_opp_cells.append((i_row, i_col+1, "w"))
 
-            
-    def _check_inner_dirs(self, i_row, i_col, adj_opp_cells):
+    def _make_frontier(self):
         """
-        Checks for opposing tiles adjacent to the inner cells of the
-        game board and appends these cells to adj_opp_cells.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        @adj_opp_cells: A list of cells that are adjacent
-                        and opposite in color to some piece
-        type i_row: int
-        type i_col: int
-        type adj_opp_cells: [tuple]
-        return: None
-        rtype: None
-        """
-        opp_player = "B" if self._turn == "W" else "W"
-        
-        if self._board[i_row-1][i_col] == opp_player:      #north, tile to be placed will enter from the south
-            adj_opp_cells.append((i_row-1, i_col, "s")) 
-        if self._board[i_row-1][i_col+1] == opp_player:    #northeast, tile to be placed will enter from the sw
-            adj_opp_cells.append((i_row-1, i_col+1, "sw"))
-        if self._board[i_row][i_col+1] == opp_player:      #east, tile to be placed will enter from the west
-            adj_opp_cells.append((i_row, i_col+1, "w"))
-        if self._board[i_row+1][i_col+1] == opp_player:    #southeast, tile to be placed will enter from the nw
-            adj_opp_cells.append((i_row+1, i_col+1, "nw"))
-        if self._board[i_row+1][i_col] == opp_player:      #south, tile to be placed will enter from the north
-            adj_opp_cells.append((i_row+1, i_col, "n"))
-        if self._board[i_row+1][i_col-1] == opp_player:    #southwest, tile to be placed will enter from the ne
-            adj_opp_cells.append((i_row+1, i_col-1, "ne"))
-        if self._board[i_row][i_col-1] == opp_player:      #west, tile to be placed will enter from the east.
-            adj_opp_cells.append((i_row, i_col-1, "e"))
-        if self._board[i_row-1][i_col-1] == opp_player:    #northwest, tile to be placed will enter from the se.
-            adj_opp_cells.append((i_row-1, i_col-1, "se"))
-
-
-    #Instead of this _is_dead_end function, couldn't I have just
-    #checked if i_row > num_rows, i_row < num_rows, i_col > num_cols,
-    #or i_col < num_cols? Hmmm.        
-    def _is_dead_end(self, i_row, i_col, direction):
-        """
-        Determines if the provided row and column is a dead-end.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        @direction: The direction in which to carry out
-                    tile flips ("n", "ne", "e", "se", "s",
-                    "sw", "w", "nw")
-        type i_row: int
-        type i_col: int
-        type direction: str
-        return: True if the provided row and column is
-                a dead-end or False otherwise.
-        rtype: bool
-        """
-        return (((i_row, i_col) in self._ts_cells and direction == "s") or
-                ((i_row, i_col) in self._ts_cells and direction == "se") or
-                ((i_row, i_col) in self._ts_cells and direction == "sw") or
-                ((i_row, i_col) in self._ls_cells and direction == "e") or
-                ((i_row, i_col) in self._ls_cells and direction == "ne") or
-                ((i_row, i_col) in self._ls_cells and direction == "se") or
-                ((i_row, i_col) in self._bs_cells and direction == "n") or
-                ((i_row, i_col) in self._bs_cells and direction == "nw") or
-                ((i_row, i_col) in self._bs_cells and direction == "ne") or
-                ((i_row, i_col) in self._rs_cells and direction == "w") or
-                ((i_row, i_col) in self._rs_cells and direction == "nw") or
-                ((i_row, i_col) in self._rs_cells and direction == "sw") or
-                ((i_row, i_col) == self._tl_cell and direction == "s") or
-                ((i_row, i_col) == self._tl_cell and direction == "se") or
-                ((i_row, i_col) == self._tl_cell and direction == "e") or
-                ((i_row, i_col) == self._bl_cell and direction == "n") or
-                ((i_row, i_col) == self._bl_cell and direction == "ne") or
-                ((i_row, i_col) == self._bl_cell and direction == "e") or
-                ((i_row, i_col) == self._tr_cell and direction == "w") or
-                ((i_row, i_col) == self._tr_cell and direction == "sw") or
-                ((i_row, i_col) == self._tr_cell and direction == "s") or
-                ((i_row, i_col) == self._br_cell and direction == "w") or
-                ((i_row, i_col) == self._br_cell and direction == "nw") or
-                ((i_row, i_col) == self._br_cell and direction == "n"))
-
-                
-    def _cell_in_boundary(self, i_row, i_col):
-        """
-        Determines if a given cell is inside of the board's boundaries.
-        @i_row: The 0-based row of a tile placement
-        @i_col: The 0-based col of a tile placement
-        type i_row: int
-        type i_col: int
-        return: True if the provided row and column is
-                a boundary or False otherwise.
-        rtype: bool
+        Builds the frontier of the board from scratch. The frontier
+        is the set of empty cells adjacent to at least one tile, which
+        are the only cells where a valid move can be made.
+        return: The set of (flat) cells on the frontier
+        rtype: set
         """
-        return ((i_row, i_col) == self._tl_cell or
-                (i_row, i_col) == self._tr_cell or
-                (i_row, i_col) == self._bl_cell or
-                (i_row, i_col) == self._br_cell or
-                (i_row, i_col) in self._ls_cells or
-                (i_row, i_col) in self._rs_cells or
-                (i_row, i_col) in self._ts_cells or
-                (i_row, i_col) in self._bs_cells)
+        (board, neighbors) = (self._board, self._geometry.neighbors)
+        frontier = set()
+        for (index, code) in enumerate(board):
+            if code:
+                frontier.update(neighbors[index])
+        return {index for index in frontier if not board[index]}
 
 
     def _empty_cell(self, i_row, i_col):
@@ -742,7 +930,7 @@ class Othello:
                 empty or False otherwise.
         rtype: bool
         """
-        return self._board[i_row][i_col] == " "
+        return not self._board[i_row*self._num_cols + i_col]
 
 
     def _switch_turn(self, cur_player):
@@ -756,6 +944,7 @@ class Othello:
             self._turn = "B"
         else:
             self._turn = "W"
+        self._hash ^= self._geometry.zobrist.side
             
 
     def _make_board(self, rows, cols, top_left):
@@ -768,27 +957,18 @@ class Othello:
         type rows: int
         type cols: int
         type top_left: str 
-        return: A 2D list representation of this Othello game
-        rtype: list
+        return: A flat board of this Othello game
+        rtype: bytearray
         """
-        board = []
-        for i in range(rows):
-            board.append([])
-            for j in range(cols):
-                board[-1].append(" ")
+        board = bytearray(rows*cols)
 
         top_left_row = math.floor(self._num_rows/2)
         top_left_col = math.floor(self._num_cols/2)
-        if top_left == "B":
-            board[top_left_row-1][top_left_col-1] = top_left
-            board[top_left_row-1][top_left_col+1-1] = "W"  
-            board[top_left_row+1-1][top_left_col-1] = "W" 
-            board[top_left_row+1-1][top_left_col+1-1] = "B" 
-        elif top_left == "W":
-            board[top_left_row-1][top_left_col-1] = top_left 
-            board[top_left_row-1][top_left_col+1-1] = "B"    
-            board[top_left_row+1-1][top_left_col-1] = "B"  
-            board[top_left_row+1-1][top_left_col+1-1] = "W"
+        (same, other) = (BLACK, WHITE) if top_left == "B" else (WHITE, BLACK)
+        board[(top_left_row-1)*cols + top_left_col-1] = same
+        board[(top_left_row-1)*cols + top_left_col] = other
+        board[top_left_row*cols + top_left_col-1] = other
+        board[top_left_row*cols + top_left_col] = same
 
         return board
 
@@ -800,11 +980,11 @@ class Othello:
         return: None
         rtype: None
         """
-        for i_row in range(self._num_rows):
+        for row in self.get_board():
             print()
-            for i_col in range(self._num_cols):
-                if self._board[i_row][i_col] != " ":
-                    print(self._board[i_row][i_col], end = " ")
+            for cell in row:
+                if cell != " ":
+                    print(cell, end = " ")
                 else:
                     print(".", end = " ")
         print()
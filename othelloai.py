@@ -1,50 +1,156 @@
 #Contains the classes that represent the AIs for the game.
 
 import time
-import othello
-from collections import defaultdict
+import transposition
+import moveordering
+import endgame
+import tracing
+from collections import defaultdict, namedtuple
 import random
 
+
+
+#What a search found and how much work it took. pv is the principal variation
+#(the moves both sides are expected to play, starting with move), time_ms the
+#time spent and nps the nodes searched per second. cutoff_ratio is the share of
+#the searched nodes with children that were cut off early and tt_hit_rate the
+#share of transposition table lookups that found their position. They are None
+#for searches that don't prune or don't use a table.
+SearchResult = namedtuple("SearchResult", ["value", "move", "depth", "nodes", "nps",
+                                           "time_ms", "pv", "cutoff_ratio", "tt_hit_rate"])
+
+
+class SearchStats:
+    """
+    The counts kept by a search while it runs. One object can be handed
+    to several searches to add up their work (e.g. the iterations of an
+    iterative deepening search, or the root moves of a parallel one).
+    """
+
+    __slots__ = ("nodes", "interior", "cutoffs", "tt_lookups", "tt_hits", "seconds", "pv")
+
+    def __init__(self):
+        """
+        Initializes the counts of a SearchStats object.
+        return: None
+        rtype: None
+        """
+        self.nodes = 0        #Positions visited (leaves included)
+        self.interior = 0     #Positions whose moves were searched
+        self.cutoffs = 0      #Positions whose remaining moves were cut off
+        self.tt_lookups = 0
+        self.tt_hits = 0
+        self.seconds = 0.0
+        self.pv = []          #Triangular PV table: pv[ply] is the best line found from ply
+
+
+    def add(self, other):
+        """
+        Adds the counts of another SearchStats object to this one.
+        @other: The counts to add
+        type other: SearchStats
+        return: None
+        rtype: None
+        """
+        self.nodes += other.nodes
+        self.interior += other.interior
+        self.cutoffs += other.cutoffs
+        self.tt_lookups += other.tt_lookups
+        self.tt_hits += other.tt_hits
+        self.seconds += other.seconds
+
+
+    def get_result(self, value, move, depth, pv, pruned=True):
+        """
+        Builds the result of a search from the counts.
+        @value: The value of the position
+        @move: The best move
+        @depth: The depth searched
+        @pv: The principal variation
+        @pruned: Whether the search counted its cutoffs (otherwise
+                 the cutoff ratio is None)
+        type value: float
+        type move: tuple
+        type depth: int
+        type pv: list
+        type pruned: bool
+        return: The result of the search
+        rtype: SearchResult
+        """
+        return SearchResult(value, move, depth, self.nodes,
+                            self.nodes / self.seconds if self.seconds > 0 else 0.0,
+                            self.seconds * 1000, pv,
+                            (self.cutoffs / self.interior if self.interior else 0.0) if pruned else None,
+                            self.tt_hits / self.tt_lookups if self.tt_lookups else None)
+
+
+def format_result(result):
+    """
+    Describes a search result in one line (e.g. for a log or a label).
+    @result: The result of a search
+    type result: SearchResult
+    return: A one-line summary of the result
+    rtype: str
+    """
+    parts = ["depth {} move {} value {}".format(result.depth, result.move, result.value),
+             "{} nodes in {:.0f} ms ({:.1f}k nodes/s)".format(result.nodes, result.time_ms,
+                                                             result.nps / 1000)]
+    if result.cutoff_ratio is not None:
+        parts.append("cutoffs {:.0%}".format(result.cutoff_ratio))
+    if result.tt_hit_rate is not None:
+        parts.append("tt hits {:.0%}".format(result.tt_hit_rate))
+    parts.append("pv " + " ".join("{},{}".format(row, col) for (row, col) in result.pv))
+    return " | ".join(parts)
+
+
 #Not so much greedy as much as randomly picking any available move?...Actually, the algorithm will consider
 #all of the available moves and pick the one that would yield the best score, hence greediness.
 def greedy_cpu(gamestate, cpu_player, move_processor):
     '''Executes a cpu move based on a greedy algorithm.'''
     while gamestate.get_turn() == cpu_player:
         time.sleep(0.5) #To simulate "thinking"
-        valid_moves_lst = _cpu_find_moves(gamestate)
-        print("Valid Moves List: ", valid_moves_lst) #Note how valid_moves_lst has "user-friendly" move descriptions (non zero-based numbers)
-        if valid_moves_lst == []: #If there are no valid moves, then the CPU can't make a move!
+        cpu_move = greedy_move(gamestate, cpu_player)
+        if cpu_move is None: #If there are no valid moves, then the CPU can't make a move!
             break
 
-        move_dict = defaultdict(list)
-        for move in valid_moves_lst:
-            dummy_game = othello.Othello(gamestate.get_num_rows(),
-                                         gamestate.get_num_cols(),
-                                         gamestate.get_turn(),
-                                         gamestate.get_top_left(),
-                                         gamestate.get_win_method(),
-                                         gamestate.get_board())
-            dummy_game.valid_move(move[0], move[1]) #Make the move (for sure it will be valid)
-            
-            points = dummy_game.get_counts()[0] if gamestate.get_turn == "B"\
-                                            else dummy_game.get_counts()[1]
-            move_dict[points].append(move)
-            
-            '''
-            #Can also use the evaluation function for mini-max rather than the point difference?
-            e_value = minimax_eval(dummy_game)
-            move_dict[h_value].append(move)
-            '''
-            
+        move_processor(cpu_move[0], cpu_move[1])
+
+
+def greedy_move(gamestate, cpu_player):
+    '''Picks a cpu move based on a greedy algorithm and returns it (or None
+       if there are no valid moves) without performing it.'''
+    valid_moves = gamestate.legal_moves()
+    if tracing.level >= tracing.SEARCH: #Note how valid_moves has "user-friendly" move descriptions (non zero-based numbers)
+        tracing.emit(tracing.SEARCH, "greedy moves={}".format(list(valid_moves)))
+    if not valid_moves:
+        return None
+
+    move_dict = defaultdict(list)
+    for (move, flips) in valid_moves.items():
+        record = gamestate.apply_move(move[0], move[1], flips) #Make the move (for sure it will be valid)
+        
+        points = gamestate.get_counts()[0] if cpu_player == "B"\
+                                        else gamestate.get_counts()[1]
+        move_dict[points].append(move)
+        
+        '''
+        #Can also use the evaluation function for mini-max rather than the point difference?
+        e_value = minimax_eval(gamestate)
+        move_dict[h_value].append(move)
+        '''
+        gamestate.undo(record) #Take the move back before trying the next one
         
-        cpu_move = random.choice(move_dict[max(move_dict.keys())])
-        #Choose the next move available that will get the cpu the most choice (randomly choose between all moves
-        #that would yield the same number of points)
+    
+    cpu_move = random.choice(move_dict[max(move_dict.keys())])
+    #Choose the next move available that will get the cpu the most choice (randomly choose between all moves
+    #that would yield the same number of points)
 
-        print("move_dict: ", move_dict)
-        print("cpu_move: ", cpu_move)
+    if tracing.level >= tracing.SEARCH:
+        tracing.emit(tracing.SEARCH, "greedy points={}".format(dict(move_dict)))
+    if tracing.level >= tracing.MOVES:
+        tracing.emit(tracing.MOVES, "greedy {} plays {}".format(cpu_player, cpu_move))
 
-        move_processor(cpu_move[0], cpu_move[1])
+    return cpu_move
 
 
 
@@ -56,8 +162,22 @@ def greedy_cpu(gamestate, cpu_player, move_processor):
 #Think: ultimately, we want the cpu to return a move, not some evaluation function value. If anything,
 #the evaluation function value should guide the cpu towards the best move
 def minimax(gamestate, cpu_player, depth): #Removed the move and move_processor parameters
+    '''Executes a cpu move based on a depth-limited minimax algorithm and
+       returns a SearchResult (whose first two fields are the value and the move).'''
+    stats = SearchStats()
+    stats.pv = [[] for ply in range(depth+1)]
+    start = time.perf_counter()
+    (val, move) = _minimax(gamestate, cpu_player, depth, 0, stats)
+    stats.seconds = time.perf_counter() - start
+    return stats.get_result(val, move, depth, stats.pv[0], pruned=False)
+
+
+def _minimax(gamestate, cpu_player, depth, ply, stats):
     #Initially (for the very first call), move would probably be None
-    '''Executes a cpu move based on a depth-limited minimax algorithm.'''
+    '''The recursive part of minimax. Returns the value and the move of a
+       node, and leaves the best line from the node in stats.pv[ply].'''
+    stats.nodes += 1
+    stats.pv[ply] = []
     best_move = None
     if depth == 0 or gamestate.get_winner() != " ":
         #print("minimax_eval(gamestate, cpu_player): ", minimax_eval(gamestate, cpu_player))
@@ -66,15 +186,16 @@ def minimax(gamestate, cpu_player, depth): #Removed the move and move_processor
         #required to return a move for processing.
         #Think: "this is the move associated with the high evaluation function value
     elif gamestate.get_turn() == cpu_player:
-        print("MAXIMIZING PLAYER'S TURN")
+        if tracing.level >= tracing.NODES:
+            tracing.emit(tracing.NODES, "max {} d={}".format(cpu_player, depth))
         #Thought: the CPU is always the maximizing player. Typically, the maximizing player is the (CPU)
         #player who has the current turn.
         best_val = float("-inf")
         #best_move = None #Could be no best move if no moves were ever available...
-        valid_moves_lst = _cpu_find_moves(gamestate)
+        valid_moves = gamestate.legal_moves()
 
-        if valid_moves_lst == []:
-            print("*****EMPTY MOVES ALERT!!!*****")
+        if not valid_moves and tracing.level >= tracing.NODES:
+            tracing.emit(tracing.NODES, "no moves d={}".format(depth))
 
         '''
         if valid_moves_lst == []:
@@ -83,26 +204,21 @@ def minimax(gamestate, cpu_player, depth): #Removed the move and move_processor
             #Maybe won't need this if I return None as best_move (best_move is set to None at the beginning)...
             return (gamestate, move)
         '''
-        for move in valid_moves_lst:
-            #Perform the move
-            dummy_game = othello.Othello(gamestate.get_num_rows(),
-                                         gamestate.get_num_cols(),
-                                         gamestate.get_turn(),
-                                         gamestate.get_top_left(),
-                                         gamestate.get_win_method(),
-                                         gamestate.get_board())
-                                         #^This final argument is what allows the dummy gamestate to take on the board
-                                         #configuration of the current gamestate
-
-            #dummy_game.print_board() #FOR TESTING
+        for (move, flips) in valid_moves.items():
+            #Perform the move in place. It is taken back with undo() once its
+            #subtree has been searched, so no board is copied per node.
+            record = gamestate.apply_move(move[0], move[1], flips)
+
+            #gamestate.print_board() #FOR TESTING
             #print("") #FOR TESTING
 
-            dummy_game.valid_move(move[0], move[1])
-            (val, move_made) = minimax(dummy_game, cpu_player, depth-1) #Note how move_made isn't used
+            (val, move_made) = _minimax(gamestate, cpu_player, depth-1, ply+1, stats) #Note how move_made isn't used
+            gamestate.undo(record)
             #val = minimax(dummy_game, cpu_player, depth-1, move, move_processor)
             if val > best_val: #perhaps i should handle case where it's equal? don't want AI doing same moves all the time.
                 best_move = move
                 best_val = val
+                stats.pv[ply] = [move] + stats.pv[ply+1]
 
         return (best_val, best_move)
         #I think you should return move itself because you'd want this function to
@@ -110,11 +226,12 @@ def minimax(gamestate, cpu_player, depth): #Removed the move and move_processor
         #return best_val
 
     else:
-        print("MINIMIZING PLAYER'S TURN")
+        if tracing.level >= tracing.NODES:
+            tracing.emit(tracing.NODES, "min {} d={}".format(gamestate.get_turn(), depth))
         #^For minimizing player
         best_val = float("inf")
         #bast_move = None
-        valid_moves_lst = _cpu_find_moves(gamestate)
+        valid_moves = gamestate.legal_moves()
 
         '''
         if valid_moves_lst == []:
@@ -122,26 +239,124 @@ def minimax(gamestate, cpu_player, depth): #Removed the move and move_processor
             #ends up not having a move available...
             return (gamestate, move)
         '''
-        for move in valid_moves_lst:
+        for (move, flips) in valid_moves.items():
             #Perform the move
-            dummy_game = othello.Othello(gamestate.get_num_rows(),
-                                         gamestate.get_num_cols(),
-                                         gamestate.get_turn(),
-                                         gamestate.get_top_left(),
-                                         gamestate.get_win_method(),
-                                         gamestate.get_board())
-
-            dummy_game.valid_move(move[0], move[1])
-            (val, move_made) = minimax(dummy_game, cpu_player, depth-1)
+            record = gamestate.apply_move(move[0], move[1], flips)
+            (val, move_made) = _minimax(gamestate, cpu_player, depth-1, ply+1, stats)
+            gamestate.undo(record)
             if val < best_val:
                 best_move = move
                 best_val = val
+                stats.pv[ply] = [move] + stats.pv[ply+1]
 
             
         return (best_val, best_move)
 
 
-def minimax_abp(gamestate, cpu_player, alpha, beta, depth):
+class _SearchTimeout(Exception):
+    """ An exception raised inside a search when its time budget runs out. """
+    pass
+
+
+def iterative_deepening(gamestate, cpu_player, time_budget_ms, max_depth=10, table=None,
+                        orderer=None, stop_event=None, endgame_empties=endgame.DEFAULT_EMPTIES,
+                        book=None, evaluator=None):
+    """
+    Executes a cpu move based on minimax_abp searches of increasing
+    depth (1, 2, 3, ...) that stop once a time budget runs out. The
+    move found by the deepest completed search is returned, so the
+    response time stays predictable whatever the position or board
+    size. Each search reuses the best moves stored in the table by
+    the previous ones to order its moves, which makes the repeated
+    shallow searches cheap.
+    @gamestate: The game state of an Othello game
+    @cpu_player: The color of the CPU player ("B" or "W")
+    @time_budget_ms: The wall-clock time budget in milliseconds
+    @max_depth: The depth at which to stop deepening
+    @table: An optional transposition table (a fresh one is used
+            if none is given)
+    @orderer: An optional move orderer (a fresh one with every
+              heuristic switched on is used if none is given)
+    @stop_event: An optional threading.Event that, once set, stops
+                 the search early like an exhausted time budget
+                 (e.g. when a player asks the CPU to move now)
+    @endgame_empties: The number of empty squares at which the
+                      move is found by the exact endgame solver
+                      instead (0 to never use it). Should the
+                      solver not finish in time, the searches
+                      still return a move.
+    @book: An optional openingbook.OpeningBook whose move is
+           played without searching if it has one
+    @evaluator: An optional evaluator used instead of minimax_eval
+                (see minimax_abp)
+    type gamestate: Othello
+    type cpu_player: str
+    type time_budget_ms: float
+    type max_depth: int
+    type table: transposition.TranspositionTable
+    type orderer: moveordering.MoveOrderer
+    type stop_event: threading.Event
+    type endgame_empties: int
+    type book: openingbook.OpeningBook
+    type evaluator: object
+    return: A SearchResult whose value, move, depth and principal
+            variation come from the deepest completed search and whose
+            counts add up every search made. Its depth is the number
+            of empty squares if the endgame solver found the move, and
+            a book move has a value of None and a depth of 0.
+    rtype: SearchResult
+    """
+    start = time.perf_counter()
+    stats = SearchStats()
+    if book is not None:
+        book_move = book.lookup(gamestate)
+        if book_move is not None:
+            stats.seconds = time.perf_counter() - start
+            return stats.get_result(None, book_move, 0, [book_move], pruned=False)
+
+    deadline = start + time_budget_ms/1000
+    if gamestate.get_empty_count() <= endgame_empties and gamestate.get_turn() == cpu_player and\
+       gamestate.get_winner() == " ":
+        result = endgame.solve(gamestate, False, deadline, stop_event, stats)
+        if result is not None:
+            stats.seconds = time.perf_counter() - start
+            return stats.get_result(result[0], result[1], gamestate.get_empty_count(),
+                                    [] if result[1] is None else [result[1]], pruned=False)
+
+    if table is None:
+        table = transposition.TranspositionTable()
+    if orderer is None:
+        orderer = moveordering.MoveOrderer()
+    orderer.new_search()
+    (best_val, best_move, completed_depth, pv) = (None, None, 0, [])
+
+    for depth in range(1, max_depth+1):
+        try:
+            #The depth 1 search always runs to completion so that a move is
+            #returned even if the budget is too small for anything else.
+            result = minimax_abp(gamestate, cpu_player, float("-inf"), float("inf"),
+                                 depth, table, deadline if depth > 1 else None, orderer,
+                                 stop_event=stop_event if depth > 1 else None,
+                                 evaluator=evaluator, stats=stats)
+        except _SearchTimeout:
+            break
+        (best_val, best_move, completed_depth, pv) = (result.value, result.move, depth, result.pv)
+        if tracing.level >= tracing.SEARCH:
+            tracing.emit(tracing.SEARCH, "id depth={} v={} move={}".format(depth, best_val, best_move))
+
+        if depth >= gamestate.get_empty_count() or time.perf_counter() >= deadline or\
+           (stop_event is not None and stop_event.is_set()):
+            break #Deeper searches can't see any further or wouldn't finish
+
+    stats.seconds = time.perf_counter() - start
+    result = stats.get_result(best_val, best_move, completed_depth, pv)
+    if tracing.level >= tracing.SEARCH:
+        tracing.emit(tracing.SEARCH, format_result(result))
+    return result
+
+
+def minimax_abp(gamestate, cpu_player, alpha, beta, depth, table=None, deadline=None,
+                orderer=None, ply=0, stop_event=None, evaluator=None, stats=None):
     """
     Executes a cpu move based on a depth-limited
     minimax algorithm with alpha-beta pruning.
@@ -149,38 +364,125 @@ def minimax_abp(gamestate, cpu_player, alpha, beta, depth):
     @cpu_player: The color of the CPU player ("B" or "W")
     @alpha: The maximum lower bound for an AB-prune
     @beta: The minimum upper bound for an AB-prune
+    @depth: The number of plies left to search
+    @table: An optional transposition table that caches searched
+            positions between siblings and between turns
+    @deadline: An optional time.perf_counter() value after which
+               the search is abandoned by raising _SearchTimeout
+               (the gamestate is left as it was found)
+    @orderer: An optional move orderer. Without one, only the
+              transposition table's best move is moved to the front.
+    @ply: The distance of gamestate from the root of the search
+    @stop_event: An optional threading.Event that abandons the
+                 search like the deadline does once it is set
+    @evaluator: An optional evaluator whose evaluate(gamestate,
+                cpu_player) scores the leaves instead of
+                minimax_eval. If it also has evaluate_batch(gamestate,
+                cpu_player, moves) (e.g. batcheval.BatchEvaluator),
+                the children of a node one ply above the leaves are
+                all scored with a single call. If it has on_apply and
+                on_undo(gamestate, record) (e.g.
+                patterneval.PatternEvaluator), they are called after
+                every move made and taken back.
+    @stats: An optional SearchStats that the search adds its
+            counts to (e.g. to add up several searches)
     type gamestate: list
     type cpu_player: str
     type alpha: float
     type beta: float
+    type depth: int
+    type table: transposition.TranspositionTable
+    type deadline: float
+    type orderer: moveordering.MoveOrderer
+    type ply: int
+    type stop_event: threading.Event
+    type evaluator: object
+    type stats: SearchStats
+    return: A SearchResult for the position (whose first two
+            fields are the best score and the move associated
+            with it). Its counts include whatever stats held.
+    rtype: SearchResult
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.pv = [[] for index in range(ply+depth+1)]
+    start = time.perf_counter()
+    try:
+        (best_val, best_move, alpha, beta) = _minimax_abp(gamestate, cpu_player, alpha, beta,
+                                                          depth, table, deadline, orderer, ply,
+                                                          stop_event, evaluator, stats)
+    finally:
+        stats.seconds += time.perf_counter() - start #Also counted when the search times out
+    return stats.get_result(best_val, best_move, depth, stats.pv[ply])
+
+
+def _minimax_abp(gamestate, cpu_player, alpha, beta, depth, table, deadline, orderer, ply,
+                 stop_event, evaluator, stats):
+    """
+    The recursive part of minimax_abp (see there for the parameters).
+    Leaves the best line found from the node in stats.pv[ply].
     return: A tuple containing the best score for an
             evaluated gamestate, the move associated
             with that evaluated gamestate, the alpha
             value, and the beta value.
+    rtype: tuple
     """
-    print("ALPHA-BETA PRUNING IN EFFECT")
     # Note that the same gamestate object is passed through the
     # minimax game tree and it keeps track of whose turn it is
     # throughout the traversal.
 
+    if deadline is not None and time.perf_counter() > deadline:
+        raise _SearchTimeout
+    if stop_event is not None and stop_event.is_set():
+        raise _SearchTimeout
+    stats.nodes += 1
+
     best_move = None
     node_type = ""
     if depth == 0 or gamestate.get_winner() != " ":
         node_type = "terminal"
-        print("TERMINAL NODE REACHED (depth: {})".format(depth))
-        print("EVALUATING THIS BOARD:")
-        gamestate.print_board()
-        print("**********")
-        print("GOING BACK UP FROM {} NODE\n".format(node_type))
-
-        return (minimax_eval(gamestate, cpu_player), None, alpha, beta)
+        value = minimax_eval(gamestate, cpu_player) if evaluator is None else\
+                evaluator.evaluate(gamestate, cpu_player)
+        if tracing.level >= tracing.NODES:
+            tracing.emit(tracing.NODES, "leaf d={} v={}".format(depth, value))
+            tracing.emit(tracing.BOARDS, tracing.board_line(gamestate))
+
+        stats.pv[ply] = []
+        return (value, None, alpha, beta)
         # Don't think I actually need cpu_player?
 
+    tt_move = None
+    if table is not None:
+        # A position reached earlier through another move order may already
+        # have been searched at least this deep. Its stored value either
+        # settles this node or narrows the window searched below.
+        entry = table.lookup(gamestate.get_hash())
+        stats.tt_lookups += 1
+        if entry is not None:
+            stats.tt_hits += 1
+            tt_move = entry.move #Best move of an earlier (maybe shallower) search
+        if entry is not None and entry.depth >= depth:
+            if tracing.level >= tracing.NODES:
+                tracing.emit(tracing.NODES, "tt hit d={} bound={} v={}".format(
+                    entry.depth, entry.bound, entry.value))
+            stats.pv[ply] = [] if entry.move is None else [entry.move]
+            if entry.bound == transposition.EXACT:
+                return (entry.value, entry.move, alpha, beta)
+            elif entry.bound == transposition.LOWER_BOUND:
+                alpha = max(alpha, entry.value)
+            elif entry.bound == transposition.UPPER_BOUND:
+                beta = min(beta, entry.value)
+            if beta <= alpha:
+                return (entry.value, entry.move, alpha, beta)
+    (window_alpha, window_beta) = (alpha, beta)
+    tracks_moves = hasattr(evaluator, "on_apply") #An incrementally updated evaluator
+
     if gamestate.get_turn() == cpu_player:
         node_type = "max"
-        print("AT ^_MAX_^ NODE ({})".format(gamestate.get_turn()))
-        print("CURRENT BOARD CONFIG (depth: {}):".format(depth), end="")
-        gamestate.print_board()
+        if tracing.level >= tracing.NODES:
+            tracing.emit(tracing.NODES, "max {} d={} a={} b={}".format(
+                gamestate.get_turn(), depth, alpha, beta))
+            tracing.emit(tracing.BOARDS, tracing.board_line(gamestate))
 
         #Note that the root of a proper minimax game tree corresponds to the
         #maximizing player. Thus, the CPU player is always the maximizing
@@ -189,10 +491,10 @@ def minimax_abp(gamestate, cpu_player, alpha, beta, depth):
 
         best_val = float("-inf")
         #best_move = None #Could be no best move if no moves were ever available...
-        valid_moves_lst = _cpu_find_moves(gamestate)
+        valid_moves = gamestate.legal_moves()
 
-        if valid_moves_lst == []:
-            print("*****EMPTY MOVES ALERT!!!*****")
+        if not valid_moves and tracing.level >= tracing.NODES:
+            tracing.emit(tracing.NODES, "no moves d={}".format(depth))
 
         '''
         if valid_moves_lst == []:
@@ -202,51 +504,66 @@ def minimax_abp(gamestate, cpu_player, alpha, beta, depth):
             #(best_move is set to None at the beginning)...
             return (gamestate, move)
         '''
-        for move in valid_moves_lst:
-            dummy_game = othello.Othello(gamestate.get_num_rows(),
-                                         gamestate.get_num_cols(),
-                                         gamestate.get_turn(),
-                                         gamestate.get_top_left(),
-                                         gamestate.get_win_method(),
-                                         gamestate.get_board())
-                                         #^This final argument is what allows
-                                         # the dummy gamestate to take on the board
-                                         # configuration of the current gamestate
-
-            #Perform the move
-            dummy_game.valid_move(move[0], move[1])
-
-            print("MOVE MADE BY ^_MAX_^ NODE ({}, depth: {}):".\
-                  format(gamestate.get_turn(), depth))
-            print((move[0], move[1]))
-            dummy_game.print_board() #FOR TESTING
-            print("")
-
-            # . Note how move_made isn't used...
-            # . The current node passes alpha and beta down to children.
-            (val, move_made, alpha, beta) = minimax_abp(dummy_game, cpu_player,
-                                                        alpha, beta, depth-1)
+        ordered_moves = _order_moves(gamestate, valid_moves, tt_move, orderer, ply)
+        leaf_values = _evaluate_leaves(gamestate, cpu_player, ordered_moves, depth, evaluator)
+        stats.interior += 1
+        stats.pv[ply] = []
+        if leaf_values is not None:
+            stats.nodes += len(leaf_values)
+        for (index, (move, flips)) in enumerate(ordered_moves):
+            if leaf_values is not None:
+                (val, move_made) = (leaf_values[index], None)
+            else:
+                #Perform the move in place (taken back with undo() below)
+                record = gamestate.apply_move(move[0], move[1], flips)
+                if tracks_moves:
+                    evaluator.on_apply(gamestate, record)
+
+                if tracing.level >= tracing.NODES:
+                    tracing.emit(tracing.NODES, "move {} {} d={}".format(record.turn, move, depth))
+                    tracing.emit(tracing.BOARDS, tracing.board_line(gamestate))
+
+                # . Note how move_made isn't used...
+                # . The current node passes alpha and beta down to children,
+                #   but keeps its own window (the child's bounds are its own).
+                try:
+                    (val, move_made, child_alpha, child_beta) = _minimax_abp(gamestate, cpu_player,
+                                                                             alpha, beta, depth-1,
+                                                                             table, deadline,
+                                                                             orderer, ply+1,
+                                                                             stop_event, evaluator,
+                                                                             stats)
+                finally:
+                    gamestate.undo(record) #Also runs when the search times out
+                    if tracks_moves:
+                        evaluator.on_undo(gamestate, record)
 
             # Perhaps I should also handle case where it's equal?
             # Wouldn't want the AI doing the same moves all the time.
             if val > best_val:
                 best_move, best_val = move, val
+                stats.pv[ply] = [move] + (stats.pv[ply+1] if leaf_values is None else [])
 
             if best_val >= alpha:
                 alpha = best_val
 
             if beta <= alpha:
-                print("PRUNING!!!")
+                if tracing.level >= tracing.NODES:
+                    tracing.emit(tracing.NODES, "cutoff max {} d={}".format(move, depth))
+                stats.cutoffs += 1
+                if orderer is not None:
+                    orderer.record_cutoff(gamestate.get_turn(), move, ply, depth)
                 break
     else:
         node_type = "min"
-        print("AT v_MIN_v NODE ({})".format(gamestate.get_turn()))
-        print("CURRENT BOARD CONFIG (depth: {}):".format(depth), end="")
-        gamestate.print_board()
+        if tracing.level >= tracing.NODES:
+            tracing.emit(tracing.NODES, "min {} d={} a={} b={}".format(
+                gamestate.get_turn(), depth, alpha, beta))
+            tracing.emit(tracing.BOARDS, tracing.board_line(gamestate))
 
         best_val = float("inf")
         #bast_move = None
-        valid_moves_lst = _cpu_find_moves(gamestate)
+        valid_moves = gamestate.legal_moves()
 
         '''
         if valid_moves_lst == []:
@@ -254,38 +571,68 @@ def minimax_abp(gamestate, cpu_player, alpha, beta, depth):
             #current player ends up not having a move available...
             return (gamestate, move)
         '''
-        for move in valid_moves_lst:
-            dummy_game = othello.Othello(gamestate.get_num_rows(),
-                                         gamestate.get_num_cols(),
-                                         gamestate.get_turn(),
-                                         gamestate.get_top_left(),
-                                         gamestate.get_win_method(),
-                                         gamestate.get_board())
-
-            #Perform the move
-            dummy_game.valid_move(move[0], move[1])
-
-            print("MOVE MADE BY v_MIN_v NODE ({}, depth: {}):".\
-                  format(gamestate.get_turn(), depth))
-            print((move[0], move[1]))
-            dummy_game.print_board()
-            print("")
-
-            # . Note how move_made isn't used
-            # . The current node passes alpha and beta down to children.
-            (val, move_made, alpha, beta) = minimax_abp(dummy_game, cpu_player,
-                                                        alpha, beta, depth-1)
+        ordered_moves = _order_moves(gamestate, valid_moves, tt_move, orderer, ply)
+        leaf_values = _evaluate_leaves(gamestate, cpu_player, ordered_moves, depth, evaluator)
+        stats.interior += 1
+        stats.pv[ply] = []
+        if leaf_values is not None:
+            stats.nodes += len(leaf_values)
+        for (index, (move, flips)) in enumerate(ordered_moves):
+            if leaf_values is not None:
+                (val, move_made) = (leaf_values[index], None)
+            else:
+                #Perform the move in place (taken back with undo() below)
+                record = gamestate.apply_move(move[0], move[1], flips)
+                if tracks_moves:
+                    evaluator.on_apply(gamestate, record)
+
+                if tracing.level >= tracing.NODES:
+                    tracing.emit(tracing.NODES, "move {} {} d={}".format(record.turn, move, depth))
+                    tracing.emit(tracing.BOARDS, tracing.board_line(gamestate))
+
+                # . Note how move_made isn't used
+                # . The current node passes alpha and beta down to children,
+                #   but keeps its own window (the child's bounds are its own).
+                try:
+                    (val, move_made, child_alpha, child_beta) = _minimax_abp(gamestate, cpu_player,
+                                                                             alpha, beta, depth-1,
+                                                                             table, deadline,
+                                                                             orderer, ply+1,
+                                                                             stop_event, evaluator,
+                                                                             stats)
+                finally:
+                    gamestate.undo(record) #Also runs when the search times out
+                    if tracks_moves:
+                        evaluator.on_undo(gamestate, record)
             if val < best_val:
                 best_move, best_val = move, val
+                stats.pv[ply] = [move] + (stats.pv[ply+1] if leaf_values is None else [])
 
             if best_val <= beta:
                 beta = best_val
 
             if beta <= alpha:
-                print("xxxxxPRUNINGxxxxx!!!")
+                if tracing.level >= tracing.NODES:
+                    tracing.emit(tracing.NODES, "cutoff min {} d={}".format(move, depth))
+                stats.cutoffs += 1
+                if orderer is not None:
+                    orderer.record_cutoff(gamestate.get_turn(), move, ply, depth)
                 break
 
-    print("GOING BACK UP FROM {} NODE\n".format(node_type))
+    if table is not None:
+        # Relative to the window this node was searched with, a value at or
+        # below alpha is only an upper bound and one at or above beta is
+        # only a lower bound.
+        if best_val <= window_alpha:
+            bound = transposition.UPPER_BOUND
+        elif best_val >= window_beta:
+            bound = transposition.LOWER_BOUND
+        else:
+            bound = transposition.EXACT
+        table.store(gamestate.get_hash(), depth, best_val, bound, best_move)
+
+    if tracing.level >= tracing.NODES:
+        tracing.emit(tracing.NODES, "up {} v={} move={}".format(node_type, best_val, best_move))
     return (best_val, best_move, alpha, beta)
 
 
@@ -296,16 +643,15 @@ def minimax_eval(gamestate, cpu_player):
     #next turn, then definitely take it?
     
     score = 0
-    score += gamestate.get_counts()[0]-gamestate.get_counts()[1] if cpu_player == "B" else\
-           gamestate.get_counts()[1]-gamestate.get_counts()[0]  #Should I associate a heighter "weight" with this?
+    counts = gamestate.get_counts()
+    score += counts[0]-counts[1] if cpu_player == "B" else\
+           counts[1]-counts[0]  #Should I associate a heighter "weight" with this?
 
     #If the move would lead to the CPU getting a corner piece, then heavily consider it
-    corners = [gamestate.get_tl_cell(), gamestate.get_tr_cell(),
-               gamestate.get_bl_cell(), gamestate.get_br_cell()]
-    for row in gamestate.get_board():
-        for col in row:
-            if col == "cpu_player" and (row, col) in corners:
-                score += 10
+    for (i_row, i_col) in (gamestate.get_tl_cell(), gamestate.get_tr_cell(),
+                           gamestate.get_bl_cell(), gamestate.get_br_cell()):
+        if gamestate.get_cell(i_row, i_col) == cpu_player:
+            score += 10
 
     return score
     
@@ -320,13 +666,60 @@ def minimax_eval(gamestate, cpu_player):
     #Can't I also just return the number of points of the player for which the evaluation function is called?
 
 
+def _order_moves(gamestate, valid_moves, tt_move, orderer, ply):
+    """
+    Lists the valid moves of a position in the order to search them.
+    Without a move orderer, the transposition table's best move (if it
+    is one of them) is simply moved to the front, since it is the
+    likeliest to cause a cutoff.
+    @gamestate: The game state whose moves are ordered
+    @valid_moves: A dictionary of valid moves as given by legal_moves()
+    @tt_move: The best move stored for the position, or None
+    @orderer: An optional move orderer
+    @ply: The distance of gamestate from the root of the search
+    type gamestate: Othello
+    type valid_moves: dict
+    type tt_move: tuple
+    type orderer: moveordering.MoveOrderer
+    type ply: int
+    return: A list of (move, flips) pairs
+    rtype: list
+    """
+    if orderer is not None:
+        return orderer.order(gamestate, valid_moves, ply, tt_move)
+    moves = list(valid_moves.items())
+    if tt_move in valid_moves:
+        moves.remove((tt_move, valid_moves[tt_move]))
+        moves.insert(0, (tt_move, valid_moves[tt_move]))
+    return moves
+
+
+def _evaluate_leaves(gamestate, cpu_player, ordered_moves, depth, evaluator):
+    """
+    Scores all the children of a node one ply above the leaves with a
+    single call, if the evaluator can score batches.
+    @gamestate: The game state of the node
+    @cpu_player: The color of the CPU player ("B" or "W")
+    @ordered_moves: The (move, flips) pairs of the node
+    @depth: The number of plies left to search from the node
+    @evaluator: The evaluator of the search, or None
+    type gamestate: Othello
+    type cpu_player: str
+    type ordered_moves: list
+    type depth: int
+    type evaluator: object
+    return: A list of the children's scores (in the order of
+            ordered_moves), or None if they are searched one by one
+    rtype: list
+    """
+    if depth != 1 or not hasattr(evaluator, "evaluate_batch"):
+        return None
+    if tracing.level >= tracing.NODES:
+        tracing.emit(tracing.NODES, "batch leaves={} d={}".format(len(ordered_moves), depth))
+    return evaluator.evaluate_batch(gamestate, cpu_player, ordered_moves)
+
+
 def _cpu_find_moves(gamestate):
-    '''Loops through the gameboard to find valid moves and returns a list of
-       those valid moves.'''
-    valid_moves_lst = []
-    for i_row in range(gamestate.get_num_rows()):
-        for i_col in range(gamestate.get_num_rows()):
-            if gamestate._valid_placement(i_row, i_col)[0]:
-                valid_moves_lst.append((i_row+1, i_col+1))
-
-    return valid_moves_lst
\ No newline at end of file
+    '''Finds the valid moves of the player to move and returns a list of
+       those valid moves (non 0-based, in row-major order).'''
+    return list(gamestate.legal_moves())
\ No newline at end of file
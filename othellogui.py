@@ -1,10 +1,19 @@
 #Contains the class for the othello board GUI.
-import tkinter, othello, scoreboardgui, math, random, time, othelloai
+import tkinter, othello, scoreboardgui, math, random, time, othelloai, transposition, tracing
+import threading, queue, os, openingbook, mcts, gamerecord
 from collections import defaultdict
 from copy import deepcopy
 
 _INITIAL_CELL_WIDTH = 60  #Default is 60 pixels
 _INITIAL_CELL_HEIGHT = 60 #Defauly is 60 pixels
+_CPU_TIME_BUDGET_MS = 2000 #Time the Mini Max and Monte Carlo AIs may spend on a move
+_CPU_MAX_DEPTH = 10
+_CPU_POLL_MS = 50 #How often the GUI checks whether the CPU has picked its move
+_GREEDY_THINK_S = 0.5 #To simulate "thinking" for Greedy Gary
+_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book-{}x{}.bin")
+#^Opening book for the Mini Max AI (built with openingbook.py), used if it exists
+_RECORD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games-{}x{}.rec")
+#^Every game played is appended here (see gamerecord.py)
 
 
 
@@ -53,6 +62,16 @@ class OthelloGUI:
         self._how_to_win = how_to_win   #For AI Othello
         self._corner_mappings = dict()   #For AI Othello
         self._gamestate = othello.Othello(num_rows, num_cols, first_mover, top_left, how_to_win)
+        self._table = transposition.TranspositionTable()   #Kept between turns for the Mini Max AI
+        self._cpu_thinking = False   #True while a worker thread searches for the CPU's move
+        self._cpu_moves = queue.Queue()   #The worker thread hands its move back through here
+        self._cpu_stop = threading.Event()   #Set to make the CPU move now
+        self._book = None
+        if cpu_opp == "Mini Max" and os.path.exists(_BOOK_PATH.format(num_rows, num_cols)):
+            self._book = openingbook.OpeningBook(_BOOK_PATH.format(num_rows, num_cols))
+        self._mcts = mcts.MCTS()   #Keeps its search tree between turns for the Monte Carlo AI
+        self._moves = []   #(player, row, col) of every move played, for the game record
+        self._recorded = False
 
         
         self._canvas = tkinter.Canvas(master=self._root, height=_INITIAL_CELL_HEIGHT*num_rows,
@@ -76,6 +95,8 @@ class OthelloGUI:
         self._canvas.bind("<Motion>", self._on_mouse_motion)
         self._scoreboard.bind("<Button-1>", self._on_scoreboard_click)
         self._scoreboard.bind("<Motion>", self._on_mouse_motion)
+        self._root.bind("<space>", self._on_move_now)
+        self._root.protocol("WM_DELETE_WINDOW", self._on_close)
 
 
     def start(self):
@@ -107,20 +128,11 @@ class OthelloGUI:
         rtype: None
         """
         if self._first_mover == self._cpu_player and not self._cpu_made_first_move:
-            if self._cpu_opp == "Greedy Gary":
-                othelloai.greedy_cpu(self._gamestate, self._cpu_player, self._process_move)
-            elif self._cpu_opp == "Mini Max":
-                while self._gamestate.get_turn() == self._cpu_player and self._gamestate.get_winner() == " ":
-                    #FOCUS HERE
-                    #result = othelloai.minimax(self._gamestate, self._cpu_player, 3)
-                    result = othelloai.minimax_abp(self._gamestate, self._cpu_player,
-                                                   float("-inf"), float("inf"), 10)
-                    if result[1] != None:
-                        self._process_move(result[1][0], result[1][1])
+            self._start_cpu_turn()
         self._draw_board()
         #Must draw_board() here to take effect. When you had this code in the __init__ funciton, note how
         #draw_board() is automatically called upon the window appearing!
-        self._cpu_made_first_mode = True
+        self._cpu_made_first_move = True
 
 
     def _on_canvas_resize(self, event):
@@ -201,26 +213,11 @@ class OthelloGUI:
             if self._cpu_opp == "None":
                 self._player_move(event)
             else:
+                if self._cpu_thinking:
+                    return #The board stays responsive, but it isn't the human's turn yet
                 if self._gamestate.get_turn() == self._hum_player:
                     self._player_move(event) #Human moves
-                if self._gamestate.get_turn() == self._cpu_player:
-                    if self._cpu_opp == "Greedy Gary":
-                        othelloai.greedy_cpu(self._gamestate, self._cpu_player, self._process_move)
-                    elif self._cpu_opp == "Mini Max":
-                        #print("CHANGE DEPTH BACK TO 3 WHEN DONE TESTING!")
-                        while self._gamestate.get_turn() == self._cpu_player and\
-                              self._gamestate.get_winner() == " ":
-                            #FOCUS HERE
-                            #result = othelloai.minimax(self._gamestate, self._cpu_player, 3)
-                            result = othelloai.minimax_abp(self._gamestate, self._cpu_player,
-                                                           float("-inf"), float("inf"), 10)
-                            #Handle case where result[1] == None?
-                            if result[1] != None:
-                                self._process_move(result[1][0], result[1][1])
-                            #else:
-                            #    self._game_ended = True
-                            #Hmm...program is crashing when a game is over rather than exiting properly.
-                            #Probably happens when white makes the final move...yup, that's the problem.
+                self._start_cpu_turn()
         else:
             self._game_ended = True
             self._root.destroy() #Click on canvas to get rid of window after a completed game
@@ -257,28 +254,156 @@ class OthelloGUI:
         return: None
         rtype: None
         """
-        if self._gamestate.valid_move(row, col) and self._game_active:
+        player = self._gamestate.get_turn()
+        empty_count = self._gamestate.get_empty_count()
+        valid = self._gamestate.valid_move(row, col)
+        if self._gamestate.get_empty_count() < empty_count:
+            #A tile was placed. valid_move() returns False for the move that
+            #ends the game, so this is how that move gets into the record too.
+            self._moves.append((player, row, col))
+        if valid and self._game_active:
         #^If move is valid...
-            print("FOR TESTING. Move Made: {} {}\n".format(row, col))
+            tracing.emit(tracing.MOVES, "move made {} {}".format(row, col))
             self._scoreboard.update_turn_label(self._gamestate)
             self._scoreboard.update_score_label(self._gamestate)
             if self._gamestate.get_winner() != " ":
                 self._scoreboard.indicate_result(self._gamestate)
                 self._game_active = False
+                self._save_record()
                 #Perhaps you only need to use self._gamestate.get_winner()
                 #instead of self._game_active?
-        elif not self._gamestate.valid_move(row, col) and self._gamestate.get_winner() != " ":
+        elif not valid and self._gamestate.get_winner() != " ":
         #^Handles case when both players no longer have valid moves before board is full..
             self._scoreboard.indicate_result(self._gamestate)
-            self._game_active = False          
-        elif not self._gamestate.valid_move(row, col) and self._game_active:
+            self._game_active = False
+            self._save_record()
+        elif not valid and self._game_active:
         #^If invalid move was made...
             self._scoreboard.indicate_invalid(self._gamestate)
 
         self._draw_circles(self._corner_mappings)
-        self._root.update() #this is for the CPU in case they make multiple moves
 
     
+    def _save_record(self):
+        """
+        Appends the record of the game (finished or not) to the game
+        record file once.
+        return: None
+        rtype: None
+        """
+        if self._recorded or not self._moves:
+            return
+        self._recorded = True
+        record = gamerecord.make_record(self._num_rows, self._num_cols, self._first_mover,
+                                        self._top_left, self._how_to_win, self._moves,
+                                        self._gamestate.get_winner())
+        try:
+            with gamerecord.GameWriter(_RECORD_PATH.format(self._num_rows, self._num_cols)) as writer:
+                writer.write(record)
+        except (OSError, ValueError) as error: #Never let a record stop the game
+            tracing.emit(tracing.MOVES, "game record not saved: {}".format(error))
+
+    
+    def _start_cpu_turn(self):
+        """
+        Starts searching for the CPU's move in a worker thread if it is
+        the CPU's turn, so that the window stays responsive during long
+        searches. The move is picked up by _poll_cpu_move().
+        return: None
+        rtype: None
+        """
+        if not self._game_active or self._cpu_thinking or\
+           self._gamestate.get_turn() != self._cpu_player or self._gamestate.get_winner() != " ":
+            return
+
+        #The worker searches its own copy of the game so that redrawing the
+        #board never sees the moves it tries out.
+        snapshot = othello.from_bytes(self._gamestate.to_bytes())
+        self._cpu_thinking = True
+        self._cpu_stop.clear()
+        self._scoreboard.indicate_thinking(self._cpu_player, True)
+        worker = threading.Thread(target=self._find_cpu_move, args=(snapshot,), daemon=True)
+        worker.start()
+        self._root.after(_CPU_POLL_MS, self._poll_cpu_move)
+
+
+    def _find_cpu_move(self, snapshot):
+        """
+        Searches for the CPU's move (runs in a worker thread) and puts it
+        on the move queue, along with the search's result (None for
+        Greedy Gary). Nothing in here may touch the widgets.
+        @snapshot: A copy of the game state to search
+        type snapshot: Othello
+        return: None
+        rtype: None
+        """
+        (move, result) = (None, None)
+        try:
+            if self._cpu_opp == "Greedy Gary":
+                self._cpu_stop.wait(_GREEDY_THINK_S)
+                move = othelloai.greedy_move(snapshot, self._cpu_player)
+            elif self._cpu_opp == "Mini Max":
+                #result = othelloai.minimax(snapshot, self._cpu_player, 3)
+                result = othelloai.iterative_deepening(snapshot, self._cpu_player,
+                                                       _CPU_TIME_BUDGET_MS, _CPU_MAX_DEPTH,
+                                                       self._table, stop_event=self._cpu_stop,
+                                                       book=self._book)
+                move = result.move
+            elif self._cpu_opp == "Monte Carlo":
+                result = self._mcts.search(snapshot, time_budget_ms=_CPU_TIME_BUDGET_MS,
+                                           stop_event=self._cpu_stop)
+                move = result.move
+        finally:
+            self._cpu_moves.put((move, result)) #Always answer so the GUI never waits forever
+
+
+    def _poll_cpu_move(self):
+        """
+        Checks whether the worker thread has found the CPU's move and
+        plays it, polling again later if it hasn't.
+        return: None
+        rtype: None
+        """
+        try:
+            (move, result) = self._cpu_moves.get_nowait()
+        except queue.Empty:
+            self._root.after(_CPU_POLL_MS, self._poll_cpu_move)
+            return
+
+        self._cpu_thinking = False
+        self._scoreboard.indicate_thinking(self._cpu_player, False)
+        if result is not None:
+            self._scoreboard.show_search_result(self._cpu_player, result)
+        if move is not None:
+            self._process_move(move[0], move[1])
+            self._draw_board()
+        self._start_cpu_turn() #The CPU moves again if the human has to pass
+
+
+    def _on_move_now(self, event):
+        """
+        An event handler that makes a thinking CPU play the best move
+        it has found so far.
+        @event: A KeyPress event
+        type event: Event
+        return: None
+        rtype: None
+        """
+        if self._cpu_thinking:
+            self._cpu_stop.set()
+
+
+    def _on_close(self):
+        """
+        Stops a thinking CPU and destroys the game window when it is closed.
+        return: None
+        rtype: None
+        """
+        self._cpu_stop.set()
+        self._save_record() #An unfinished game is recorded without a winner
+        self._root.destroy() #did_game_end() stays False so that main.py quits
+
+
     def _find_nearest_cell(self, event, midpoint_mappings):
         """
         Finds the nearest cell to a mouse click made on the game board.
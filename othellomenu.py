@@ -114,7 +114,7 @@ class OthelloMenu: #Watch out! There's already a class called Menu in the tkinte
         self._cpu_opp = tkinter.StringVar()
         self._cpu_opp.set("Greedy Gary")
         self._opp_menu = tkinter.OptionMenu(self._select_opp_frame, self._cpu_opp,
-                                            "Greedy Gary", "Mini Max", "None") #No command option needed. tkinter sees who you selected automatically.
+                                            "Greedy Gary", "Mini Max", "Monte Carlo", "None") #No command option needed. tkinter sees who you selected automatically.
         self._opp_menu.grid(row=0, column=1, padx=10, pady=10)
 
 
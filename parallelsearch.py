@@ -0,0 +1,200 @@
+#Contains the class that spreads an alpha-beta search over several processes.
+import math
+import multiprocessing
+import time
+import othello
+import othelloai
+import transposition
+import moveordering
+import tracing
+
+
+
+
+#Set up in every worker process by _init_worker
+_shared_alpha = None   #The best root value found so far (shared by all workers)
+_shared_index = None   #The row-major index of the move with that value
+_shared_lock = None
+_worker_tables = dict()   #cpu_player -> transposition table kept by a worker
+_worker_table_entries = 0
+
+
+def _init_worker(shared_alpha, shared_index, shared_lock, table_entries):
+    """
+    Keeps the shared root bounds in a new worker process.
+    @shared_alpha: The shared multiprocessing.Value of the best root value
+    @shared_index: The shared multiprocessing.Value of the index of the
+                   move with that value
+    @shared_lock: The lock guarding both shared values
+    @table_entries: The size of the transposition table kept by the
+                    worker for each player (0 for no table)
+    type shared_alpha: multiprocessing.Value
+    type shared_index: multiprocessing.Value
+    type shared_lock: multiprocessing.Lock
+    type table_entries: int
+    return: None
+    rtype: None
+    """
+    global _shared_alpha, _shared_index, _shared_lock, _worker_table_entries
+    (_shared_alpha, _shared_index, _shared_lock) = (shared_alpha, shared_index, shared_lock)
+    _worker_table_entries = table_entries
+    _worker_tables.clear()
+
+
+def _search_root_move(task):
+    """
+    Searches one root move in a worker process, starting from the best
+    root value found so far by any worker.
+    A move that comes before the current best one (in row-major order)
+    is searched with a window just below that value, so that a tie is
+    still recognized and the earlier move wins it as in a serial search.
+    @task: A tuple in the form (snapshot, cpu_player, index, move, depth),
+           where snapshot is the root position as made by to_bytes()
+    type task: tuple
+    return: A tuple in the form (index, value, exact, stats, pv), where
+            exact is False if the move was only shown to be no better
+            than the best value known when its search started, stats
+            holds the search's counts and pv is the line found after
+            the move
+    rtype: tuple
+    """
+    (snapshot, cpu_player, index, move, depth) = task
+    gamestate = othello.from_bytes(snapshot)
+    gamestate.apply_move(move[0], move[1])
+
+    with _shared_lock:
+        (best_val, best_index) = (_shared_alpha.value, _shared_index.value)
+    alpha = best_val if best_index < index else math.nextafter(best_val, -math.inf)
+
+    table = None
+    if _worker_table_entries:
+        if cpu_player not in _worker_tables:
+            _worker_tables[cpu_player] = transposition.TranspositionTable(_worker_table_entries)
+        table = _worker_tables[cpu_player]
+    stats = othelloai.SearchStats()
+    result = othelloai.minimax_abp(gamestate, cpu_player, alpha, float("inf"), depth-1, table,
+                                   None, None, 1, stats=stats)
+    (val, pv) = (result.value, result.pv)
+    stats.pv = [] #Not worth sending back
+
+    exact = val > alpha
+    if exact:
+        with _shared_lock:
+            if val > _shared_alpha.value or (val == _shared_alpha.value and index < _shared_index.value):
+                (_shared_alpha.value, _shared_index.value) = (val, index)
+    return (index, val, exact, stats, pv)
+
+
+
+
+class ParallelSearcher:
+    """
+    Runs minimax_abp searches with the root moves split over a pool of
+    worker processes. Every worker publishes the best root value it finds
+    through shared memory, and the others use it as the alpha bound of
+    the root moves they start afterwards.
+    The root moves are handed out best candidates first, but ties are
+    broken in row-major order, so a search returns the same best value
+    and move as minimax_abp without a move orderer (or a table) would
+    at the same depth.
+    """
+
+    def __init__(self, processes=None, table_entries=0):
+        """
+        Starts the worker processes of a ParallelSearcher object.
+        @processes: The number of worker processes (all cores by default)
+        @table_entries: The size of the transposition table kept by each
+                        worker between searches (0 for no table)
+        type processes: int
+        type table_entries: int
+        return: None
+        rtype: None
+        """
+        self._shared_alpha = multiprocessing.Value("d", -math.inf, lock=False)
+        self._shared_index = multiprocessing.Value("i", 0, lock=False)
+        self._shared_lock = multiprocessing.Lock()
+        self._pool = multiprocessing.Pool(processes, _init_worker,
+                                          (self._shared_alpha, self._shared_index,
+                                           self._shared_lock, table_entries))
+
+
+    def search(self, gamestate, cpu_player, depth):
+        """
+        Searches a position to a given depth.
+        @gamestate: The game state of an Othello game
+        @cpu_player: The color of the CPU player ("B" or "W")
+        @depth: The number of plies to search
+        type gamestate: Othello
+        type cpu_player: str
+        type depth: int
+        return: A SearchResult whose counts add up the work of every
+                worker and whose time is the wall-clock time
+        rtype: othelloai.SearchResult
+        """
+        valid_moves = gamestate.legal_moves()
+        if depth <= 1 or gamestate.get_winner() != " " or gamestate.get_turn() != cpu_player\
+           or len(valid_moves) < 2:
+            #Nothing worth splitting (the root must be the CPU's own move)
+            return othelloai.minimax_abp(gamestate, cpu_player, float("-inf"), float("inf"),
+                                         depth)
+
+        moves = list(valid_moves)
+        indices = {move: index for (index, move) in enumerate(moves)}
+        ordered = moveordering.MoveOrderer(use_tt_move=False, use_killers=False, use_history=False)\
+                  .order(gamestate, valid_moves, 0)
+        snapshot = gamestate.to_bytes() #A few bytes to send instead of a pickled 2D list
+        tasks = [(snapshot, cpu_player, indices[move], move, depth) for (move, flips) in ordered]
+
+        start = time.perf_counter()
+        with self._shared_lock:
+            (self._shared_alpha.value, self._shared_index.value) = (-math.inf, len(moves))
+        (best_val, best_index, best_pv) = (float("-inf"), len(moves), [])
+        total = othelloai.SearchStats()
+        (total.nodes, total.interior) = (1, 1) #The root
+        for (index, val, exact, stats, pv) in self._pool.imap_unordered(_search_root_move, tasks):
+            if tracing.level >= tracing.SEARCH:
+                tracing.emit(tracing.SEARCH, "root {} v={} exact={}".format(moves[index], val, exact))
+            total.add(stats)
+            if exact and (val > best_val or (val == best_val and index < best_index)):
+                (best_val, best_index, best_pv) = (val, index, pv)
+
+        total.seconds = time.perf_counter() - start
+        return total.get_result(best_val, moves[best_index], depth, [moves[best_index]] + best_pv)
+
+
+    def close(self):
+        """
+        Stops the worker processes.
+        return: None
+        rtype: None
+        """
+        self._pool.terminate()
+        self._pool.join()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+
+
+def parallel_minimax_abp(gamestate, cpu_player, depth, processes=None):
+    """
+    Searches a position once with a temporary ParallelSearcher.
+    @gamestate: The game state of an Othello game
+    @cpu_player: The color of the CPU player ("B" or "W")
+    @depth: The number of plies to search
+    @processes: The number of worker processes (all cores by default)
+    type gamestate: Othello
+    type cpu_player: str
+    type depth: int
+    type processes: int
+    return: The SearchResult of the search
+    rtype: othelloai.SearchResult
+    """
+    with ParallelSearcher(processes) as searcher:
+        return searcher.search(gamestate, cpu_player, depth)
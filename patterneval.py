@@ -0,0 +1,452 @@
+#Contains the pattern-based evaluation function and the tool that trains its weights.
+import argparse
+import json
+import random
+import struct
+import sys
+from array import array
+import gamerecord
+import othelloai
+import selfplay
+import transposition
+import moveordering
+
+
+
+
+#A pattern is a line or block of cells anchored at a corner, given as (row, col)
+#offsets from that corner. Every pattern is laid over each corner in both
+#orientations, and its instances share one table of weights, indexed by the
+#base-3 code of their cells (0 empty, 1 black, 2 white; the first cell is the
+#least significant digit). Lines are cut to _MAX_LINE cells so that the tables
+#stay small on the larger boards.
+_MAX_LINE = 8
+_EMPTY_DIGIT = 0
+_BLACK_DIGIT = 1
+_WHITE_DIGIT = 2
+
+_MAGIC = b"OTHPAT01"
+_HEADER = struct.Struct("<8sBBcxI")   #magic, num_rows, num_cols, how_to_win, num_patterns
+
+_LAYOUTS = dict()
+
+
+def _get_patterns(num_rows, num_cols):
+    """
+    Returns the patterns of a board size.
+    @num_rows: The number of rows of a board
+    @num_cols: The number of columns of a board
+    type num_rows: int
+    type num_cols: int
+    return: A list of (name, offsets) pairs
+    rtype: list
+    """
+    length = min(_MAX_LINE, num_rows, num_cols)
+    return [("edge", [(0, k) for k in range(length)]),
+            ("corner", [(i, j) for i in range(3) for j in range(3)]),
+            ("diagonal", [(k, k) for k in range(length)]),
+            ("row2", [(1, k) for k in range(length)]),
+            ("row3", [(2, k) for k in range(length)])]
+
+
+def _get_layout(num_rows, num_cols):
+    """
+    Lays the patterns of a board size over the board, building the
+    layout on first use.
+    @num_rows: The number of rows of a board
+    @num_cols: The number of columns of a board
+    type num_rows: int
+    type num_cols: int
+    return: A tuple in the form (names, instances, cell_updates), where
+            names lists the pattern names, instances lists every
+            instance as (pattern number, cell indices), and
+            cell_updates[index] lists the (instance number, power of 3)
+            pairs of the cell with that index
+    rtype: tuple
+    """
+    key = (num_rows, num_cols)
+    if key not in _LAYOUTS:
+        patterns = _get_patterns(num_rows, num_cols)
+        instances = []
+        seen = set()
+        for (number, (name, offsets)) in enumerate(patterns):
+            for (corner_row, d_row) in ((0, 1), (num_rows-1, -1)):
+                for (corner_col, d_col) in ((0, 1), (num_cols-1, -1)):
+                    for transposed in (False, True):
+                        cells = [(corner_row + d_row*(j if transposed else i),
+                                  corner_col + d_col*(i if transposed else j)) for (i, j) in offsets]
+                        #An instance covering the same cells as another one
+                        #(e.g. a full edge seen from both of its corners) is
+                        #only counted once.
+                        if frozenset(cells) not in seen:
+                            seen.add(frozenset(cells))
+                            instances.append((number, [i_row*num_cols + i_col
+                                                       for (i_row, i_col) in cells]))
+
+        cell_updates = [[] for index in range(num_rows*num_cols)]
+        for (instance, (number, indices)) in enumerate(instances):
+            for (position, index) in enumerate(indices):
+                cell_updates[index].append((instance, 3**position))
+        _LAYOUTS[key] = ([name for (name, offsets) in patterns], instances,
+                         [tuple(updates) for updates in cell_updates])
+    return _LAYOUTS[key]
+
+
+
+
+class PatternEvaluator:
+    """
+    A position evaluator that adds up the weights of the patterns found on
+    the board. The pattern codes are kept up to date incrementally as the
+    search makes and takes back moves (see on_apply and on_undo), so that
+    scoring a leaf only costs one table lookup per pattern instance.
+    The weights score positions for black; white's score is the opposite.
+    """
+
+    def __init__(self, num_rows, num_cols, how_to_win=">", weights=None):
+        """
+        Initializes a PatternEvaluator object.
+        @num_rows: The number of rows of the boards
+        @num_cols: The number of columns of the boards
+        @how_to_win: The win method the weights were trained for
+        @weights: An optional list of weight arrays, one per pattern
+                  (all zero if not given)
+        type num_rows: int
+        type num_cols: int
+        type how_to_win: str
+        type weights: list
+        return: None
+        rtype: None
+        """
+        self._num_rows = num_rows
+        self._num_cols = num_cols
+        self._how_to_win = how_to_win
+        (self._names, self._instances, self._cell_updates) = _get_layout(num_rows, num_cols)
+        if weights is None:
+            weights = [array("d", bytes(8 * 3**len(offsets)))
+                       for (name, offsets) in _get_patterns(num_rows, num_cols)]
+        self._weights = weights
+        self._instance_weights = [weights[number] for (number, indices) in self._instances]
+        self._codes = array("l", [0] * len(self._instances))
+        self._hash = None #Hash of the position the codes belong to
+        self._moves = [] #The changes of the moves made since the last reset
+
+
+    def reset(self, gamestate):
+        """
+        Computes the pattern codes of a position from scratch.
+        @gamestate: The game state of an Othello game
+        type gamestate: Othello
+        return: None
+        rtype: None
+        """
+        digits = [_BLACK_DIGIT if cell == "B" else _WHITE_DIGIT if cell == "W" else _EMPTY_DIGIT
+                  for row in gamestate.get_board() for cell in row]
+        for (instance, (number, indices)) in enumerate(self._instances):
+            code = 0
+            for index in reversed(indices):
+                code = 3*code + digits[index]
+            self._codes[instance] = code
+        self._hash = gamestate.get_hash()
+        self._moves.clear()
+
+
+    def evaluate(self, gamestate, cpu_player):
+        """
+        Scores a position for a player.
+        @gamestate: The game state of an Othello game
+        @cpu_player: The color of the player the score is for
+        type gamestate: Othello
+        type cpu_player: str
+        return: The score of the position (higher is better for cpu_player)
+        rtype: float
+        """
+        if gamestate.get_hash() != self._hash:
+            self.reset(gamestate) #The codes belong to another position
+        codes = self._codes
+        score = 0.0
+        for (instance, weights) in enumerate(self._instance_weights):
+            score += weights[codes[instance]]
+        return score if cpu_player == "B" else -score
+
+
+    def on_apply(self, gamestate, record):
+        """
+        Updates the pattern codes after a move was made.
+        @gamestate: The game state after the move
+        @record: The undo record returned by apply_move()
+        type gamestate: Othello or BitboardOthello
+        type record: UndoRecord or BitUndoRecord
+        return: None
+        rtype: None
+        """
+        if self._hash != record.hash: #The codes belong to another position
+            self.reset(gamestate)
+            return
+        (mover, opp) = (_BLACK_DIGIT, _WHITE_DIGIT) if record.turn == "B"\
+                       else (_WHITE_DIGIT, _BLACK_DIGIT)
+        if hasattr(record, "flip_lst"):
+            placed = record.i_row*self._num_cols + record.i_col
+            flipped = list(record.flip_lst) #Flat cell indices
+        else:
+            #A bitboard record holds the bitboards from before the move
+            (black, white) = gamestate.get_bitboards()
+            (new_own, old_own, old_opp) = (black, record.black, record.white) if record.turn == "B"\
+                                          else (white, record.white, record.black)
+            placed = (new_own & ~(old_own | old_opp)).bit_length()-1
+            flipped = []
+            bits = new_own & old_opp
+            while bits:
+                low = bits & -bits
+                flipped.append(low.bit_length()-1)
+                bits ^= low
+
+        self._update(placed, flipped, mover, opp, 1)
+        self._moves.append((placed, flipped, mover, opp, record.hash))
+        self._hash = gamestate.get_hash()
+
+
+    def on_undo(self, gamestate, record):
+        """
+        Updates the pattern codes after a move was taken back.
+        @gamestate: The game state after the undo
+        @record: The undo record the move was taken back with
+        type gamestate: Othello or BitboardOthello
+        type record: UndoRecord or BitUndoRecord
+        return: None
+        rtype: None
+        """
+        if not self._moves or self._moves[-1][4] != gamestate.get_hash():
+            self.reset(gamestate)
+            return
+        (placed, flipped, mover, opp, old_hash) = self._moves.pop()
+        self._update(placed, flipped, mover, opp, -1)
+        self._hash = old_hash
+
+
+    def get_weights(self):
+        """
+        Returns the weight arrays, one per pattern.
+        return: A list of arrays of weights
+        rtype: list
+        """
+        return self._weights
+
+
+    def save(self, path):
+        """
+        Writes the weights to a file (readable with load()).
+        @path: The path of the file to write
+        type path: str
+        return: None
+        rtype: None
+        """
+        with open(path, "wb") as weight_file:
+            weight_file.write(_HEADER.pack(_MAGIC, self._num_rows, self._num_cols,
+                                           self._how_to_win.encode(), len(self._weights)))
+            for weights in self._weights:
+                if sys.byteorder == "big":
+                    weights = array("d", weights)
+                    weights.byteswap() #The file is little-endian
+                weight_file.write(weights.tobytes())
+
+
+    def _update(self, placed, flipped, mover, opp, direction):
+        """
+        Applies (direction 1) or takes back (direction -1) the code
+        changes of a move.
+        @placed: The index of the cell the tile was placed on
+        @flipped: The indices of the flipped cells
+        @mover: The digit of the player who moved
+        @opp: The digit of their opponent
+        @direction: 1 for a move made or -1 for a move taken back
+        type placed: int
+        type flipped: [int]
+        type mover: int
+        type opp: int
+        type direction: int
+        return: None
+        rtype: None
+        """
+        codes = self._codes
+        for (instance, power) in self._cell_updates[placed]:
+            codes[instance] += direction * mover * power
+        for index in flipped:
+            for (instance, power) in self._cell_updates[index]:
+                codes[instance] += direction * (mover - opp) * power
+
+
+
+
+def load(path):
+    """
+    Reads a PatternEvaluator from a file written by PatternEvaluator.save().
+    @path: The path of the weight file
+    type path: str
+    return: The evaluator with the file's weights
+    rtype: PatternEvaluator
+    """
+    with open(path, "rb") as weight_file:
+        data = weight_file.read()
+    (magic, num_rows, num_cols, how_to_win, num_patterns) = _HEADER.unpack_from(data, 0)
+    patterns = _get_patterns(num_rows, num_cols)
+    if magic != _MAGIC or num_patterns != len(patterns):
+        raise ValueError("Not a pattern weight file: {}".format(path))
+
+    weights = []
+    offset = _HEADER.size
+    for (name, offsets) in patterns:
+        size = 8 * 3**len(offsets)
+        pattern_weights = array("d", data[offset:offset+size])
+        if sys.byteorder == "big":
+            pattern_weights.byteswap()
+        weights.append(pattern_weights)
+        offset += size
+    return PatternEvaluator(num_rows, num_cols, how_to_win.decode(), weights)
+
+
+def train(games, num_rows, num_cols, how_to_win=">", epochs=10, learning_rate=0.002,
+          evaluator=None, seed=0):
+    """
+    Fits pattern weights to the outcomes of finished games by least squares,
+    with stochastic gradient descent over every position of the games. Each
+    position's target is the final score for black (the disc difference,
+    negated if the fewest pieces win). Games on another board or with
+    another win method, and unfinished games, are skipped.
+    @games: The games as gamerecord.GameRecord tuples (e.g. streamed
+            from a record file by gamerecord.read_games())
+    @num_rows: The number of rows of the games' board
+    @num_cols: The number of columns of the games' board
+    @how_to_win: The win method of the games (">" or "<")
+    @epochs: The number of passes over the positions
+    @learning_rate: The step size of every weight update
+    @evaluator: An optional evaluator to keep training (a new one
+                with all weights zero is trained if none is given)
+    @seed: The seed of the order the positions are visited in
+    type games: iterable
+    type num_rows: int
+    type num_cols: int
+    type how_to_win: str
+    type epochs: int
+    type learning_rate: float
+    type evaluator: PatternEvaluator
+    type seed: int
+    return: The trained evaluator and the mean squared error of
+            every epoch
+    rtype: tuple
+    """
+    if evaluator is None:
+        evaluator = PatternEvaluator(num_rows, num_cols, how_to_win)
+    sign = 1 if how_to_win == ">" else -1
+
+    samples = []   #(codes, target) of every position
+    for record in games:
+        if (record.num_rows, record.num_cols, record.how_to_win) != (num_rows, num_cols, how_to_win)\
+           or record.winner == " ":
+            continue
+        positions = []
+        for (gamestate, player, move) in gamerecord.replay(record):
+            evaluator.reset(gamestate)
+            positions.append(list(evaluator._codes))
+        if positions:
+            (black, white) = gamestate.get_counts() #The replay ends at the end of the game
+            samples += [(codes, sign * (black - white)) for codes in positions]
+
+    rng = random.Random(seed)
+    instance_weights = evaluator._instance_weights
+    errors = []
+    for epoch in range(epochs):
+        rng.shuffle(samples)
+        total = 0.0
+        for (codes, target) in samples:
+            error = target
+            for (instance, weights) in enumerate(instance_weights):
+                error -= weights[codes[instance]]
+            total += error * error
+            step = learning_rate * error
+            for (instance, weights) in enumerate(instance_weights):
+                weights[codes[instance]] += step
+        errors.append(total / len(samples) if samples else 0.0)
+    evaluator._hash = None #The codes belong to the last sample
+    return (evaluator, errors)
+
+
+
+
+def _pattern_abp_strategy(gamestate, player, options, memory):
+    """
+    A selfplay strategy that plays the move picked by an alpha-beta search
+    scored by a PatternEvaluator (options: weights, the path of a weight
+    file, and depth).
+    return: The result of the search
+    rtype: othelloai.SearchResult
+    """
+    evaluator = memory.setdefault("evaluator", load(options["weights"]))
+    table = memory.setdefault("table", transposition.TranspositionTable())
+    orderer = memory.setdefault("orderer", moveordering.MoveOrderer())
+    orderer.new_search()
+    return othelloai.minimax_abp(gamestate, player, float("-inf"), float("inf"),
+                                 options.get("depth", 4), table, None, orderer,
+                                 evaluator=evaluator)
+
+
+selfplay.register_strategy("pattern_abp", _pattern_abp_strategy)
+
+
+def main():
+    """
+    Trains pattern weights on self-play games from the command line and
+    optionally plays a match between the trained evaluator and minimax_eval.
+    return: None
+    rtype: None
+    """
+    parser = argparse.ArgumentParser(description="Trains Othello pattern weights on self-play games.")
+    parser.add_argument("path", help="the weight file to write")
+    parser.add_argument("--strategy-a", default="greedy_cpu")
+    parser.add_argument("--strategy-b", default="minimax_abp:depth=2")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=8)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--win-method", choices=[">", "<"], default=">")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--learning-rate", type=float, default=0.002)
+    parser.add_argument("--match-games", type=int, default=0,
+                        help="games of pattern_abp against minimax_abp after training")
+    parser.add_argument("--match-depth", type=int, default=3)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--records", metavar="PATH", default=None,
+                        help="train on the games of a record file instead of self-play")
+    args = parser.parse_args()
+
+    if args.records is not None:
+        games = gamerecord.read_games(args.records) #Streamed, not loaded at once
+    else:
+        games = []
+        for first_mover in ("B", "W"):
+            results = selfplay.run_match(selfplay.parse_strategy(args.strategy_a),
+                                         selfplay.parse_strategy(args.strategy_b),
+                                         args.games // 2, args.processes, args.seed, True,
+                                         num_rows=args.rows, num_cols=args.cols,
+                                         first_mover=first_mover, top_left="B",
+                                         how_to_win=args.win_method)
+            games += [selfplay.get_record(game) for game in results["game_records"]]
+    (evaluator, errors) = train(games, args.rows, args.cols, args.win_method, args.epochs,
+                                args.learning_rate, seed=args.seed)
+    evaluator.save(args.path)
+    print("mean squared error by epoch: {}".format(
+        ", ".join("{:.2f}".format(error) for error in errors)))
+
+    if args.match_games:
+        results = selfplay.run_match(("pattern_abp", {"weights": args.path, "depth": args.match_depth}),
+                                     ("minimax_abp", {"depth": args.match_depth}),
+                                     args.match_games, args.processes, args.seed,
+                                     num_rows=args.rows, num_cols=args.cols,
+                                     how_to_win=args.win_method)
+        print(json.dumps(results["results"]))
+
+
+
+
+if __name__ == "__main__":
+    main()
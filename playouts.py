@@ -0,0 +1,103 @@
+#Contains the service that plays batches of Monte Carlo playouts in several processes.
+import concurrent.futures
+import os
+import random
+import bitboard
+import mcts
+
+
+
+
+def _play_chunk(task):
+    """
+    Plays out a chunk of leaf positions in a worker process.
+    @task: A tuple in the form (num_rows, num_cols, sign, seed,
+           playouts_per_leaf, leaves), where each leaf is a
+           (black_bits, white_bits, turn) tuple
+    type task: tuple
+    return: A list of (black_wins, white_wins, draws) tuples, one
+            per leaf
+    rtype: list
+    """
+    (num_rows, num_cols, sign, seed, playouts_per_leaf, leaves) = task
+    geometry = bitboard.get_geometry(num_rows, num_cols)
+    rng = random.Random(seed)
+    results = []
+    for (black, white, turn) in leaves:
+        (own, opp) = (black, white) if turn == "B" else (white, black)
+        wins = {"B": 0, "W": 0, "NONE": 0}
+        for count in range(playouts_per_leaf):
+            wins[mcts.rollout(own, opp, turn, geometry, sign, rng)] += 1
+        results.append((wins["B"], wins["W"], wins["NONE"]))
+    return results
+
+
+
+
+class PlayoutService:
+    """
+    Plays random playouts from batches of leaf positions in a pool of
+    worker processes. A leaf travels as its two bitboards and the player
+    to move (a few bytes once pickled), and a batch is split into one
+    chunk per worker, so a batch costs a single round trip per worker.
+    """
+
+    def __init__(self, processes=None, seed=None):
+        """
+        Starts the worker processes of a PlayoutService object.
+        @processes: The number of worker processes (all cores by default)
+        @seed: An optional seed for the playouts
+        type processes: int
+        type seed: int
+        return: None
+        rtype: None
+        """
+        self._processes = processes or os.cpu_count() or 1
+        self._executor = concurrent.futures.ProcessPoolExecutor(self._processes)
+        self._rng = random.Random(seed)
+
+
+    def play(self, num_rows, num_cols, how_to_win, leaves, playouts_per_leaf=1):
+        """
+        Plays random games out from several positions.
+        @num_rows: The number of rows of the board
+        @num_cols: The number of columns of the board
+        @how_to_win: The win method of the game (">" or "<")
+        @leaves: The positions as (black_bits, white_bits, turn) tuples
+        @playouts_per_leaf: The number of playouts from each position
+        type num_rows: int
+        type num_cols: int
+        type how_to_win: str
+        type leaves: list
+        type playouts_per_leaf: int
+        return: A list of (black_wins, white_wins, draws) tuples in the
+                order of the leaves
+        rtype: list
+        """
+        if not leaves:
+            return []
+        sign = 1 if how_to_win == ">" else -1
+        chunk_size = -(-len(leaves) // self._processes)   #Rounded up
+        tasks = [(num_rows, num_cols, sign, self._rng.getrandbits(32), playouts_per_leaf,
+                  leaves[start:start+chunk_size]) for start in range(0, len(leaves), chunk_size)]
+        results = []
+        for chunk in self._executor.map(_play_chunk, tasks):
+            results += chunk
+        return results
+
+
+    def close(self):
+        """
+        Stops the worker processes.
+        return: None
+        rtype: None
+        """
+        self._executor.shutdown()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,263 @@
+#Contains the opt-in instrumentation that counts and times the engine's hot paths.
+import argparse
+import cProfile
+import io
+import pstats
+import sys
+import time
+import bitboard
+import endgame
+import mcts
+import moveordering
+import othello
+import othelloai
+import transposition
+
+
+
+
+#The functions instrumented by enable(). Nothing is patched while profiling is
+#off, so a disabled profiler costs nothing at all.
+TARGETS = [(othello.Othello, ("valid_move", "legal_moves", "apply_move", "undo",
+                              "_valid_placement", "_flip", "_end_turn", "_valid_move_exists")),
+           (bitboard.BitboardOthello, ("legal_moves", "apply_move", "undo")),
+           (othelloai, ("greedy_move", "minimax", "_minimax", "minimax_abp", "_minimax_abp",
+                        "iterative_deepening", "minimax_eval")),
+           (transposition.TranspositionTable, ("lookup", "store")),
+           (moveordering.MoveOrderer, ("order", "record_cutoff")),
+           (endgame, ("solve",)),
+           (mcts.MCTS, ("search",))]
+
+#The AI entry points. When one returns and no other one is running, a move has
+#been picked, and a report is written if enable() was asked to.
+_AI_MOVES = {(othelloai, "greedy_move"), (othelloai, "minimax"), (othelloai, "minimax_abp"),
+             (othelloai, "iterative_deepening"), (mcts.MCTS, "search")}
+
+_functions = dict()   #"Owner.name" -> [calls, nanoseconds, active calls]
+_counters = dict()    #Counter name -> count
+_originals = []       #(owner, name, original function) of every patched function
+_report_out = None
+_ai_active = 0
+
+
+def _count_result(name, result):
+    """
+    Updates the counters derived from what an instrumented function
+    returned.
+    @name: The name of the function
+    @result: What the function returned
+    type name: str
+    type result: object
+    return: None
+    rtype: None
+    """
+    if name == "apply_move":
+        if result is not None:
+            _counters["nodes"] = _counters.get("nodes", 0) + 1
+    elif name == "legal_moves":
+        _counters["moves generated"] = _counters.get("moves generated", 0) + len(result)
+    elif name == "lookup":
+        _counters["tt lookups"] = _counters.get("tt lookups", 0) + 1
+        if result is not None:
+            _counters["tt hits"] = _counters.get("tt hits", 0) + 1
+    elif name == "record_cutoff":
+        _counters["cutoffs"] = _counters.get("cutoffs", 0) + 1
+
+
+def _instrument(owner, name):
+    """
+    Replaces a function by one that counts and times its calls.
+    Only the outermost call of a recursion is timed, so the time of a
+    recursive search is not counted again for every level.
+    @owner: The module or class holding the function
+    @name: The name of the function
+    type owner: object
+    type name: str
+    return: None
+    rtype: None
+    """
+    original = getattr(owner, name)
+    label = "{}.{}".format(getattr(owner, "__name__", owner), name)
+    stats = _functions.setdefault(label, [0, 0, 0])
+    counted = name in ("apply_move", "legal_moves", "lookup", "record_cutoff")
+    ai_move = (owner, name) in _AI_MOVES
+    perf_counter_ns = time.perf_counter_ns
+
+    def instrumented(*args, **kwargs):
+        global _ai_active
+        stats[0] += 1
+        stats[2] += 1
+        if ai_move:
+            _ai_active += 1
+        start = perf_counter_ns()
+        try:
+            result = original(*args, **kwargs)
+        finally:
+            stats[2] -= 1
+            if stats[2] == 0:
+                stats[1] += perf_counter_ns() - start
+            if ai_move:
+                _ai_active -= 1
+                if _ai_active == 0 and _report_out is not None:
+                    _report_out.write(report() + "\n")
+                    reset()
+        if counted:
+            _count_result(name, result)
+        return result
+
+    instrumented.__wrapped__ = original
+    setattr(owner, name, instrumented)
+    _originals.append((owner, name, original))
+
+
+def enable(report_each_move=False, out=None):
+    """
+    Instruments the functions listed in TARGETS. Does nothing if
+    profiling is already on.
+    @report_each_move: Whether a report is written (and the counts
+                       reset) after every move an AI picks
+    @out: Where those reports go (stderr by default)
+    type report_each_move: bool
+    type out: file
+    return: None
+    rtype: None
+    """
+    global _report_out
+    if _originals:
+        return
+    _report_out = (out or sys.stderr) if report_each_move else None
+    for (owner, names) in TARGETS:
+        for name in names:
+            _instrument(owner, name)
+
+
+def disable():
+    """
+    Puts the original functions back. The counts are kept until reset()
+    is called.
+    return: None
+    rtype: None
+    """
+    global _report_out
+    while _originals:
+        (owner, name, original) = _originals.pop()
+        setattr(owner, name, original)
+    _report_out = None
+
+
+def is_enabled():
+    """
+    Returns whether profiling is on.
+    return: True if the TARGETS are instrumented or False otherwise
+    rtype: bool
+    """
+    return bool(_originals)
+
+
+def reset():
+    """
+    Sets every count and time back to zero.
+    return: None
+    rtype: None
+    """
+    for stats in _functions.values():
+        stats[0] = stats[1] = 0
+    _counters.clear()
+
+
+def get_counts():
+    """
+    Returns the counts gathered so far.
+    return: A dictionary with "functions", mapping each function to
+            its calls and nanoseconds, and "counters", mapping nodes,
+            moves generated, tt lookups, tt hits and cutoffs to their
+            counts (cutoffs are recorded by a move orderer, so searches
+            without one report none)
+    rtype: dict
+    """
+    return {"functions": {label: {"calls": stats[0], "ns": stats[1]}
+                          for (label, stats) in _functions.items() if stats[0]},
+            "counters": dict(_counters)}
+
+
+def report():
+    """
+    Formats the counts gathered so far as a table, slowest functions
+    first.
+    return: The report
+    rtype: str
+    """
+    lines = ["{:<40} {:>12} {:>12} {:>10}".format("function", "calls", "total ms", "ns/call")]
+    for (label, stats) in sorted(_functions.items(), key=lambda item: -item[1][1]):
+        if stats[0]:
+            lines.append("{:<40} {:>12} {:>12.2f} {:>10.0f}".format(
+                label, stats[0], stats[1] / 1e6, stats[1] / stats[0]))
+    for (name, count) in sorted(_counters.items()):
+        lines.append("{:<40} {:>12}".format(name, count))
+    return "\n".join(lines)
+
+
+def profile_call(function, *args, path=None, sort="cumulative", limit=30, **kwargs):
+    """
+    Runs one call (e.g. a search) under cProfile.
+    @function: The function to call
+    @args: The function's positional arguments
+    @path: An optional file to dump the raw pstats data to (for
+           pstats, snakeviz and the like)
+    @sort: The pstats sort key of the listing
+    @limit: The number of functions listed
+    @kwargs: The function's keyword arguments
+    type function: function
+    type args: tuple
+    type path: str
+    type sort: str
+    type limit: int
+    type kwargs: dict
+    return: A tuple containing what the function returned and the
+            pstats listing
+    rtype: tuple
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args, **kwargs)
+    if path is not None:
+        profiler.dump_stats(path)
+    listing = io.StringIO()
+    pstats.Stats(profiler, stream=listing).sort_stats(sort).print_stats(limit)
+    return (result, listing.getvalue())
+
+
+def main():
+    """
+    Profiles an iterative deepening search of a benchmark position from
+    the command line.
+    return: None
+    rtype: None
+    """
+    import benchmark
+    parser = argparse.ArgumentParser(description="Profiles a search of the Othello AI.")
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--time-ms", type=float, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cprofile", metavar="PATH", nargs="?", const="",
+                        help="run under cProfile instead (and dump the pstats data to PATH)")
+    args = parser.parse_args()
+
+    gamestate = benchmark.make_positions(args.size, args.size, 1, args.seed)[0]
+    search_args = (gamestate, gamestate.get_turn(), args.time_ms, args.depth)
+    if args.cprofile is not None:
+        (result, listing) = profile_call(othelloai.iterative_deepening, *search_args,
+                                         path=args.cprofile or None)
+        print(listing)
+    else:
+        enable()
+        result = othelloai.iterative_deepening(*search_args)
+        disable()
+        print(report())
+    print(othelloai.format_result(result))
+
+
+
+
+if __name__ == "__main__":
+    main()
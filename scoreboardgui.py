@@ -1,6 +1,7 @@
 #Contains the class for the scoreboard GUI.
 import tkinter
 import othello
+import othelloai
 
 class ScoreBoardGUI(tkinter.Frame):
     
@@ -29,6 +30,16 @@ class ScoreBoardGUI(tkinter.Frame):
                                     background="gray", font="Arial 15 bold")
         self._turn_indicator.pack(side=tkinter.TOP)
 
+        self._thinking_text = tkinter.StringVar()
+        self._thinking_indicator = tkinter.Label(master=self, textvariable=self._thinking_text,
+                                                 background="gray", font="Arial 10 italic")
+        self._thinking_indicator.pack(side=tkinter.TOP)
+
+        self._search_text = tkinter.StringVar()
+        self._search_indicator = tkinter.Label(master=self, textvariable=self._search_text,
+                                               background="gray", font="Arial 9", wraplength=400)
+        self._search_indicator.pack(side=tkinter.TOP)
+
         self._black_score_text = tkinter.StringVar()
         self._black_score_text.set("Black Score: {}".format(gamestate.get_counts()[0]))
         self._black_score = tkinter.Label(master=self, textvariable=self._black_score_text, background="gray")
@@ -61,8 +72,41 @@ class ScoreBoardGUI(tkinter.Frame):
         return: None
         rtype: None
         """
-        self._black_score_text.set("Black Score: {}".format(gamestate.get_counts()[0]))
-        self._white_score_text.set("White Score: {}".format(gamestate.get_counts()[1]))
+        counts = gamestate.get_counts()
+        self._black_score_text.set("Black Score: {}".format(counts[0]))
+        self._white_score_text.set("White Score: {}".format(counts[1]))
+
+
+    def indicate_thinking(self, player, thinking):
+        """
+        Shows or hides the label telling the player that the CPU is
+        searching for its move.
+        @player: The color of the CPU player ("B" or "W")
+        @thinking: True while the CPU is searching, False otherwise
+        type player: str
+        type thinking: bool
+        return: None
+        rtype: None
+        """
+        if thinking:
+            self._thinking_text.set("{} is thinking... (press Space to move now)".format\
+                                    ("BLACK" if player=="B" else "WHITE"))
+        else:
+            self._thinking_text.set("")
+
+
+    def show_search_result(self, player, result):
+        """
+        Shows the statistics of the search that picked the CPU's move.
+        @player: The color of the CPU player ("B" or "W")
+        @result: The result of the search
+        type player: str
+        type result: othelloai.SearchResult
+        return: None
+        rtype: None
+        """
+        self._search_text.set("{}: {}".format("BLACK" if player=="B" else "WHITE",
+                                              othelloai.format_result(result)))
 
 
     def indicate_invalid(self, gamestate):
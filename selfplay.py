@@ -0,0 +1,367 @@
+#Contains the headless runner that plays AI-versus-AI games without the GUI.
+import argparse
+import json
+import multiprocessing
+import random
+import time
+import othello
+import othelloai
+import transposition
+import moveordering
+import endgame
+import gamerecord
+import mcts
+
+
+
+
+#A strategy is called as strategy(gamestate, player, options, memory) and returns
+#the (non 0-based) move to play, or an othelloai.SearchResult whose move is played
+#and whose statistics are logged with the game. options holds the strategy's settings (e.g.
+#{"depth": 4}) and memory is a dictionary kept for one player for a whole game,
+#where a strategy may keep anything it reuses between moves (e.g. a table).
+def _greedy_strategy(gamestate, player, options, memory):
+    """
+    Plays the move picked by othelloai.greedy_move.
+    return: The move to play
+    rtype: tuple
+    """
+    return othelloai.greedy_move(gamestate, player)
+
+
+def _minimax_strategy(gamestate, player, options, memory):
+    """
+    Plays the move picked by othelloai.minimax (option: depth).
+    return: The result of the search
+    rtype: othelloai.SearchResult
+    """
+    return othelloai.minimax(gamestate, player, options.get("depth", 3))
+
+
+def _minimax_abp_strategy(gamestate, player, options, memory):
+    """
+    Plays the move picked by othelloai.minimax_abp with a transposition
+    table and a move orderer kept for the whole game (option: depth).
+    return: The result of the search
+    rtype: othelloai.SearchResult
+    """
+    table = memory.setdefault("table", transposition.TranspositionTable())
+    orderer = memory.setdefault("orderer", moveordering.MoveOrderer())
+    orderer.new_search()
+    return othelloai.minimax_abp(gamestate, player, float("-inf"), float("inf"),
+                                 options.get("depth", 4), table, None, orderer)
+
+
+def _iterative_deepening_strategy(gamestate, player, options, memory):
+    """
+    Plays the move picked by othelloai.iterative_deepening with a
+    transposition table and a move orderer kept for the whole game
+    (options: time_ms, max_depth and endgame_empties).
+    return: The result of the search
+    rtype: othelloai.SearchResult
+    """
+    table = memory.setdefault("table", transposition.TranspositionTable())
+    orderer = memory.setdefault("orderer", moveordering.MoveOrderer())
+    return othelloai.iterative_deepening(gamestate, player, options.get("time_ms", 100),
+                                         options.get("max_depth", 10), table, orderer,
+                                         endgame_empties=options.get("endgame_empties",
+                                                                     endgame.DEFAULT_EMPTIES))
+
+
+def _mcts_strategy(gamestate, player, options, memory):
+    """
+    Plays the move picked by a Monte Carlo tree search whose tree is kept
+    for the whole game (options: playouts or time_ms, and exploration).
+    return: The result of the search
+    rtype: othelloai.SearchResult
+    """
+    searcher = memory.setdefault("mcts", mcts.MCTS(options.get("exploration", mcts.DEFAULT_EXPLORATION),
+                                                   random.getrandbits(32)))
+    if "time_ms" in options:
+        return searcher.search(gamestate, time_budget_ms=options["time_ms"])
+    return searcher.search(gamestate, options.get("playouts", mcts.DEFAULT_PLAYOUTS))
+
+
+STRATEGIES = {"greedy_cpu": _greedy_strategy,
+              "minimax": _minimax_strategy,
+              "minimax_abp": _minimax_abp_strategy,
+              "iterative_deepening": _iterative_deepening_strategy,
+              "mcts": _mcts_strategy}
+
+
+def register_strategy(name, strategy):
+    """
+    Makes a strategy available to the runner under the given name.
+    Strategies should be registered when their module is imported so
+    that the worker processes know about them too.
+    @name: The name of the strategy
+    @strategy: A function called as strategy(gamestate, player,
+               options, memory) that returns the move to play
+    type name: str
+    type strategy: function
+    return: None
+    rtype: None
+    """
+    STRATEGIES[name] = strategy
+
+
+def parse_strategy(spec):
+    """
+    Parses a strategy specification of the form "name" or
+    "name:key=value,key=value" (e.g. "minimax_abp:depth=5").
+    @spec: A strategy specification
+    type spec: str
+    return: A tuple in the form (name, options)
+    rtype: tuple
+    """
+    (name, sep, settings) = spec.partition(":")
+    if name not in STRATEGIES:
+        raise ValueError("Unknown strategy: {}".format(name))
+    options = dict()
+    for setting in settings.split(",") if settings else []:
+        (key, sep, value) = setting.partition("=")
+        try:
+            options[key] = int(value)
+        except ValueError:
+            try:
+                options[key] = float(value)
+            except ValueError:
+                options[key] = value
+    return (name, options)
+
+
+def play_game(black, white, num_rows=8, num_cols=8, first_mover="B",
+              top_left="B", how_to_win=">", seed=None):
+    """
+    Plays one game between two strategies without any GUI.
+    @black: The (name, options) of the strategy playing black
+    @white: The (name, options) of the strategy playing white
+    @num_rows: The number of rows of the board
+    @num_cols: The number of columns of the board
+    @first_mover: The player who moves first ("B" or "W")
+    @top_left: The top-left player in the initial center
+               four-piece layout
+    @how_to_win: The method for winning a game (e.g.,
+                 most pieces ">" or fewest pieces "<")
+    @seed: An optional seed for the strategies' random choices
+    type black: tuple
+    type white: tuple
+    type num_rows: int
+    type num_cols: int
+    type first_mover: str
+    type top_left: str
+    type how_to_win: str
+    type seed: int
+    return: A dictionary with the winner ("B", "W" or "NONE"), the
+            final counts, the board settings, and the moves played as
+            [player, row, col] lists alongside how long each took in
+            milliseconds and the statistics of the search that picked
+            it (None for strategies that don't search)
+    rtype: dict
+    """
+    if seed is not None:
+        random.seed(seed)
+    gamestate = othello.Othello(num_rows, num_cols, first_mover, top_left, how_to_win)
+    players = {"B": black, "W": white}
+    memories = {"B": dict(), "W": dict()}
+    moves = []
+    move_times = []
+    searches = []
+
+    while gamestate.get_winner() == " ":
+        player = gamestate.get_turn()
+        (name, options) = players[player]
+        start = time.perf_counter()
+        move = STRATEGIES[name](gamestate, player, options, memories[player])
+        move_times.append((time.perf_counter() - start) * 1000)
+        if isinstance(move, othelloai.SearchResult):
+            searches.append({field: value for (field, value) in move._asdict().items()
+                             if field != "move"})
+            move = move.move
+        else:
+            searches.append(None)
+        if move is None or gamestate.apply_move(move[0], move[1]) is None:
+            raise othello.OthelloInvalidMoveError(
+                "{} played an invalid move: {}".format(name, move))
+        moves.append([player, move[0], move[1]])
+
+    settings = {"num_rows": num_rows, "num_cols": num_cols, "first_mover": first_mover,
+                "top_left": top_left, "how_to_win": how_to_win}
+    return {"winner": gamestate.get_winner(), "counts": gamestate.get_counts(),
+            "settings": settings, "moves": moves, "move_times": move_times, "searches": searches}
+
+
+def get_record(result):
+    """
+    Builds the game record of a game played by play_game().
+    @result: The result of play_game()
+    type result: dict
+    return: The record of the game
+    rtype: gamerecord.GameRecord
+    """
+    return gamerecord.make_record(moves=[tuple(move) for move in result["moves"]],
+                                  winner=result["winner"], **result["settings"])
+
+
+def _play_game_task(task):
+    """
+    Plays one game of a match in a worker process.
+    @task: A tuple in the form (game_index, strategy_a, strategy_b,
+           settings, seed). Strategy a plays black in even games
+           and white in odd games.
+    type task: tuple
+    return: The result of play_game() along with the game index and
+            the color played by strategy a
+    rtype: dict
+    """
+    (index, strategy_a, strategy_b, settings, seed) = task
+    a_color = "B" if index % 2 == 0 else "W"
+    (black, white) = (strategy_a, strategy_b) if a_color == "B" else (strategy_b, strategy_a)
+    result = play_game(black, white, seed=seed, **settings)
+    result["game"] = index
+    result["a_color"] = a_color
+    return result
+
+
+def _summarize_times(times):
+    """
+    Summarizes a list of move times.
+    @times: Move times in milliseconds
+    type times: [float]
+    return: A dictionary with the count, mean, median and max time
+    rtype: dict
+    """
+    if not times:
+        return {"moves": 0, "mean_ms": 0.0, "median_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(times)
+    return {"moves": len(ordered), "mean_ms": sum(ordered) / len(ordered),
+            "median_ms": ordered[len(ordered)//2], "max_ms": ordered[-1]}
+
+
+def _summarize_searches(searches):
+    """
+    Summarizes the statistics of a list of searches.
+    @searches: The statistics logged by play_game() (None entries,
+               for moves that weren't searched, are skipped)
+    type searches: [dict]
+    return: A dictionary with the count of searches, their mean depth,
+            their total nodes and their mean nodes per second
+    rtype: dict
+    """
+    searches = [search for search in searches if search is not None]
+    if not searches:
+        return {"searches": 0, "mean_depth": 0.0, "nodes": 0, "mean_nps": 0.0}
+    return {"searches": len(searches),
+            "mean_depth": sum(search["depth"] for search in searches) / len(searches),
+            "nodes": sum(search["nodes"] for search in searches),
+            "mean_nps": sum(search["nps"] for search in searches) / len(searches)}
+
+
+def run_match(strategy_a, strategy_b, num_games, processes=None, seed=0,
+              keep_games=False, record_path=None, **settings):
+    """
+    Plays a match of several games between two strategies across a process
+    pool. The strategies swap colors every game so neither keeps the first
+    move or the top-left layout.
+    @strategy_a: The (name, options) of the first strategy
+    @strategy_b: The (name, options) of the second strategy
+    @num_games: The number of games to play
+    @processes: The number of worker processes (all cores by default)
+    @seed: The seed of the first game (game i is seeded with seed+i)
+    @keep_games: Whether to include every game's moves in the results
+    @record_path: An optional game record file every game is appended
+                  to as it finishes (see gamerecord.py)
+    @settings: The board settings passed on to play_game() (num_rows,
+               num_cols, first_mover, top_left and how_to_win)
+    type strategy_a: tuple
+    type strategy_b: tuple
+    type num_games: int
+    type processes: int
+    type seed: int
+    type keep_games: bool
+    type record_path: str
+    return: A dictionary with the win/loss/draw counts of strategy a,
+            the move time and search summaries of each strategy and
+            the settings
+    rtype: dict
+    """
+    tasks = [(index, strategy_a, strategy_b, settings, seed + index)
+             for index in range(num_games)]
+    stats = {"a_wins": 0, "a_losses": 0, "draws": 0}
+    times = {"a": [], "b": []}
+    searches = {"a": [], "b": []}
+    games = []
+
+    start = time.perf_counter()
+    writer = gamerecord.GameWriter(record_path) if record_path is not None else None
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap_unordered(_play_game_task, tasks):
+                if writer is not None:
+                    writer.write(get_record(result))
+                if result["winner"] == "NONE":
+                    stats["draws"] += 1
+                elif result["winner"] == result["a_color"]:
+                    stats["a_wins"] += 1
+                else:
+                    stats["a_losses"] += 1
+                for ((player, row, col), elapsed, search) in zip(result["moves"], result["move_times"],
+                                                                 result["searches"]):
+                    side = "a" if player == result["a_color"] else "b"
+                    times[side].append(elapsed)
+                    searches[side].append(search)
+                if keep_games:
+                    games.append(result)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    games.sort(key=lambda result: result["game"])
+    return {"strategy_a": list(strategy_a), "strategy_b": list(strategy_b),
+            "games": num_games, "settings": settings, "seconds": time.perf_counter() - start,
+            "results": stats,
+            "move_times": {"a": _summarize_times(times["a"]), "b": _summarize_times(times["b"])},
+            "searches": {"a": _summarize_searches(searches["a"]),
+                         "b": _summarize_searches(searches["b"])},
+            "game_records": games if keep_games else None}
+
+
+def main():
+    """
+    Runs a match from the command line and writes its results as JSON.
+    return: None
+    rtype: None
+    """
+    parser = argparse.ArgumentParser(description="Plays Othello games between two AIs.")
+    parser.add_argument("strategy_a", help='e.g. "greedy_cpu" or "minimax_abp:depth=5"')
+    parser.add_argument("strategy_b")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=8)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--first-mover", choices=["B", "W"], default="B")
+    parser.add_argument("--top-left", choices=["B", "W"], default="B")
+    parser.add_argument("--win-method", choices=[">", "<"], default=">")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-games", action="store_true",
+                        help="include every game's moves and move times")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="a game record file to append every game to")
+    parser.add_argument("--output", default=None, help="JSON file (stdout by default)")
+    args = parser.parse_args()
+
+    results = run_match(parse_strategy(args.strategy_a), parse_strategy(args.strategy_b),
+                        args.games, args.processes, args.seed, args.keep_games, args.record,
+                        num_rows=args.rows, num_cols=args.cols, first_mover=args.first_mover,
+                        top_left=args.top_left, how_to_win=args.win_method)
+    if args.output is None:
+        print(json.dumps(results, indent=2))
+    else:
+        with open(args.output, "w") as out:
+            json.dump(results, out, indent=2)
+
+
+
+
+if __name__ == "__main__":
+    main()
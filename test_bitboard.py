@@ -0,0 +1,54 @@
+#Contains the tests that play the bitboard engine against the list-based one.
+import random
+import pytest
+import bitboard
+import othello
+
+
+
+
+def _assert_same(game, bit_game):
+    """
+    Asserts that two game states of different engines agree.
+    @game: The list-based game state
+    @bit_game: The bitboard game state
+    type game: othello.Othello
+    type bit_game: bitboard.BitboardOthello
+    return: None
+    rtype: None
+    """
+    assert game.get_board() == bit_game.get_board()
+    assert game.get_counts() == bit_game.get_counts()
+    assert game.get_turn() == bit_game.get_turn()
+    assert game.get_winner() == bit_game.get_winner()
+    assert game.get_hash() == bit_game.get_hash()
+    assert game.to_bytes() == bit_game.to_bytes()
+    assert list(game.legal_moves()) == list(bit_game.legal_moves())
+
+
+@pytest.mark.parametrize("num_rows,num_cols", [(4, 4), (8, 8), (6, 10)])
+@pytest.mark.parametrize("seed", range(5))
+def test_engines_agree_on_random_games(num_rows, num_cols, seed):
+    rng = random.Random(seed)
+    (first_mover, top_left, how_to_win) = (rng.choice("BW"), rng.choice("BW"), rng.choice("<>"))
+    game = othello.Othello(num_rows, num_cols, first_mover, top_left, how_to_win)
+    bit_game = bitboard.BitboardOthello(num_rows, num_cols, first_mover, top_left, how_to_win)
+    _assert_same(game, bit_game)
+
+    while game.get_winner() == " ":
+        #Any cell, including ones off the board and ones that are taken or flip nothing
+        (row, col) = (rng.randint(-1, num_rows+2), rng.randint(-1, num_cols+2))
+        (record, bit_record) = (game.apply_move(row, col), bit_game.apply_move(row, col))
+        assert (record is None) == (bit_record is None)
+        _assert_same(game, bit_game)
+        if record is not None:
+            game.undo(record)
+            bit_game.undo(bit_record)
+            _assert_same(game, bit_game)
+
+        (row, col) = rng.choice(sorted(game.legal_moves()))
+        assert game.apply_move(row, col) is not None
+        assert bit_game.apply_move(row, col) is not None
+        _assert_same(game, bit_game)
+
+    assert game.apply_move(1, 1) is None and bit_game.apply_move(1, 1) is None
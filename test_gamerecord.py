@@ -0,0 +1,48 @@
+#Contains the tests of the game records written by the GUI.
+import random
+import types
+import gamerecord
+import othello
+import othellogui
+
+
+
+
+def _make_gui():
+    """
+    Builds the state _process_move() works on, without opening a window.
+    return: A stand-in for an OthelloGUI object
+    rtype: types.SimpleNamespace
+    """
+    ignore = lambda *args: None
+    scoreboard = types.SimpleNamespace(update_turn_label=ignore, update_score_label=ignore,
+                                       indicate_result=ignore, indicate_invalid=ignore)
+    gui = types.SimpleNamespace(_num_rows=4, _num_cols=4, _first_mover="B", _top_left="B",
+                                _how_to_win=">", _game_active=True, _moves=[], _recorded=False,
+                                _corner_mappings=dict(), _scoreboard=scoreboard,
+                                _gamestate=othello.Othello(4, 4, "B", "B", ">"))
+    gui._draw_circles = ignore
+    gui._save_record = lambda: othellogui.OthelloGUI._save_record(gui)
+    return gui
+
+
+def test_finished_gui_game_replays_to_its_winner(tmp_path, monkeypatch):
+    monkeypatch.setattr(othellogui, "_RECORD_PATH", str(tmp_path / "games-{}x{}.rec"))
+    gui = _make_gui()
+    rng = random.Random(0)
+    played = 0
+    while gui._gamestate.get_winner() == " ":
+        (row, col) = rng.choice(sorted(gui._gamestate.legal_moves()))
+        othellogui.OthelloGUI._process_move(gui, row, col)
+        played += 1
+
+    records = list(gamerecord.read_games(str(tmp_path / "games-4x4.rec")))
+    assert len(records) == 1
+    record = records[0]
+    assert len([move for move in record.moves if move is not None]) == played
+    gamestate = None
+    for (gamestate, player, move) in gamerecord.replay(record):
+        pass
+    assert record.winner == gui._gamestate.get_winner()
+    assert gamestate.get_winner() == record.winner
+    assert gamestate.get_board() == gui._gamestate.get_board()
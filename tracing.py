@@ -0,0 +1,85 @@
+#Contains the tracing facility used to debug the game engine and the AIs.
+import sys
+
+
+
+
+#Trace levels. Each level also includes everything traced by the levels below it.
+OFF = 0
+MOVES = 1   #Moves played, passes, invalid moves and the AIs' decisions
+SEARCH = 2  #Search results and cutoffs
+NODES = 3   #Every node visited by a search
+BOARDS = 4  #Every node visited by a search along with its board
+
+_LEVEL_TAGS = {MOVES: "M", SEARCH: "S", NODES: "N", BOARDS: "B"}
+
+#The current trace level. Callers on a hot path check it before building a
+#message (e.g. "if tracing.level >= tracing.NODES:") so that a disabled trace
+#costs a single comparison.
+level = OFF
+_out = None
+_owns_out = False
+
+
+def configure(new_level, path=None):
+    """
+    Sets the trace level and where traces are written.
+    @new_level: The trace level (OFF, MOVES, SEARCH, NODES or BOARDS)
+    @path: The path of a trace file to write to. Traces go to
+           stdout if no path is given.
+    type new_level: int
+    type path: str
+    return: None
+    rtype: None
+    """
+    global level, _out, _owns_out
+    close()
+    if path is not None:
+        _out = open(path, "w")
+        _owns_out = True
+    else:
+        _out = sys.stdout
+        _owns_out = False
+    level = new_level
+
+
+def close():
+    """
+    Turns tracing off and closes the trace file (if any).
+    return: None
+    rtype: None
+    """
+    global level, _out, _owns_out
+    if _owns_out:
+        _out.close()
+    level = OFF
+    _out = None
+    _owns_out = False
+
+
+def emit(msg_level, message):
+    """
+    Writes a trace message if its level is enabled. Each message takes one
+    line, tagged with its level, e.g. "N max B d=3 a=-inf b=inf".
+    @msg_level: The level of the message (MOVES, SEARCH, NODES or BOARDS)
+    @message: The message to write
+    type msg_level: int
+    type message: str
+    return: None
+    rtype: None
+    """
+    if msg_level <= level and _out is not None:
+        _out.write(_LEVEL_TAGS[msg_level] + " " + message + "\n")
+
+
+def board_line(gamestate):
+    """
+    Formats a board on a single line, one row after another separated
+    by slashes, with "." for empty cells (e.g. "..../.BW./.WB./....").
+    @gamestate: The game state of an Othello game
+    type gamestate: Othello
+    return: The board of gamestate as a single line
+    rtype: str
+    """
+    return "/".join("".join(cell if cell != " " else "." for cell in row)
+                    for row in gamestate.get_board())
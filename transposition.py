@@ -0,0 +1,128 @@
+#Contains the class for the transposition table used by the minimax AI.
+from collections import namedtuple
+
+
+
+
+#Bound types of a stored value. An EXACT value is the true minimax value of a
+#position, while a LOWER_BOUND (UPPER_BOUND) value comes from a search that
+#failed high (low) and only says the true value is at least (at most) that much.
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+TTEntry = namedtuple("TTEntry", ["key", "depth", "value", "bound", "move"])
+
+
+
+
+class TranspositionTable:
+    """
+    A fixed-size table of searched positions keyed by Zobrist hash.
+    Positions are stored in buckets of two slots: a depth-preferred slot
+    that keeps the deepest search of a position, and an always-replace
+    slot that keeps the most recent one.
+    Values are stored from the perspective of the CPU player that ran the
+    search, so a table should only be shared by searches for one player.
+    """
+
+    def __init__(self, num_entries=1 << 17, replacement="two-tier"):
+        """
+        Initializes an empty transposition table.
+        @num_entries: The maximum number of positions held by the table
+        @replacement: The replacement policy: "depth" (only keep the
+                      deepest search of a bucket), "always" (always
+                      keep the most recent search), or "two-tier"
+                      (one slot of each kind per bucket)
+        type num_entries: int
+        type replacement: str
+        return: None
+        rtype: None
+        """
+        if replacement not in ("depth", "always", "two-tier"):
+            raise ValueError("Unknown replacement policy: {}".format(replacement))
+        self._replacement = replacement
+        self._slots = 2 if replacement == "two-tier" else 1
+        self._num_buckets = max(1, num_entries // self._slots)
+        self._entries = [None] * (self._num_buckets * self._slots)
+        self._probes = 0
+        self._hits = 0
+
+
+    def lookup(self, key):
+        """
+        Looks up a position in the table.
+        @key: The Zobrist hash of a position
+        type key: int
+        return: The stored entry for the position or None if
+                the position is not in the table
+        rtype: TTEntry
+        """
+        self._probes += 1
+        index = (key % self._num_buckets) * self._slots
+        for slot in range(index, index + self._slots):
+            entry = self._entries[slot]
+            if entry is not None and entry.key == key:
+                self._hits += 1
+                return entry
+        return None
+
+
+    def store(self, key, depth, value, bound, move):
+        """
+        Stores the result of a search according to the replacement policy.
+        @key: The Zobrist hash of the searched position
+        @depth: The remaining depth the position was searched to
+        @value: The value found by the search
+        @bound: The bound type of value (EXACT, LOWER_BOUND or UPPER_BOUND)
+        @move: The best move found by the search (non 0-based)
+        type key: int
+        type depth: int
+        type value: float
+        type bound: int
+        type move: tuple
+        return: None
+        rtype: None
+        """
+        index = (key % self._num_buckets) * self._slots
+        entry = TTEntry(key, depth, value, bound, move)
+        if self._replacement == "always":
+            self._entries[index] = entry
+            return
+
+        #The depth-preferred slot only gives way to a search at least as deep,
+        #or to a new search of the very same position.
+        kept = self._entries[index]
+        if kept is None or kept.key == key or depth >= kept.depth:
+            self._entries[index] = entry
+        elif self._replacement == "two-tier":
+            self._entries[index+1] = entry
+
+
+    def clear(self):
+        """
+        Removes every entry from the table and resets its counters.
+        return: None
+        rtype: None
+        """
+        self._entries = [None] * len(self._entries)
+        self._probes = 0
+        self._hits = 0
+
+
+    def get_size(self):
+        """
+        Returns the capacity of the table.
+        return: The maximum number of positions held by the table
+        rtype: int
+        """
+        return len(self._entries)
+
+
+    def get_hit_rate(self):
+        """
+        Returns the fraction of lookups that found their position.
+        return: The hit rate of the table (0.0 if it was never probed)
+        rtype: float
+        """
+        return self._hits / self._probes if self._probes else 0.0